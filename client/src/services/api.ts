@@ -46,6 +46,83 @@ export const authAPI = {
   },
 };
 
+const JOB_POLL_INTERVAL_MS = 1000;
+
+export const jobsAPI = {
+  getJob: async (jobId: string) => {
+    const response = await apiClient.get(`/jobs/${jobId}`);
+    return response.data;
+  },
+  
+  cancelJob: async (jobId: string) => {
+    const response = await apiClient.post(`/jobs/${jobId}/cancel`);
+    return response.data;
+  },
+};
+
+const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024;
+const UPLOAD_MAX_RETRIES = 5;
+
+export const uploadsAPI = {
+  // Resumable upload: sends the file in chunks and resumes from the server's offset after errors
+  uploadResumable: async (file: File, onProgress?: (fraction: number) => void) => {
+    const session = (await apiClient.post('/uploads', {
+      filename: file.name,
+      size: file.size,
+      content_type: file.type || undefined,
+    })).data;
+
+    let offset = 0;
+    let retries = 0;
+    while (offset < file.size) {
+      try {
+        const response = await apiClient.patch(
+          `/uploads/${session.id}`,
+          file.slice(offset, offset + UPLOAD_CHUNK_SIZE),
+          {
+            headers: {
+              'Content-Type': 'application/offset+octet-stream',
+              'Upload-Offset': String(offset),
+            },
+          }
+        );
+        offset = Number(response.headers['upload-offset']);
+        retries = 0;
+      } catch (error) {
+        if (++retries > UPLOAD_MAX_RETRIES) {
+          throw error;
+        }
+        await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** retries));
+        const status = await apiClient.head(`/uploads/${session.id}`);
+        offset = Number(status.headers['upload-offset']);
+      }
+      onProgress?.(offset / file.size);
+    }
+
+    const response = await apiClient.post(`/uploads/${session.id}/complete`);
+    return response.data;
+  },
+};
+
+// Analysis endpoints return a stored result directly, or a job to poll until it finishes
+const resolveAnalysis = async (data: any) => {
+  let job = data;
+  while (job.status === 'pending' || job.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    job = await jobsAPI.getJob(data.job_id);
+  }
+  
+  if (job.status === 'failed') {
+    throw new Error(job.error || 'Analysis failed');
+  }
+  
+  if (job.status === 'cancelled') {
+    throw new Error('Analysis was cancelled');
+  }
+  
+  return job.result;
+};
+
 export const audioAPI = {
   uploadAudio: async (file: File) => {
     const formData = new FormData();
@@ -64,7 +141,29 @@ export const audioAPI = {
     const response = await apiClient.get('/audio/files');
     return response.data;
   },
-  
+
+  // One page of files, newest first; pass nextCursor back to get the following page
+  getAudioFilesPage: async (cursor?: string, limit: number = 50, fields?: string[]) => {
+    const params: Record<string, string | number> = { limit };
+    if (cursor) {
+      params.cursor = cursor;
+    }
+    if (fields) {
+      params.fields = fields.join(',');
+    }
+
+    const response = await apiClient.get('/audio/files', { params });
+    return {
+      files: response.data,
+      nextCursor: (response.headers['x-next-cursor'] as string | undefined) ?? null,
+    };
+  },
+
+  getAudioFileSummary: async (fileId: string) => {
+    const response = await apiClient.get(`/audio/files/${fileId}/summary`);
+    return response.data;
+  },
+
   getAudioFile: async (fileId: string) => {
     const response = await apiClient.get(`/audio/files/${fileId}`);
     return response.data;
@@ -81,6 +180,17 @@ export const audioAPI = {
       ai_service: aiService
     });
     
+    return resolveAnalysis(response.data);
+  },
+  
+  // Queue analyses of several files at once; each item has a job to poll unless already completed
+  analyzeBatch: async (fileIds: string[], analysisTypes: string[] = ['general'], aiService?: string) => {
+    const response = await apiClient.post('/audio/analyze/batch', {
+      file_ids: fileIds.map(Number),
+      analysis_types: analysisTypes,
+      ai_service: aiService
+    });
+    
     return response.data;
   },
   
@@ -94,7 +204,7 @@ export const audioAPI = {
       params
     });
     
-    return response.data;
+    return resolveAnalysis(response.data);
   },
   
   analyzeProduction: async (fileId: string, aiService?: string) => {
@@ -107,7 +217,7 @@ export const audioAPI = {
       params
     });
     
-    return response.data;
+    return resolveAnalysis(response.data);
   },
   
   analyzeArrangement: async (fileId: string, aiService?: string) => {
@@ -120,7 +230,7 @@ export const audioAPI = {
       params
     });
     
-    return response.data;
+    return resolveAnalysis(response.data);
   },
   
   getAnalysisResults: async (fileId: string) => {
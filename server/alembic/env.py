@@ -18,7 +18,7 @@ if DATABASE_URL:
 fileConfig(config.config_file_name)
 
 from app.db.base import Base
-from app.models import User, AudioFile, AnalysisResult
+from app.models import User, AudioFile, AnalysisResult, ProcessingJob, UploadSession
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,41 @@
+"""Add processing jobs
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "processing_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("audio_file_id", sa.Integer(), sa.ForeignKey("audio_files.id"), nullable=True),
+        sa.Column("job_type", sa.String(), nullable=False),
+        sa.Column("analysis_type", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("progress", sa.Float(), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_processing_jobs_id", "processing_jobs", ["id"])
+    op.create_index("ix_processing_jobs_audio_file_id", "processing_jobs", ["audio_file_id"])
+
+
+def downgrade():
+    op.drop_index("ix_processing_jobs_audio_file_id", table_name="processing_jobs")
+    op.drop_index("ix_processing_jobs_id", table_name="processing_jobs")
+    op.drop_table("processing_jobs")
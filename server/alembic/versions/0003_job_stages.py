@@ -0,0 +1,31 @@
+"""Add parent job reference for pipeline stages
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("processing_jobs") as batch_op:
+        batch_op.add_column(sa.Column("parent_id", sa.String(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_processing_jobs_parent_id", "processing_jobs", ["parent_id"], ["id"]
+        )
+        batch_op.create_index("ix_processing_jobs_parent_id", ["parent_id"])
+
+
+def downgrade():
+    with op.batch_alter_table("processing_jobs") as batch_op:
+        batch_op.drop_index("ix_processing_jobs_parent_id")
+        batch_op.drop_constraint("fk_processing_jobs_parent_id", type_="foreignkey")
+        batch_op.drop_column("parent_id")
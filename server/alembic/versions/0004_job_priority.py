@@ -0,0 +1,31 @@
+"""Add job priority lane and start time
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("processing_jobs") as batch_op:
+        batch_op.add_column(
+            sa.Column("priority", sa.String(), nullable=False, server_default="interactive")
+        )
+        batch_op.add_column(sa.Column("started_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_processing_jobs_user_id_created_at", "processing_jobs", ["user_id", "created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_processing_jobs_user_id_created_at", table_name="processing_jobs")
+    with op.batch_alter_table("processing_jobs") as batch_op:
+        batch_op.drop_column("started_at")
+        batch_op.drop_column("priority")
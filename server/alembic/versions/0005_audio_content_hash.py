@@ -0,0 +1,27 @@
+"""Add content hash to audio files
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("audio_files") as batch_op:
+        batch_op.add_column(sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.create_index("ix_audio_files_content_hash", "audio_files", ["content_hash"])
+
+
+def downgrade():
+    op.drop_index("ix_audio_files_content_hash", table_name="audio_files")
+    with op.batch_alter_table("audio_files") as batch_op:
+        batch_op.drop_column("content_hash")
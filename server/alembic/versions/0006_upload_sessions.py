@@ -0,0 +1,44 @@
+"""Add resumable upload sessions
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "upload_sessions",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("content_type", sa.String(), nullable=True),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("total_size", sa.BigInteger(), nullable=False),
+        sa.Column("received", sa.JSON(), nullable=False),
+        sa.Column("offset", sa.BigInteger(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column(
+            "audio_file_id", sa.Integer(), sa.ForeignKey("audio_files.id", ondelete="SET NULL"), nullable=True
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_upload_sessions_id", "upload_sessions", ["id"])
+    op.create_index("ix_upload_sessions_user_id", "upload_sessions", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_upload_sessions_user_id", table_name="upload_sessions")
+    op.drop_index("ix_upload_sessions_id", table_name="upload_sessions")
+    op.drop_table("upload_sessions")
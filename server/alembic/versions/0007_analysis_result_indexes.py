@@ -0,0 +1,36 @@
+"""Unique analysis result per file and type, and per-user audio listings index
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep only the newest result of each (audio_file_id, analysis_type) before enforcing uniqueness
+    op.execute(sa.text(
+        "DELETE FROM analysis_results WHERE id NOT IN ("
+        "SELECT MAX(id) FROM analysis_results GROUP BY audio_file_id, analysis_type"
+        ")"
+    ))
+    op.create_index(
+        "ix_analysis_results_audio_file_id_analysis_type",
+        "analysis_results",
+        ["audio_file_id", "analysis_type"],
+        unique=True,
+    )
+    op.create_index("ix_audio_files_user_id_created_at", "audio_files", ["user_id", "created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_audio_files_user_id_created_at", table_name="audio_files")
+    op.drop_index("ix_analysis_results_audio_file_id_analysis_type", table_name="analysis_results")
@@ -0,0 +1,44 @@
+"""Unique active analysis job per file and type
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+ACTIVE_ANALYSIS_WHERE = "job_type = 'analysis' AND status IN ('pending', 'running')"
+
+
+def upgrade():
+    # Cancel all but the newest active duplicate of each (audio_file_id, analysis_type) before enforcing uniqueness
+    op.execute(sa.text(
+        "UPDATE processing_jobs SET status = 'cancelled' "
+        f"WHERE {ACTIVE_ANALYSIS_WHERE} AND id NOT IN ("
+        "SELECT id FROM ("
+        "SELECT id, ROW_NUMBER() OVER ("
+        "PARTITION BY audio_file_id, analysis_type ORDER BY created_at DESC, id DESC"
+        ") AS position "
+        f"FROM processing_jobs WHERE {ACTIVE_ANALYSIS_WHERE}"
+        ") AS ranked WHERE position = 1"
+        ")"
+    ))
+    op.create_index(
+        "ix_processing_jobs_active_analysis",
+        "processing_jobs",
+        ["audio_file_id", "job_type", "analysis_type"],
+        unique=True,
+        postgresql_where=sa.text(ACTIVE_ANALYSIS_WHERE),
+        sqlite_where=sa.text(ACTIVE_ANALYSIS_WHERE),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_processing_jobs_active_analysis", table_name="processing_jobs")
@@ -1,7 +1,9 @@
 from fastapi import APIRouter
-from app.api.endpoints import audio, auth, users
+from app.api.endpoints import audio, auth, jobs, uploads, users
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(audio.router, prefix="/audio", tags=["audio"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
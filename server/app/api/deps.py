@@ -11,6 +11,7 @@ from app.core.config import settings
 from app.models.user import User
 from app.schemas.token import TokenPayload
 from app.crud.user import user
+from app.services.user_cache import get_user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -19,6 +20,9 @@ def get_current_user(
 ) -> User:
     """
     Validate token and return current user
+
+    The user is served from the user cache when possible, so most requests
+    authenticate without a database query.
     """
     try:
         payload = jwt.decode(
@@ -30,9 +34,13 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user_obj = user.get(db, id=token_data.sub)
-    if not user_obj:
-        raise HTTPException(status_code=404, detail="User not found")
+    user_cache = get_user_cache()
+    user_obj = user_cache.get(db, token_data.sub)
+    if user_obj is None:
+        user_obj = user.get(db, id=token_data.sub)
+        if not user_obj:
+            raise HTTPException(status_code=404, detail="User not found")
+        user_cache.set(user_obj)
     return user_obj
 
 
@@ -1,50 +1,363 @@
 from typing import List, Optional, Dict, Any, Union
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status, BackgroundTasks, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status, BackgroundTasks, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import os
+import json
+import asyncio
 import uuid
 import logging
 import time
 from datetime import datetime
+from pathlib import Path
 
-from app.db.base import get_db
+import soundfile as sf
+
+from app.core.config import settings
+from app.db.base import get_db, get_async_db, get_async_session_factory, SessionLocal
 from app.api.deps import get_current_active_user
+from app.api.pagination import MAX_PAGE_SIZE, decode_cursor, page_response, parse_fields
 from app.models.user import User
 from app.models.audio import AudioFile, AnalysisResult
 from app.crud.audio import audio_file, analysis_result
-from app.tasks.audio_analysis import analyze_audio
+from app.crud.job import job
+from app.models.job import JOB_COMPLETED, JOB_FAILED, JOB_PENDING, JOB_RUNNING, JOB_CANCELLED, PRIORITY_INTERACTIVE, PRIORITIES
+from app.tasks.audio_analysis import (
+    FILE_NOT_FOUND_RESULT,
+    analyze_audio,
+    analyze_audio_multi_async,
+    stream_audio_analysis,
+)
+from app.tasks.pipeline import start_pipeline, STEM_NAMES
+from app.tasks.batch import start_batch_analysis
+from app.tasks.tracking import cancel_job
+from app.services import artifact_store, upload_store
+from app.services.file_streaming import ranged_file_response, file_hash
+from app.services import spectrogram_tiles, waveform_peaks
+from app.services.prompt_builder import ANALYSIS_TYPES
+from app.services.single_flight import SingleFlight
+from app.services.broadcast import Broadcast, BroadcastGroup
+from app.services.fair_scheduler import scheduler, lane_priority, CLASS_ANALYSIS
 from app.services.ai_service import get_ai_service
 from app.schemas.audio import (
     AudioFileCreate,
     AudioFile as AudioFileSchema,
     AnalysisResultCreate,
     AnalysisResult as AnalysisResultSchema,
+    AudioFileSummary,
     AudioUploadResponse,
-    AudioAnalysisResponse,
-    MusicTheoryAnalysisResponse,
-    ProductionFeedbackResponse,
-    ArrangementAnalysisResponse,
-    AIAnalysisRequest
+    FullAnalysisResponse,
+    AIAnalysisRequest,
+    BatchAnalysisRequest
 )
+from app.schemas.job import JobCreate, Job, AnalysisJobResponse, BatchAnalysisResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+UPLOAD_DIR = upload_store.UPLOAD_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Allowance for multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Seconds between job status checks while a stream follows a queued analysis
+STREAM_JOB_POLL_INTERVAL = 1.0
+
+analysis_flight = SingleFlight("analysis-lock")
+analysis_streams = BroadcastGroup()
+
+
+def _enqueue_analysis(
+    db: Session,
+    db_file: AudioFile,
+    analysis_type: str,
+    ai_service: Optional[str],
+    user_id: int,
+    response: Response,
+    priority: str = PRIORITY_INTERACTIVE,
+) -> AnalysisJobResponse:
+    """
+    Return the stored analysis of a file, or enqueue an analysis job for it.
+
+    A pending or running job for the same file and type is reused instead of
+    queueing a duplicate; a unique index on active analysis jobs settles
+    concurrent requests. New jobs are dispatched by the fair scheduler.
+
+    Args:
+        db: Database session
+        db_file: Audio file to analyze
+        analysis_type: Type of analysis to perform
+        ai_service: AI service to use (gemini, openai, or None for default)
+        user_id: Owner of the new job
+        response: Response whose status code is set to 202 when a job is queued
+        priority: Scheduling lane (interactive or batch)
+
+    Returns:
+        Stored result, or the id and status of the job producing it
+    """
+    _check_priority(priority)
+    
+    existing_analysis = analysis_result.get_by_type(
+        db=db, audio_file_id=db_file.id, analysis_type=analysis_type
+    )
+    if existing_analysis:
+        return AnalysisJobResponse(
+            file_id=str(db_file.id),
+            analysis_type=analysis_type,
+            status=JOB_COMPLETED,
+            result=existing_analysis.result
+        )
+    
+    response.status_code = status.HTTP_202_ACCEPTED
+    
+    db_job = job.get_active(
+        db=db, audio_file_id=db_file.id, job_type="analysis", analysis_type=analysis_type
+    )
+    if db_job is None:
+        try:
+            db_job = job.create(db=db, obj_in=JobCreate(
+                id=str(uuid.uuid4()),
+                job_type="analysis",
+                user_id=user_id,
+                audio_file_id=db_file.id,
+                analysis_type=analysis_type,
+                priority=priority
+            ))
+        except IntegrityError:
+            # A concurrent request queued the same analysis first; share its job
+            db.rollback()
+            db_job = job.get_active(
+                db=db, audio_file_id=db_file.id, job_type="analysis", analysis_type=analysis_type
+            )
+            if db_job is None:
+                raise HTTPException(status_code=409, detail="Analysis was queued concurrently, please retry")
+            return AnalysisJobResponse(
+                job_id=db_job.id,
+                file_id=str(db_file.id),
+                analysis_type=analysis_type,
+                status=db_job.status
+            )
+        
+        # The job id doubles as the Celery task id so the worker can update it
+        signature = analyze_audio.s(
+            file_path=db_file.file_path,
+            analysis_type=analysis_type,
+            ai_service=ai_service,
+            audio_file_id=db_file.id,
+        ).set(task_id=db_job.id, priority=lane_priority(priority))
+        
+        try:
+            scheduler.submit(signature, db_job.id, user_id, lane=priority, job_class=CLASS_ANALYSIS)
+        except Exception as e:
+            logger.error(f"Error enqueueing analysis job {db_job.id}: {str(e)}")
+            job.update_status(db=db, id=db_job.id, status=JOB_FAILED, error=str(e))
+            raise HTTPException(status_code=503, detail="Analysis queue unavailable")
+    
+    return AnalysisJobResponse(
+        job_id=db_job.id,
+        file_id=str(db_file.id),
+        analysis_type=analysis_type,
+        status=db_job.status
+    )
+
+
+def _check_priority(priority: str) -> None:
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"Unknown priority: {priority}")
+
+
+def _store_analysis_result(
+    audio_file_id: int,
+    analysis_type: str,
+    result: Dict[str, Any],
+    processing_time: float,
+    notes: str,
+) -> None:
+    """Store an analysis result in its own session, for use after the request session has closed."""
+    db = SessionLocal()
+    try:
+        analysis_result.upsert(db=db, obj_in=AnalysisResultCreate(
+            audio_file_id=audio_file_id,
+            analysis_type=analysis_type,
+            result=result,
+            confidence=result.get("confidence", 0.85),
+            processing_time=processing_time,
+            notes=notes
+        ))
+    finally:
+        db.close()
+
+
+def _analysis_error(result: Dict[str, Any]) -> HTTPException:
+    """
+    Map an error result of an in-process analysis to the error response for it.
+
+    Error results carry placeholder values and are never stored, so a later
+    request can retry the analysis.
+    """
+    if result["error"] == FILE_NOT_FOUND_RESULT["error"]:
+        return HTTPException(status_code=404, detail="Audio file not found on disk")
+    return HTTPException(status_code=502, detail=f"Analysis failed: {result['error']}")
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
-@router.post("/upload", response_model=AudioUploadResponse)
+async def _follow_job(broadcast: Broadcast, job_id: str) -> None:
+    """Publish the progress of a queued analysis job, then its result."""
+    last_state = None
+    while True:
+        async with get_async_session_factory()() as session:
+            db_job = await job.get_async(session, id=job_id)
+        if db_job is None:
+            raise RuntimeError("Analysis job not found")
+        
+        if db_job.status == JOB_COMPLETED:
+            await broadcast.publish({"event": "result", "result": db_job.result})
+            return
+        if db_job.status in (JOB_FAILED, JOB_CANCELLED):
+            detail = "Analysis was cancelled" if db_job.status == JOB_CANCELLED else db_job.error or "Analysis failed"
+            await broadcast.publish({"event": "error", "detail": detail, "job_id": job_id})
+            return
+        
+        state = (db_job.status, db_job.progress)
+        if state != last_state:
+            stage = "queued" if db_job.status == JOB_PENDING else "analyzing"
+            await broadcast.publish({"event": "status", "stage": stage, "progress": db_job.progress, "job_id": job_id})
+            last_state = state
+        await asyncio.sleep(STREAM_JOB_POLL_INTERVAL)
+
+
+async def _get_or_run_analyses(
+    db: AsyncSession,
+    db_file: AudioFile,
+    analysis_types: List[str],
+    ai_service: Optional[str],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Return stored analyses of a file, running all missing types in one combined AI request.
+
+    Each file and type is a separate single-flight key: types another request
+    is already running are awaited, and only the rest are requested. The
+    analysis runs in its own task and session, so it is completed and stored
+    even if the client disconnects.
+
+    Args:
+        db: Database session
+        db_file: Audio file to analyze
+        analysis_types: Types of analysis to return
+        ai_service: AI service to use (gemini, openai, or None for default)
+
+    Returns:
+        Analysis result data keyed by analysis type
+    """
+    audio_file_id, file_path = db_file.id, db_file.file_path
+    
+    async def get_existing(session: AsyncSession, types: List[str]) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        for analysis_type in types:
+            existing_analysis = await analysis_result.get_by_type_async(
+                db=session, audio_file_id=audio_file_id, analysis_type=analysis_type
+            )
+            if existing_analysis:
+                results[analysis_type] = existing_analysis.result
+        return results
+    
+    results = await get_existing(db, analysis_types)
+    missing_types = [t for t in analysis_types if t not in results]
+    if not missing_types:
+        return results
+    
+    keys = {f"{audio_file_id}:{t}": t for t in missing_types}
+    
+    async def get_stored(key: str) -> Optional[Dict[str, Any]]:
+        async with get_async_session_factory()() as session:
+            return (await get_existing(session, [keys[key]])).get(keys[key])
+    
+    async def run_analyses(led_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        async with get_async_session_factory()() as session:
+            types = [keys[key] for key in led_keys]
+            stored = await get_existing(session, types)
+            types_to_run = [t for t in types if t not in stored]
+            if types_to_run:
+                start_time = time.time()
+                
+                combined_data = await analyze_audio_multi_async(
+                    file_path=file_path,
+                    analysis_types=types_to_run,
+                    ai_service=ai_service
+                )
+                
+                # One request produced every result, so each row records its share of the time
+                processing_time = (time.time() - start_time) / len(types_to_run)
+                
+                failed = None
+                for analysis_type in types_to_run:
+                    analysis_result_data = combined_data[analysis_type]
+                    if "error" in analysis_result_data:
+                        failed = analysis_result_data
+                        continue
+                    analysis_data = AnalysisResultCreate(
+                        audio_file_id=audio_file_id,
+                        analysis_type=analysis_type,
+                        result=analysis_result_data,
+                        confidence=analysis_result_data.get("confidence", 0.85),
+                        processing_time=processing_time,
+                        notes=f"Combined analysis ({', '.join(types_to_run)}) using {ai_service or 'default'} service"
+                    )
+                    await analysis_result.upsert_async(db=session, obj_in=analysis_data)
+                    stored[analysis_type] = analysis_result_data
+                if failed is not None:
+                    raise _analysis_error(failed)
+        
+        return {key: stored[keys[key]] for key in led_keys}
+    
+    flight_results = await analysis_flight.run_many(list(keys), run_analyses, get_stored)
+    results.update({keys[key]: result for key, result in flight_results.items()})
+    
+    return results
+
+
+@router.post(
+    "/upload",
+    response_model=AudioUploadResponse,
+    # The body is parsed by the handler; describe the form for the API docs
+    openapi_extra={"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "properties": {"file": {"type": "string", "format": "binary"}},
+        "required": ["file"],
+    }}}}},
+)
 async def upload_audio(
     *,
-    db: Session = Depends(get_db),
-    file: UploadFile = File(...),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Upload an audio file for analysis
+
+    The multipart body is parsed as it arrives and the file is streamed to
+    disk in chunks while its SHA-256 hash and size are computed. Uploads
+    larger than UPLOAD_MAX_BYTES are rejected with 413, from the declared
+    Content-Length before any of the body is read when the client sends one.
     """
+    # Reject oversized requests from the declared length before reading the body
+    content_length = request.headers.get("content-length", "")
+    max_request_size = settings.UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES
+    if content_length.isdigit() and int(content_length) > max_request_size:
+        raise HTTPException(status_code=413, detail="File too large")
+    
+    try:
+        file = await upload_store.read_multipart_file(request.headers, request.stream())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
     
@@ -57,9 +370,11 @@ async def upload_audio(
     file_path = os.path.join(UPLOAD_DIR, unique_filename)
     
     try:
-        contents = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        file_size, content_hash = await upload_store.save_stream(file.chunks, file_path)
+    except upload_store.UploadTooLarge:
+        raise HTTPException(status_code=413, detail="File too large")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error saving file: {str(e)}")
         raise HTTPException(status_code=500, detail="Error saving file")
@@ -67,32 +382,49 @@ async def upload_audio(
     file_obj = AudioFileCreate(
         filename=file.filename,
         file_path=file_path,
-        file_size=len(contents),
+        file_size=file_size,
         format=file_extension.lstrip('.'),
+        content_hash=content_hash,
         user_id=current_user.id
     )
     
-    db_file = audio_file.create(db=db, obj_in=file_obj)
+    db_file = await audio_file.create_async(db=db, obj_in=file_obj)
     
     return AudioUploadResponse(
         file_id=str(db_file.id),
         filename=db_file.filename,
-        file_path=db_file.file_path
+        file_path=db_file.file_path,
+        file_size=db_file.file_size,
+        content_hash=db_file.content_hash
     )
 
 
 @router.get("/files", response_model=List[AudioFileSchema])
 def get_user_audio_files(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,filename"),
+    skip: int = Query(0, ge=0, description="Offset pagination, superseded by cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Get all audio files uploaded by the current user
+    Get the audio files uploaded by the current user, newest first
+
+    Pages are fetched by cursor: pass the X-Next-Cursor header of a page to get
+    the next one. The header is absent on the last page.
     """
-    files = audio_file.get_by_user(db=db, user_id=current_user.id, skip=skip, limit=limit)
-    return files
+    field_list = parse_fields(fields, list(AudioFileSchema.__fields__))
+    files = audio_file.get_page_by_user(
+        db=db,
+        user_id=current_user.id,
+        after=decode_cursor(cursor),
+        limit=limit,
+        skip=skip if cursor is None else 0,
+        columns=field_list,
+    )
+    return page_response(response, files, limit, field_list)
 
 
 @router.get("/files/{file_id}", response_model=AudioFileSchema)
@@ -114,10 +446,311 @@ def get_audio_file(
     return db_file
 
 
-@router.post("/analyze/{file_id}", response_model=AudioAnalysisResponse)
-async def analyze_audio_file(
+@router.get("/files/{file_id}/summary", response_model=AudioFileSummary)
+def get_audio_file_summary(
     file_id: int,
-    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get an audio file and the analyses stored for it, without their results
+    """
+    db_file = audio_file.get(db=db, id=file_id)
+    if not db_file:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    
+    if db_file.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    analyses = analysis_result.get_summaries(db=db, audio_file_id=file_id)
+    return AudioFileSummary(**AudioFileSchema.from_orm(db_file).dict(), analyses=analyses)
+
+
+@router.api_route("/files/{file_id}/download", methods=["GET", "HEAD"])
+def download_audio_file(
+    file_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Download the original upload of an audio file
+    
+    Supports Range requests (206) for seeking, and If-None-Match against an
+    ETag derived from the content hash.
+    """
+    db_file = audio_file.get(db=db, id=file_id)
+    if not db_file:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    
+    if db_file.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    if not os.path.isfile(db_file.file_path):
+        raise HTTPException(status_code=404, detail="Audio file missing from storage")
+    
+    # Files uploaded before content hashes were stored get theirs on first download
+    if not db_file.content_hash:
+        db_file = audio_file.update(db=db, db_obj=db_file, obj_in={"content_hash": file_hash(db_file.file_path)})
+    
+    # An upload's content never changes under its id
+    return ranged_file_response(
+        request, db_file.file_path, content_hash=db_file.content_hash, filename=db_file.filename, immutable=True
+    )
+
+
+@router.api_route("/files/{file_id}/{kind}/{stem}", methods=["GET", "HEAD"])
+def download_artifact(
+    file_id: int,
+    kind: str,
+    stem: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Download a separated stem (kind "stems") or its MIDI transcription (kind "midi")
+    
+    Artifacts are written by the processing pipeline, see ``POST /audio/pipeline/{file_id}``.
+    Supports Range requests and ETags like the original download. A pipeline
+    rerun rewrites them under the same URL, so clients revalidate every time.
+    """
+    extensions = {artifact_store.STEMS: ".wav", artifact_store.MIDI: ".mid"}
+    if kind not in extensions:
+        raise HTTPException(status_code=404, detail="Not found")
+    if stem not in STEM_NAMES:
+        raise HTTPException(status_code=404, detail=f"Unknown stem, expected one of {', '.join(STEM_NAMES)}")
+    
+    db_file = audio_file.get(db=db, id=file_id)
+    if not db_file:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    
+    if db_file.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    name = f"{stem}{extensions[kind]}"
+    if not artifact_store.exists(file_id, kind, name):
+        raise HTTPException(status_code=404, detail="Artifact not available; run the processing pipeline first")
+    
+    base_name = os.path.splitext(db_file.filename)[0]
+    return ranged_file_response(
+        request,
+        str(artifact_store.artifact_path(file_id, kind, name)),
+        filename=f"{base_name}_{name}",
+    )
+
+
+@router.get("/{file_id}/peaks")
+def get_waveform_peaks(
+    file_id: int,
+    level: int = Query(256, description="Samples per pixel, a power of two from 256 to 65536"),
+    start: Optional[float] = Query(None, ge=0, description="Start time in seconds"),
+    end: Optional[float] = Query(None, ge=0, description="End time in seconds"),
+    stem: Optional[str] = Query(None, description="Stem to draw instead of the original (vocals, drums, bass, other)"),
+    format: str = Query("json", description="json, or binary for raw little-endian int16 min/max pairs"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get waveform min/max peaks of an audio file or stem at one zoom level
+    
+    Peaks are precomputed at ingest and after separation; peaks of the
+    original are computed on first request if missing. The binary format
+    returns the interleaved values with the level and first pixel in
+    X-Peaks-* headers.
+    """
+    if level not in waveform_peaks.LEVELS:
+        raise HTTPException(status_code=400, detail=f"Level must be one of {waveform_peaks.LEVELS}")
+    if format not in ("json", "binary"):
+        raise HTTPException(status_code=400, detail="Format must be json or binary")
+    if stem is not None and stem not in STEM_NAMES:
+        raise HTTPException(status_code=404, detail=f"Unknown stem, expected one of {', '.join(STEM_NAMES)}")
+    
+    db_file = audio_file.get(db=db, id=file_id)
+    if not db_file:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    
+    if db_file.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    if stem is None:
+        if not os.path.isfile(db_file.file_path):
+            raise HTTPException(status_code=404, detail="Audio file missing from storage")
+        try:
+            peaks_path = waveform_peaks.ensure_peaks(file_id, Path(db_file.file_path))
+        except Exception as e:
+            logger.error(f"Error computing waveform peaks of audio file {file_id}: {str(e)}")
+            raise HTTPException(status_code=422, detail="Could not decode audio file")
+    else:
+        peaks_path = artifact_store.artifact_path(file_id, artifact_store.PEAKS, waveform_peaks.peaks_name(stem))
+        if not peaks_path.is_file():
+            raise HTTPException(status_code=404, detail="Stem peaks not available; run the processing pipeline first")
+    
+    peaks = waveform_peaks.read_peaks(peaks_path, level, start, end)
+    
+    if format == "binary":
+        return Response(
+            content=peaks["data"].tobytes(),
+            media_type="application/octet-stream",
+            headers={
+                "X-Peaks-Sample-Rate": str(peaks["sample_rate"]),
+                "X-Peaks-Samples-Per-Pixel": str(level),
+                "X-Peaks-Start-Pixel": str(peaks["start_pixel"]),
+                "X-Peaks-Bits": str(peaks["bits"]),
+            },
+        )
+    return {**peaks, "data": peaks["data"].tolist()}
+
+
+@router.get("/{file_id}/spectrogram/{zoom}/{tile}")
+def get_spectrogram_tile(
+    file_id: int,
+    zoom: int,
+    tile: int,
+    stem: Optional[str] = Query(None, description="Stem to draw instead of the original (vocals, drums, bass, other)"),
+    format: str = Query("png", description="png, or raw for uint8 rows"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get one log-magnitude spectrogram tile of an audio file or stem
+    
+    Tiles are 256 columns by 256 log-spaced frequency rows (27.5 Hz up to
+    Nyquist, highest first), quantized to 0-255 over a 90 dB range. At zoom z
+    a column covers 512 * 2^z samples. Tile geometry is also returned in
+    X-Spectrogram-* headers.
+    """
+    if not 0 <= zoom <= spectrogram_tiles.MAX_ZOOM:
+        raise HTTPException(status_code=400, detail=f"Zoom must be between 0 and {spectrogram_tiles.MAX_ZOOM}")
+    if format not in ("png", "raw"):
+        raise HTTPException(status_code=400, detail="Format must be png or raw")
+    if stem is not None and stem not in STEM_NAMES:
+        raise HTTPException(status_code=404, detail=f"Unknown stem, expected one of {', '.join(STEM_NAMES)}")
+    
+    db_file = audio_file.get(db=db, id=file_id)
+    if not db_file:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    
+    if db_file.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    if stem is None:
+        audio_path = Path(db_file.file_path)
+    else:
+        audio_path = artifact_store.artifact_path(file_id, artifact_store.STEMS, f"{stem}.wav")
+    if not audio_path.is_file():
+        raise HTTPException(status_code=404, detail="Audio not available")
+    
+    try:
+        info = sf.info(str(audio_path))
+    except Exception as e:
+        logger.error(f"Error reading audio file {file_id}: {str(e)}")
+        raise HTTPException(status_code=422, detail="Could not decode audio file")
+    
+    if not 0 <= tile < spectrogram_tiles.tile_count(info.frames, zoom):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    
+    image = spectrogram_tiles.render_tile(file_id, audio_path, zoom, tile, source=stem or spectrogram_tiles.ORIGINAL)
+    
+    headers = {
+        "Cache-Control": "private, max-age=86400",
+        "X-Spectrogram-Sample-Rate": str(info.samplerate),
+        "X-Spectrogram-Hop": str(spectrogram_tiles.BASE_HOP << zoom),
+        "X-Spectrogram-Min-Frequency": str(spectrogram_tiles.MIN_FREQUENCY),
+        "X-Spectrogram-Tiles": str(spectrogram_tiles.tile_count(info.frames, zoom)),
+    }
+    if format == "raw":
+        return Response(content=image.tobytes(), media_type="application/octet-stream", headers=headers)
+    return Response(content=spectrogram_tiles.encode_png(image), media_type="image/png", headers=headers)
+
+
+# Declared before /analyze/{file_id} so "batch" is not taken for a file id
+@router.post("/analyze/batch", response_model=BatchAnalysisResponse)
+def analyze_batch(
+    batch_request: BatchAnalysisRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Analyze several audio files in one request, e.g. all tracks of an album
+    
+    - **file_ids**: Audio files to analyze
+    - **analysis_types**: Analysis types to run on every file
+    - **priority**: Scheduling lane; defaults to batch, which yields to interactive requests
+    
+    Permissions and stored results of all files are checked with one query.
+    Analyses already stored are reported as completed and analyses already
+    running are reported with their job. Only the remaining ones are queued,
+    under one batch job; poll ``GET /jobs/{job_id}`` for the status of each
+    analysis. Responds with 202 while any analysis is pending.
+    """
+    _check_priority(batch_request.priority)
+    analysis_types = list(dict.fromkeys(batch_request.analysis_types))
+    unknown_types = [t for t in analysis_types if t not in ANALYSIS_TYPES]
+    if unknown_types:
+        raise HTTPException(status_code=400, detail=f"Unknown analysis types: {', '.join(unknown_types)}")
+    
+    file_ids = list(dict.fromkeys(batch_request.file_ids))
+    files = audio_file.get_with_analysis_types(db=db, ids=file_ids, analysis_types=analysis_types)
+    missing_ids = [i for i in file_ids if i not in files]
+    if missing_ids:
+        raise HTTPException(
+            status_code=404, detail=f"Audio files not found: {', '.join(map(str, missing_ids))}"
+        )
+    
+    if not current_user.is_superuser and any(f.user_id != current_user.id for f, _ in files.values()):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    active_jobs = job.get_active_analyses(db=db, audio_file_ids=file_ids, analysis_types=analysis_types)
+    to_run = [
+        (files[file_id][0], analysis_type)
+        for file_id in file_ids
+        for analysis_type in analysis_types
+        if analysis_type not in files[file_id][1] and (file_id, analysis_type) not in active_jobs
+    ]
+    
+    batch_job = None
+    if to_run:
+        try:
+            batch_job = start_batch_analysis(
+                db, to_run, current_user.id, batch_request.ai_service, batch_request.priority
+            )
+        except IntegrityError:
+            raise HTTPException(status_code=409, detail="Some analyses were queued concurrently, please retry")
+        except Exception:
+            raise HTTPException(status_code=503, detail="Analysis queue unavailable")
+        active_jobs.update({(stage.audio_file_id, stage.analysis_type): stage for stage in batch_job.stages})
+    
+    items = []
+    for file_id in file_ids:
+        for analysis_type in analysis_types:
+            if analysis_type in files[file_id][1]:
+                items.append(AnalysisJobResponse(
+                    file_id=str(file_id), analysis_type=analysis_type, status=JOB_COMPLETED
+                ))
+            else:
+                db_job = active_jobs[(file_id, analysis_type)]
+                items.append(AnalysisJobResponse(
+                    job_id=db_job.id, file_id=str(file_id), analysis_type=analysis_type, status=db_job.status
+                ))
+    
+    statuses = {item.status for item in items}
+    if statuses == {JOB_COMPLETED}:
+        batch_status = JOB_COMPLETED
+    else:
+        response.status_code = status.HTTP_202_ACCEPTED
+        batch_status = JOB_RUNNING if JOB_RUNNING in statuses else JOB_PENDING
+    
+    return BatchAnalysisResponse(
+        job_id=batch_job.id if batch_job else None, status=batch_status, items=items
+    )
+
+
+@router.post("/analyze/{file_id}", response_model=AnalysisJobResponse)
+def analyze_audio_file(
+    file_id: int,
+    response: Response,
     analysis_request: AIAnalysisRequest = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -127,6 +760,10 @@ async def analyze_audio_file(
     
     - **analysis_type**: Type of analysis to perform (general, music_theory, production_feedback, arrangement_analysis)
     - **ai_service**: AI service to use (gemini, openai, or None for default)
+    
+    Returns the stored result if the file was already analyzed. Otherwise the
+    analysis is queued and a job id is returned with status 202; poll
+    ``GET /jobs/{job_id}`` for progress and the result.
     """
     # Get the audio file
     db_file = audio_file.get(db=db, id=file_id)
@@ -137,78 +774,34 @@ async def analyze_audio_file(
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     analysis_type = analysis_request.analysis_type
-    ai_service_name = analysis_request.ai_service
+    ai_service = analysis_request.ai_service
     
-    existing_analysis = analysis_result.get_by_type(
-        db=db, audio_file_id=file_id, analysis_type=analysis_type
+    return _enqueue_analysis(
+        db, db_file, analysis_type, ai_service, current_user.id, response, analysis_request.priority
     )
-    
-    if existing_analysis:
-        result = existing_analysis.result
-        return AudioAnalysisResponse(
-            file_id=str(db_file.id),
-            key=result.get("key", "C"),
-            tempo=result.get("tempo", 120.0),
-            time_signature=result.get("time_signature", "4/4"),
-            downbeats=result.get("downbeats", []),
-            genre=result.get("genre"),
-            sound_quality=result.get("sound_quality"),
-            suggestions=result.get("suggestions")
-        )
-    
-    try:
-        start_time = time.time()
-        
-        analysis_result_data = analyze_audio(
-            file_path=db_file.file_path,
-            analysis_type=analysis_type,
-            ai_service=ai_service_name
-        )
-        
-        processing_time = time.time() - start_time
-        
-        analysis_data = AnalysisResultCreate(
-            audio_file_id=file_id,
-            analysis_type=analysis_type,
-            result=analysis_result_data,
-            confidence=analysis_result_data.get("confidence", 0.85),
-            processing_time=processing_time,
-            notes=f"AI analysis using {ai_service_name or 'default'} service"
-        )
-        
-        analysis_obj = analysis_result.create(db=db, obj_in=analysis_data)
-        
-        return AudioAnalysisResponse(
-            file_id=str(db_file.id),
-            key=analysis_result_data.get("key", "C Major"),
-            tempo=analysis_result_data.get("tempo", 120.0),
-            time_signature=analysis_result_data.get("time_signature", "4/4"),
-            downbeats=analysis_result_data.get("downbeats", []),
-            genre=analysis_result_data.get("genre"),
-            sound_quality=analysis_result_data.get("sound_quality"),
-            suggestions=analysis_result_data.get("suggestions")
-        )
-    except Exception as e:
-        logger.error(f"Error analyzing file: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error analyzing file: {str(e)}")
 
 
-@router.post("/analyze/music-theory/{file_id}", response_model=MusicTheoryAnalysisResponse)
-async def analyze_music_theory(
+@router.post("/analyze/music-theory/{file_id}", response_model=AnalysisJobResponse)
+def analyze_music_theory(
     file_id: int,
-    background_tasks: BackgroundTasks,
+    response: Response,
     ai_service: Optional[str] = Query(None, description="AI service to use (gemini, openai, or None for default)"),
+    priority: str = Query("interactive", description="Scheduling lane (interactive or batch)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Analyze music theory aspects of an audio file
     
-    Returns detailed music theory analysis including:
+    The analysis covers:
     - Key and scale identification
     - Chord progression analysis
     - Harmonic structure
     - Suggestions for complementary chords
+    
+    Returns the stored result if the file was already analyzed. Otherwise the
+    analysis is queued and a job id is returned with status 202; poll
+    ``GET /jobs/{job_id}`` for progress and the result.
     """
     # Get the audio file
     db_file = audio_file.get(db=db, id=file_id)
@@ -218,80 +811,30 @@ async def analyze_music_theory(
     if db_file.user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    analysis_type = "music_theory"
-    
-    existing_analysis = analysis_result.get_by_type(
-        db=db, audio_file_id=file_id, analysis_type=analysis_type
-    )
-    
-    if existing_analysis:
-        result = existing_analysis.result
-        return MusicTheoryAnalysisResponse(
-            file_id=str(db_file.id),
-            key=result.get("key", "C Major"),
-            tempo=result.get("tempo", 120.0),
-            time_signature=result.get("time_signature", "4/4"),
-            downbeats=result.get("downbeats", []),
-            scale=result.get("scale"),
-            chord_progression=result.get("chord_progression"),
-            harmonic_analysis=result.get("harmonic_analysis"),
-            suggestions=result.get("suggestions")
-        )
-    
-    try:
-        start_time = time.time()
-        
-        analysis_result_data = analyze_audio(
-            file_path=db_file.file_path,
-            analysis_type=analysis_type,
-            ai_service=ai_service
-        )
-        
-        processing_time = time.time() - start_time
-        
-        analysis_data = AnalysisResultCreate(
-            audio_file_id=file_id,
-            analysis_type=analysis_type,
-            result=analysis_result_data,
-            confidence=analysis_result_data.get("confidence", 0.85),
-            processing_time=processing_time,
-            notes=f"Music theory analysis using {ai_service or 'default'} service"
-        )
-        
-        analysis_obj = analysis_result.create(db=db, obj_in=analysis_data)
-        
-        return MusicTheoryAnalysisResponse(
-            file_id=str(db_file.id),
-            key=analysis_result_data.get("key", "C Major"),
-            tempo=analysis_result_data.get("tempo", 120.0),
-            time_signature=analysis_result_data.get("time_signature", "4/4"),
-            downbeats=analysis_result_data.get("downbeats", []),
-            scale=analysis_result_data.get("scale"),
-            chord_progression=analysis_result_data.get("chord_progression"),
-            harmonic_analysis=analysis_result_data.get("harmonic_analysis"),
-            suggestions=analysis_result_data.get("suggestions")
-        )
-    except Exception as e:
-        logger.error(f"Error analyzing music theory: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error analyzing music theory: {str(e)}")
+    return _enqueue_analysis(db, db_file, "music_theory", ai_service, current_user.id, response, priority)
 
 
-@router.post("/analyze/production/{file_id}", response_model=ProductionFeedbackResponse)
-async def analyze_production(
+@router.post("/analyze/production/{file_id}", response_model=AnalysisJobResponse)
+def analyze_production(
     file_id: int,
-    background_tasks: BackgroundTasks,
+    response: Response,
     ai_service: Optional[str] = Query(None, description="AI service to use (gemini, openai, or None for default)"),
+    priority: str = Query("interactive", description="Scheduling lane (interactive or batch)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Analyze production aspects of an audio file
     
-    Returns detailed production feedback including:
+    The analysis covers:
     - Mix balance assessment
     - EQ recommendations
     - Dynamic processing suggestions
     - Spatial effects recommendations
+    
+    Returns the stored result if the file was already analyzed. Otherwise the
+    analysis is queued and a job id is returned with status 202; poll
+    ``GET /jobs/{job_id}`` for progress and the result.
     """
     # Get the audio file
     db_file = audio_file.get(db=db, id=file_id)
@@ -301,82 +844,30 @@ async def analyze_production(
     if db_file.user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    analysis_type = "production_feedback"
-    
-    existing_analysis = analysis_result.get_by_type(
-        db=db, audio_file_id=file_id, analysis_type=analysis_type
-    )
-    
-    if existing_analysis:
-        result = existing_analysis.result
-        return ProductionFeedbackResponse(
-            file_id=str(db_file.id),
-            key=result.get("key", "C Major"),
-            tempo=result.get("tempo", 120.0),
-            time_signature=result.get("time_signature", "4/4"),
-            downbeats=result.get("downbeats", []),
-            mix_balance=result.get("mix_balance"),
-            eq_recommendations=result.get("eq_recommendations"),
-            dynamics_suggestions=result.get("dynamics_suggestions"),
-            spatial_recommendations=result.get("spatial_recommendations"),
-            suggestions=result.get("suggestions")
-        )
-    
-    try:
-        start_time = time.time()
-        
-        analysis_result_data = analyze_audio(
-            file_path=db_file.file_path,
-            analysis_type=analysis_type,
-            ai_service=ai_service
-        )
-        
-        processing_time = time.time() - start_time
-        
-        analysis_data = AnalysisResultCreate(
-            audio_file_id=file_id,
-            analysis_type=analysis_type,
-            result=analysis_result_data,
-            confidence=analysis_result_data.get("confidence", 0.85),
-            processing_time=processing_time,
-            notes=f"Production feedback analysis using {ai_service or 'default'} service"
-        )
-        
-        analysis_obj = analysis_result.create(db=db, obj_in=analysis_data)
-        
-        return ProductionFeedbackResponse(
-            file_id=str(db_file.id),
-            key=analysis_result_data.get("key", "C Major"),
-            tempo=analysis_result_data.get("tempo", 120.0),
-            time_signature=analysis_result_data.get("time_signature", "4/4"),
-            downbeats=analysis_result_data.get("downbeats", []),
-            mix_balance=analysis_result_data.get("mix_balance"),
-            eq_recommendations=analysis_result_data.get("eq_recommendations"),
-            dynamics_suggestions=analysis_result_data.get("dynamics_suggestions"),
-            spatial_recommendations=analysis_result_data.get("spatial_recommendations"),
-            suggestions=analysis_result_data.get("suggestions")
-        )
-    except Exception as e:
-        logger.error(f"Error analyzing production: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error analyzing production: {str(e)}")
+    return _enqueue_analysis(db, db_file, "production_feedback", ai_service, current_user.id, response, priority)
 
 
-@router.post("/analyze/arrangement/{file_id}", response_model=ArrangementAnalysisResponse)
-async def analyze_arrangement(
+@router.post("/analyze/arrangement/{file_id}", response_model=AnalysisJobResponse)
+def analyze_arrangement(
     file_id: int,
-    background_tasks: BackgroundTasks,
+    response: Response,
     ai_service: Optional[str] = Query(None, description="AI service to use (gemini, openai, or None for default)"),
+    priority: str = Query("interactive", description="Scheduling lane (interactive or batch)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Analyze arrangement aspects of an audio file
     
-    Returns detailed arrangement analysis including:
+    The analysis covers:
     - Structure identification
     - Instrumentation assessment
     - Energy flow analysis
     - Arrangement improvement suggestions
+    
+    Returns the stored result if the file was already analyzed. Otherwise the
+    analysis is queued and a job id is returned with status 202; poll
+    ``GET /jobs/{job_id}`` for progress and the result.
     """
     # Get the audio file
     db_file = audio_file.get(db=db, id=file_id)
@@ -386,73 +877,219 @@ async def analyze_arrangement(
     if db_file.user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    analysis_type = "arrangement_analysis"
+    return _enqueue_analysis(db, db_file, "arrangement_analysis", ai_service, current_user.id, response, priority)
+
+
+@router.post("/analyze/full/{file_id}", response_model=FullAnalysisResponse)
+async def analyze_full_report(
+    file_id: int,
+    analysis_types: List[str] = Query(
+        ANALYSIS_TYPES,
+        description="Analysis types to include (general, music_theory, production_feedback, arrangement_analysis)"
+    ),
+    ai_service: Optional[str] = Query(None, description="AI service to use (gemini, openai, or None for default)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Run several analyses of an audio file with a single AI request
     
-    existing_analysis = analysis_result.get_by_type(
-        db=db, audio_file_id=file_id, analysis_type=analysis_type
-    )
+    Analysis types that were already stored are returned as-is. All missing
+    types are requested from the AI service in one combined prompt and stored
+    as one analysis result per type. A failed analysis is not stored and
+    fails the request: 404 if the audio is missing on disk, 502 otherwise.
     
-    if existing_analysis:
-        result = existing_analysis.result
-        return ArrangementAnalysisResponse(
-            file_id=str(db_file.id),
-            key=result.get("key", "C Major"),
-            tempo=result.get("tempo", 120.0),
-            time_signature=result.get("time_signature", "4/4"),
-            downbeats=result.get("downbeats", []),
-            structure=result.get("structure"),
-            instrumentation=result.get("instrumentation"),
-            energy_flow=result.get("energy_flow"),
-            suggestions=result.get("suggestions")
-        )
+    Unlike the single-type endpoints this runs in the API process, sharing
+    in-flight analyses with the streaming endpoint; at most
+    INPROCESS_ANALYSIS_MAX_CONCURRENCY feature extractions run at once.
+    """
+    unknown_types = [t for t in analysis_types if t not in ANALYSIS_TYPES]
+    if unknown_types:
+        raise HTTPException(status_code=400, detail=f"Unknown analysis types: {', '.join(unknown_types)}")
+    
+    db_file = await audio_file.get_async(db=db, id=file_id)
+    if not db_file:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    
+    if db_file.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
     
     try:
-        start_time = time.time()
-        
-        analysis_result_data = analyze_audio(
-            file_path=db_file.file_path,
-            analysis_type=analysis_type,
-            ai_service=ai_service
-        )
-        
-        processing_time = time.time() - start_time
-        
-        analysis_data = AnalysisResultCreate(
-            audio_file_id=file_id,
-            analysis_type=analysis_type,
-            result=analysis_result_data,
-            confidence=analysis_result_data.get("confidence", 0.85),
-            processing_time=processing_time,
-            notes=f"Arrangement analysis using {ai_service or 'default'} service"
+        results = await _get_or_run_analyses(
+            db, db_file, list(dict.fromkeys(analysis_types)), ai_service
         )
+        return FullAnalysisResponse(file_id=str(db_file.id), results=results)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error running combined analysis: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error running combined analysis: {str(e)}")
+
+
+@router.post("/pipeline/{file_id}", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+def run_pipeline(
+    file_id: int,
+    ai_service: Optional[str] = Query(None, description="AI service to use (gemini, openai, or None for default)"),
+    priority: str = Query("interactive", description="Scheduling lane (interactive or batch)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Run the full processing pipeline on an audio file
+    
+    Ingests the file, extracts features and separates stems in parallel,
+    transcribes each stem to MIDI and finishes with the AI report. Returns the
+    pipeline job with one stage job per task; poll ``GET /jobs/{job_id}``.
+    A pipeline already running for the file is returned instead of a new one.
+    Starting it again after a failure reuses the artifacts of completed stages.
+    
+    - **priority**: interactive for single requests, batch for bulk processing;
+      batch pipelines are shared fairly between users and yield to interactive ones
+    """
+    db_file = audio_file.get(db=db, id=file_id)
+    if not db_file:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    
+    if db_file.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    _check_priority(priority)
+    
+    db_job = job.get_active(db=db, audio_file_id=db_file.id, job_type="pipeline")
+    if db_job is not None:
+        return db_job
+    
+    try:
+        return start_pipeline(db, db_file, current_user.id, ai_service, priority)
+    except Exception:
+        raise HTTPException(status_code=503, detail="Processing queue unavailable")
+
+
+@router.get("/analyze/stream/{file_id}")
+async def stream_analysis(
+    file_id: int,
+    analysis_type: str = Query("general", description="Type of analysis to perform"),
+    ai_service: Optional[str] = Query(None, description="AI service to use (gemini, openai, or None for default)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Stream an AI analysis of an audio file as Server-Sent Events
+    
+    Emits ``status`` events while the audio is processed, ``token`` events with
+    generated text as it arrives and a final ``result`` event with the parsed
+    analysis, which is stored like the other analysis endpoints. A previously
+    stored analysis is sent as a single ``result`` event, and an analysis job
+    already queued for the file is followed instead of starting another one.
+    An ``error`` event ends a stream whose analysis failed; failed analyses
+    are not stored, so the next request runs them again.
+    
+    Concurrent viewers share one analysis, which runs to completion and is
+    stored even if every viewer disconnects.
+    """
+    if analysis_type not in ANALYSIS_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown analysis type: {analysis_type}")
+    
+    db_file = await audio_file.get_async(db=db, id=file_id)
+    if not db_file:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    
+    if db_file.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    existing_analysis = await analysis_result.get_by_type_async(
+        db=db, audio_file_id=db_file.id, analysis_type=analysis_type
+    )
+    audio_file_id, file_path = db_file.id, db_file.file_path
+    
+    if existing_analysis:
+        existing_result = existing_analysis.result
         
-        analysis_obj = analysis_result.create(db=db, obj_in=analysis_data)
+        async def stored_events():
+            yield {"event": "result", "result": existing_result}
         
-        return ArrangementAnalysisResponse(
-            file_id=str(db_file.id),
-            key=analysis_result_data.get("key", "C Major"),
-            tempo=analysis_result_data.get("tempo", 120.0),
-            time_signature=analysis_result_data.get("time_signature", "4/4"),
-            downbeats=analysis_result_data.get("downbeats", []),
-            structure=analysis_result_data.get("structure"),
-            instrumentation=analysis_result_data.get("instrumentation"),
-            energy_flow=analysis_result_data.get("energy_flow"),
-            suggestions=analysis_result_data.get("suggestions")
+        events = stored_events()
+    else:
+        db_job = await job.get_active_async(
+            db=db, audio_file_id=audio_file_id, job_type="analysis", analysis_type=analysis_type
         )
-    except Exception as e:
-        logger.error(f"Error analyzing arrangement: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error analyzing arrangement: {str(e)}")
+        if db_job is not None:
+            job_id = db_job.id
+            events = analysis_streams.subscribe(f"job:{job_id}", lambda broadcast: _follow_job(broadcast, job_id))
+        else:
+            key = f"{audio_file_id}:{analysis_type}"
+            
+            async def get_stored() -> Optional[Dict[str, Any]]:
+                async with get_async_session_factory()() as session:
+                    stored = await analysis_result.get_by_type_async(
+                        db=session, audio_file_id=audio_file_id, analysis_type=analysis_type
+                    )
+                    return stored.result if stored else None
+            
+            async def produce(broadcast: Broadcast) -> None:
+                async def run_analysis() -> Dict[str, Any]:
+                    start_time = time.time()
+                    result = None
+                    async for event in stream_audio_analysis(file_path, analysis_type, ai_service):
+                        if event["event"] == "result":
+                            result = event["result"]
+                            if "error" in result:
+                                # Not stored, so the next request retries the analysis
+                                raise _analysis_error(result)
+                            await asyncio.to_thread(
+                                _store_analysis_result,
+                                audio_file_id,
+                                analysis_type,
+                                result,
+                                time.time() - start_time,
+                                f"Streamed {analysis_type} analysis using {ai_service or 'default'} service"
+                            )
+                        await broadcast.publish(event)
+                    return result
+                
+                # Shares the flight of the other analysis endpoints; if another request is
+                # already running this analysis, only its result is sent
+                try:
+                    result = await analysis_flight.run(key, run_analysis, get_stored)
+                except HTTPException as e:
+                    await broadcast.publish({"event": "error", "detail": e.detail})
+                    return
+                if not broadcast.events or broadcast.events[-1]["event"] != "result":
+                    await broadcast.publish({"event": "result", "result": result})
+            
+            events = analysis_streams.subscribe(key, produce)
+    
+    async def event_stream():
+        async for event in events:
+            if event["event"] == "result":
+                yield _sse_event("result", event["result"])
+            else:
+                yield _sse_event(event["event"], {k: v for k, v in event.items() if k != "event"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/analysis/{file_id}", response_model=List[AnalysisResultSchema])
 def get_analysis_results(
     file_id: int,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return; leave out result to skip the result JSON"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Get all analysis results for a specific audio file
+    Get the analysis results of a specific audio file, newest first
     """
+    field_list = parse_fields(fields, list(AnalysisResultSchema.__fields__))
+    
     # Get the audio file
     db_file = audio_file.get(db=db, id=file_id)
     if not db_file:
@@ -461,8 +1098,10 @@ def get_analysis_results(
     if db_file.user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    results = analysis_result.get_by_audio_file(db=db, audio_file_id=file_id)
-    return results
+    results = analysis_result.get_page_by_audio_file(
+        db=db, audio_file_id=file_id, after=decode_cursor(cursor), limit=limit, columns=field_list
+    )
+    return page_response(response, results, limit, field_list)
 
 
 @router.delete("/files/{file_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -472,7 +1111,9 @@ def delete_audio_file(
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Delete an audio file and its analysis results
+    Delete an audio file, its analysis results and its pipeline artifacts
+    
+    Pending and running jobs for the file are cancelled.
     """
     # Get the audio file
     db_file = audio_file.get(db=db, id=file_id)
@@ -482,12 +1123,19 @@ def delete_audio_file(
     if db_file.user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
+    # Stop queued and running work for the file before its data disappears
+    for db_job in job.get_active_by_audio_file(db=db, audio_file_id=file_id):
+        cancel_job(db, db_job)
+    
     try:
         if os.path.exists(db_file.file_path):
             os.remove(db_file.file_path)
     except Exception as e:
         logger.error(f"Error deleting file {db_file.file_path}: {e}")
     
+    artifact_store.delete_artifacts(file_id)
+    spectrogram_tiles.tile_cache.evict_prefix(str(file_id))
+    
     audio_file.remove(db=db, id=file_id)
     
     return None
@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 from app.core.security import create_access_token
 from app.core.config import settings
-from app.db.base import get_db
+from app.db.base import get_async_db
 from app.crud.user import user
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, User
@@ -13,13 +13,15 @@ from app.schemas.user import UserCreate, User
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login_access_token(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login_access_token(
+    db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     OAuth2 compatible token login, get an access token for future requests
+
+    Password verification runs in the password hashing pool, off the event loop.
     """
-    user_obj = user.authenticate(
+    user_obj = await user.authenticate_async(
         db, email=form_data.username, password=form_data.password
     )
     if not user_obj:
@@ -41,20 +43,20 @@ def login_access_token(
     }
 
 @router.post("/register", response_model=User)
-def register_user(*, db: Session = Depends(get_db), user_in: UserCreate):
+async def register_user(*, db: AsyncSession = Depends(get_async_db), user_in: UserCreate):
     """
     Register a new user
     """
-    user_obj = user.get_by_email(db, email=user_in.email)
+    user_obj = await user.get_by_email_async(db, email=user_in.email)
     if user_obj:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A user with this email already exists",
         )
-    user_obj = user.get_by_username(db, username=user_in.username)
+    user_obj = await user.get_by_username_async(db, username=user_in.username)
     if user_obj:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A user with this username already exists",
         )
-    return user.create(db=db, obj_in=user_in)
+    return await user.create_async(db=db, obj_in=user_in)
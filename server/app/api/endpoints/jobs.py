@@ -0,0 +1,77 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db.base import get_db
+from app.api.deps import get_current_active_user
+from app.models.user import User
+from app.crud.job import job
+from app.schemas.job import Job, QueueWaitStats
+from app.tasks.tracking import cancel_job
+
+router = APIRouter()
+
+
+@router.get("/wait-times", response_model=QueueWaitStats)
+def get_queue_wait_times(
+    user_id: Optional[int] = Query(None, description="User to report on; superusers only, omit for all users"),
+    window_seconds: int = Query(3600, ge=60, le=7 * 24 * 3600, description="Window for started jobs"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get queue wait times per priority lane
+    
+    The wait of a job is the time from submission until a worker started it.
+    Users see their own jobs; superusers can see any user's or all jobs.
+    """
+    if not current_user.is_superuser:
+        if user_id is not None and user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        user_id = current_user.id
+    
+    lanes = job.get_wait_stats(db=db, user_id=user_id, window_seconds=window_seconds)
+    return QueueWaitStats(user_id=user_id, window_seconds=window_seconds, lanes=lanes)
+
+
+@router.get("/{job_id}", response_model=Job)
+def get_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get the status, progress and result of a processing job
+    """
+    db_job = job.get(db=db, id=job_id)
+    if not db_job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if db_job.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return db_job
+
+
+@router.post("/{job_id}/cancel", response_model=Job)
+def cancel_processing_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Cancel a pending or running job
+    
+    Queued work is dropped and running tasks stop at their next checkpoint,
+    e.g. after the current separation chunk. Cancelling a pipeline cancels its
+    remaining stages. Finished jobs are returned unchanged.
+    """
+    db_job = job.get(db=db, id=job_id)
+    if not db_job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if db_job.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return cancel_job(db, db_job)
@@ -0,0 +1,270 @@
+"""
+Resumable uploads for large audio files.
+
+A tus-style protocol: the client creates an upload session with the file's
+size, sends byte ranges with PATCH and an Upload-Offset header, asks for the
+current offset with HEAD after an interruption, and completes the session to
+get an audio file. Chunks are written straight to their offset in the target
+file, so they may be sent in parallel and in any order.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import get_db, get_async_db
+from app.api.deps import get_current_active_user
+from app.models.user import User
+from app.models.upload import UploadSession, UPLOAD_COMPLETED
+from app.crud.audio import audio_file
+from app.crud.upload import upload_session
+from app.services import upload_store
+from app.schemas.audio import AudioFileCreate, AudioUploadResponse
+from app.schemas.upload import UploadSessionCreate, UploadSession as UploadSessionSchema
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def _part_path(db_session: UploadSession) -> str:
+    return f"{db_session.file_path}.part"
+
+
+def _remove_part(db_session: UploadSession) -> None:
+    try:
+        os.remove(_part_path(db_session))
+    except OSError:
+        pass
+
+
+def _offset_headers(db_session: UploadSession) -> dict:
+    return {
+        "Upload-Offset": str(db_session.offset),
+        "Upload-Length": str(db_session.total_size),
+        "Cache-Control": "no-store",
+    }
+
+
+def _is_expired(db_session: UploadSession) -> bool:
+    expires_at = db_session.expires_at
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return db_session.status != UPLOAD_COMPLETED and expires_at < datetime.now(timezone.utc)
+
+
+def _get_session(db: Session, upload_id: str, user: User) -> UploadSession:
+    """Return an upload session of the user, or raise 404/410."""
+    db_session = upload_session.get(db=db, id=upload_id)
+    if not db_session or db_session.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    if _is_expired(db_session):
+        _remove_part(db_session)
+        upload_session.remove(db=db, id=db_session.id)
+        raise HTTPException(status_code=410, detail="Upload expired")
+
+    return db_session
+
+
+async def _get_session_async(db: AsyncSession, upload_id: str, user: User) -> UploadSession:
+    """Async variant of _get_session for the chunk and completion handlers."""
+    db_session = await upload_session.get_async(db=db, id=upload_id)
+    if not db_session or db_session.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    if _is_expired(db_session):
+        await asyncio.to_thread(_remove_part, db_session)
+        await upload_session.remove_async(db=db, id=db_session.id)
+        raise HTTPException(status_code=410, detail="Upload expired")
+
+    return db_session
+
+
+@router.post("", response_model=UploadSessionSchema, status_code=status.HTTP_201_CREATED)
+def create_upload(
+    upload_in: UploadSessionCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Start a resumable upload
+
+    Allocates the target file and returns the session, whose id is used to
+    send chunks. Sessions expire after UPLOAD_SESSION_TTL_SECONDS without activity.
+    """
+    if upload_in.content_type and not upload_in.content_type.startswith("audio/"):
+        raise HTTPException(status_code=400, detail="File must be an audio file")
+
+    if upload_in.size > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    for expired in upload_session.get_expired(db=db, user_id=current_user.id):
+        _remove_part(expired)
+        upload_session.remove(db=db, id=expired.id)
+
+    upload_id = str(uuid.uuid4())
+    file_extension = os.path.splitext(upload_in.filename)[1]
+    file_path = os.path.join(upload_store.UPLOAD_DIR, f"{upload_id}{file_extension}")
+
+    try:
+        upload_store.allocate(f"{file_path}.part", upload_in.size)
+    except Exception as e:
+        logger.error(f"Error allocating upload {upload_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error saving file")
+
+    db_session = upload_session.create_session(
+        db=db, id=upload_id, user_id=current_user.id, obj_in=upload_in, file_path=file_path
+    )
+    response.headers["Location"] = f"{settings.API_V1_STR}/uploads/{upload_id}"
+    return db_session
+
+
+@router.head("/{upload_id}")
+def get_upload_offset(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get the number of bytes received contiguously from the start of the file
+    """
+    db_session = _get_session(db, upload_id, current_user)
+    return Response(status_code=200, headers=_offset_headers(db_session))
+
+
+@router.get("/{upload_id}", response_model=UploadSessionSchema)
+def get_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get an upload session, including every byte range received so far
+    """
+    return _get_session(db, upload_id, current_user)
+
+
+@router.patch("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Write the request body into the file at Upload-Offset
+
+    Bytes received before a dropped connection are kept, so the client can
+    resume from the offset reported by HEAD.
+    """
+    db_session = await _get_session_async(db, upload_id, current_user)
+    if db_session.status == UPLOAD_COMPLETED:
+        raise HTTPException(status_code=409, detail="Upload already completed")
+
+    if upload_offset > db_session.total_size:
+        raise HTTPException(status_code=409, detail="Offset beyond the end of the file")
+
+    # End the read transaction instead of holding it open while the body streams in
+    await db.commit()
+
+    try:
+        written = await upload_store.write_stream_at(
+            request.stream(),
+            _part_path(db_session),
+            upload_offset,
+            max_bytes=db_session.total_size - upload_offset,
+        )
+    except upload_store.UploadTooLarge:
+        raise HTTPException(status_code=413, detail="Chunk extends beyond the end of the file")
+    except upload_store.UploadFinalized:
+        raise HTTPException(status_code=409, detail="Upload already completed")
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail="Upload expired")
+    except Exception as e:
+        logger.error(f"Error writing chunk of upload {upload_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error saving file")
+
+    db_session = await upload_session.record_range_async(
+        db, id=upload_id, start=upload_offset, end=upload_offset + written
+    )
+    return Response(status_code=204, headers=_offset_headers(db_session))
+
+
+@router.post("/{upload_id}/complete", response_model=AudioUploadResponse)
+async def complete_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Finish an upload and create its audio file
+
+    Fails with 409 while any byte range is missing or a chunk is still being
+    written. Completing a finished upload again returns the same audio file.
+    """
+    db_session = await _get_session_async(db, upload_id, current_user)
+
+    # Lock the session so concurrent completions wait here, then see the upload completed
+    db_session = await upload_session.get_for_update_async(db, id=db_session.id)
+    if db_session is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    if db_session.status == UPLOAD_COMPLETED:
+        await db.commit()
+        db_file = await audio_file.get_async(db=db, id=db_session.audio_file_id)
+        if not db_file:
+            raise HTTPException(status_code=404, detail="Audio file not found")
+    else:
+        if db_session.offset < db_session.total_size:
+            raise HTTPException(status_code=409, detail=f"Upload incomplete at offset {db_session.offset}")
+
+        try:
+            file_size, content_hash = await asyncio.to_thread(
+                upload_store.finalize, _part_path(db_session), db_session.file_path
+            )
+        except upload_store.UploadInProgress:
+            raise HTTPException(status_code=409, detail="Chunks are still being written")
+        except Exception as e:
+            logger.error(f"Error finalizing upload {upload_id}: {str(e)}")
+            raise HTTPException(status_code=500, detail="Error saving file")
+
+        db_file = await upload_session.complete_async(db=db, db_obj=db_session, file_in=AudioFileCreate(
+            filename=db_session.filename,
+            file_path=db_session.file_path,
+            file_size=file_size,
+            format=os.path.splitext(db_session.filename)[1].lstrip('.'),
+            content_hash=content_hash,
+            user_id=current_user.id
+        ))
+
+    return AudioUploadResponse(
+        file_id=str(db_file.id),
+        filename=db_file.filename,
+        file_path=db_file.file_path,
+        file_size=db_file.file_size,
+        content_hash=db_file.content_hash
+    )
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def abort_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Abort an upload and discard the bytes received so far
+    """
+    db_session = _get_session(db, upload_id, current_user)
+    if db_session.status != UPLOAD_COMPLETED:
+        _remove_part(db_session)
+    upload_session.remove(db=db, id=db_session.id)
+    return Response(status_code=204)
@@ -9,6 +9,7 @@ from app.crud.user import user
 from app.db.base import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, User as UserSchema
+from app.services.user_cache import get_user_cache
 
 router = APIRouter()
 
@@ -78,6 +79,7 @@ def update_user_me(
     if email is not None:
         user_in.email = email
     user_obj = user.update(db, db_obj=current_user, obj_in=user_in)
+    get_user_cache().invalidate(user_obj.id)
     return user_obj
 
 
@@ -118,4 +120,5 @@ def update_user(
             detail="The user with this id does not exist in the system",
         )
     user_obj = user.update(db, db_obj=user_obj, obj_in=user_in)
+    get_user_cache().invalidate(user_obj.id)
     return user_obj
@@ -0,0 +1,92 @@
+"""
+Keyset pagination and field projection for listing endpoints.
+
+Listings are ordered newest first by (created_at, id). A page ends with an
+opaque cursor naming its last row; the next page starts strictly after it, so
+fetching page n costs the same as page 1 however large the table grows. The
+cursor of the next page is sent in the X-Next-Cursor header, which keeps the
+response body a plain list.
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Encode the position of a row as an opaque, URL-safe cursor."""
+    raw = f"{created_at.isoformat()}|{id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """
+    Decode a cursor from encode_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated fields= parameter.
+
+    Args:
+        fields: Requested fields, or None for every field
+        allowed: Fields of the response schema, in output order
+
+    Returns:
+        Requested fields in schema order, or None for every field
+
+    Raises:
+        HTTPException: 400 for unknown fields
+    """
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [f for f in allowed if f in requested]
+
+
+def set_next_cursor(response: Response, rows: Sequence[Any], limit: int) -> None:
+    """Send the cursor after the last row if the page is full, i.e. more rows may follow."""
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+
+
+def project(rows: Iterable[Any], fields: List[str]) -> List[Dict[str, Any]]:
+    """Serialize rows keeping only the requested fields."""
+    return jsonable_encoder([{field: getattr(row, field) for field in fields} for row in rows])
+
+
+def page_response(response: Response, rows: Sequence[Any], limit: int, fields: Optional[List[str]]) -> Any:
+    """
+    Return a page from an endpoint, with the next cursor header.
+
+    Rows are returned as-is for the endpoint's response model, or projected
+    to fields if given, bypassing the response model.
+    """
+    if fields is not None:
+        response = JSONResponse(project(rows, fields))
+    set_next_cursor(response, rows, limit)
+    return response if fields is not None else rows
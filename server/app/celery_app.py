@@ -1,9 +1,12 @@
 from celery import Celery
+from kombu import Queue
+
+from app.core.config import settings
 
 celery_app = Celery(
     "tokoroten",
-    broker="redis://redis:6379/0",
-    backend="redis://redis:6379/0",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
     include=[
         "app.tasks.audio_analysis",
         "app.tasks.source_separation",
@@ -12,10 +15,53 @@ celery_app = Celery(
     ],
 )
 
+# Make shared tasks resolve to this app in every thread, including FastAPI's threadpool
+celery_app.set_default()
+
+# One queue per workload class so long jobs never sit in front of short ones.
+# See docker-compose.yml for the worker profile consuming each queue.
+QUEUE_SEPARATION = "separation"  # Demucs, CPU/GPU heavy, minutes per task
+QUEUE_TRANSCRIPTION = "transcription"  # Audio-to-MIDI, CPU heavy
+QUEUE_ANALYSIS = "analysis"  # librosa feature extraction, seconds per task
+QUEUE_LLM = "llm"  # I/O-bound AI provider calls
+
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    # Messages and results only carry ids, small dicts and artifact references:
+    # large outputs (features, stems, MIDI, reports) go to the artifact store
+    # and the database, see app.services.artifact_store. msgpack keeps the
+    # rest compact; json is still accepted for messages queued before the switch.
+    task_serializer="msgpack",
+    accept_content=["msgpack", "json"],
+    result_serializer="msgpack",
+    result_accept_content=["msgpack", "json"],
+    # The job rows hold the durable state, so results only need to outlive their readers
+    result_expires=settings.CELERY_RESULT_EXPIRES,
     timezone="UTC",
     enable_utc=True,
+    task_queues=[
+        Queue(QUEUE_SEPARATION),
+        Queue(QUEUE_TRANSCRIPTION),
+        Queue(QUEUE_ANALYSIS),
+        Queue(QUEUE_LLM),
+    ],
+    task_default_queue=QUEUE_ANALYSIS,
+    task_routes={
+        "app.tasks.source_separation.*": {"queue": QUEUE_SEPARATION},
+        "app.tasks.transcription.*": {"queue": QUEUE_TRANSCRIPTION},
+        "app.tasks.audio_analysis.*": {"queue": QUEUE_ANALYSIS},
+        "app.tasks.ai_analysis_reporting.*": {"queue": QUEUE_LLM},
+    },
+    # Acknowledge after completion so a crashed worker's task is redelivered,
+    # and reserve one task at a time so long tasks don't hold others hostage
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    # Redis redelivers unacknowledged tasks after this; must exceed the longest task.
+    # Messages are split into priority buckets, consumed lowest number first
+    # (interactive 0, batch 6; see app/services/fair_scheduler.py)
+    broker_transport_options={
+        "visibility_timeout": settings.CELERY_VISIBILITY_TIMEOUT,
+        "priority_steps": [0, 3, 6, 9],
+    },
+    task_track_started=True,
 )
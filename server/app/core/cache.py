@@ -0,0 +1,175 @@
+"""
+Key-value cache backends with TTL and size-bounded eviction.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.redis_client import get_redis_client, mark_unavailable
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """Base class for string-valued cache backends."""
+
+    name = "base"
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError("Subclasses must implement this method")
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with per-entry expiry."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis cache backend.
+
+    Entries expire through Redis TTLs. A sorted set of insertion times per
+    namespace keeps the number of entries bounded by evicting the oldest ones.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, namespace: str, max_entries: int = 1000):
+        self.client = client
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._index_key = f"{namespace}:index"
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(self._key(key))
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        pipe = self.client.pipeline()
+        pipe.set(self._key(key), value, ex=ttl)
+        pipe.zadd(self._index_key, {key: time.time()})
+        pipe.zcard(self._index_key)
+        size = pipe.execute()[-1]
+
+        overflow = size - self.max_entries
+        if overflow > 0:
+            evicted = self.client.zpopmin(self._index_key, overflow)
+            if evicted:
+                self.client.delete(*[self._key(k) for k, _ in evicted])
+
+    def delete(self, key: str) -> None:
+        pipe = self.client.pipeline()
+        pipe.delete(self._key(key))
+        pipe.zrem(self._index_key, key)
+        pipe.execute()
+
+
+class FallbackCacheBackend(CacheBackend):
+    """
+    Redis cache that uses an in-process cache while Redis is unavailable.
+
+    The Redis connection is looked up on every call, so the cache moves to
+    Redis as soon as it becomes reachable, e.g. after a restart of Redis. A
+    Redis command that fails marks Redis unavailable, so the cache also falls
+    back to memory during an outage that starts after it connected.
+    """
+
+    def __init__(self, namespace: str, max_entries: int = 1000):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.memory = InMemoryCacheBackend(max_entries=max_entries)
+        self._redis: Optional[RedisCacheBackend] = None
+
+    @property
+    def name(self) -> str:
+        return self._backend().name
+
+    def _backend(self) -> CacheBackend:
+        client = get_redis_client()
+        if client is None:
+            return self.memory
+        if self._redis is None or self._redis.client is not client:
+            self._redis = RedisCacheBackend(client, namespace=self.namespace, max_entries=self.max_entries)
+        return self._redis
+
+    def _call(self, method: str, *args):
+        backend = self._backend()
+        if backend is self.memory:
+            return getattr(self.memory, method)(*args)
+        try:
+            return getattr(backend, method)(*args)
+        except Exception as e:
+            mark_unavailable(backend.client, e)
+            return getattr(self.memory, method)(*args)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._call("get", key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self._call("set", key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self._call("delete", key)
+
+
+def create_cache_backend(namespace: str, max_entries: int, backend: str = "redis") -> CacheBackend:
+    """
+    Create a cache backend, falling back to in-process storage while Redis is unavailable.
+
+    Args:
+        namespace: Key prefix for the Redis backend
+        max_entries: Maximum number of entries kept before evicting the oldest
+        backend: Preferred backend ('redis' or 'memory')
+
+    Returns:
+        CacheBackend instance
+    """
+    if backend == "redis":
+        return FallbackCacheBackend(namespace=namespace, max_entries=max_entries)
+
+    return InMemoryCacheBackend(max_entries=max_entries)
@@ -11,6 +11,16 @@ class Settings(BaseSettings):
     
     SECRET_KEY: str = os.getenv("SECRET_KEY", "")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+
+    # bcrypt cost factor; stored hashes with another cost are rehashed at login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    # Threads hashing and verifying passwords, shared by all requests of a process
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+    # Authenticated users cached by id; 0 disables the cache
+    USER_CACHE_BACKEND: str = os.getenv("USER_CACHE_BACKEND", "redis")  # "redis" or "memory"
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+    USER_CACHE_MAX_ENTRIES: int = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
     
     POSTGRES_SERVER: str = os.getenv("POSTGRES_SERVER", "db")
     POSTGRES_USER: str = os.getenv("POSTGRES_USER", "")
@@ -30,9 +40,86 @@ class Settings(BaseSettings):
             path=f"/{values.get('POSTGRES_DB') or ''}",
         )
 
+    # Connection pools, per process and per engine (sync and async); statement timeout 0 disables it
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a connection
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+    REDIS_URL: str = os.getenv(
+        "REDIS_URL",
+        f"redis://{os.getenv('REDIS_HOST', 'redis')}:{os.getenv('REDIS_PORT', '6379')}/0",
+    )
+    # Seconds before reconnecting after Redis was unreachable, doubled per failure up to the max
+    REDIS_RETRY_SECONDS: float = float(os.getenv("REDIS_RETRY_SECONDS", "5"))
+    REDIS_RETRY_MAX_SECONDS: float = float(os.getenv("REDIS_RETRY_MAX_SECONDS", "60"))
+
+    CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", REDIS_URL)
+    CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", REDIS_URL)
+    CELERY_VISIBILITY_TIMEOUT: int = int(os.getenv("CELERY_VISIBILITY_TIMEOUT", "7200"))  # Seconds
+    CELERY_RESULT_EXPIRES: int = int(os.getenv("CELERY_RESULT_EXPIRES", "3600"))  # Seconds; job rows keep the state
+
+    # Fair scheduling of processing jobs across users, see app/services/fair_scheduler.py.
+    # Capacity is the number of jobs of a class dispatched to the workers at once;
+    # the reserve is held back from batch work so interactive jobs start quickly.
+    # Override with JSON, e.g. SCHEDULER_CAPACITY='{"analysis": 16, "pipeline": 4}'
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    SCHEDULER_CAPACITY: Dict[str, int] = {"analysis": 8, "pipeline": 2}
+    SCHEDULER_INTERACTIVE_RESERVE: int = int(os.getenv("SCHEDULER_INTERACTIVE_RESERVE", "1"))
+    SCHEDULER_LANE_WEIGHTS: Dict[str, float] = {"interactive": 4.0, "batch": 1.0}
+
+    ARTIFACT_DIR: str = os.getenv("ARTIFACT_DIR", "artifacts")  # Stems, MIDI and reports per audio file
+
+    # Rendered spectrogram tiles, evicted least recently used first; local to each API replica
+    SPECTROGRAM_CACHE_DIR: str = os.getenv("SPECTROGRAM_CACHE_DIR", "cache/spectrogram")
+    SPECTROGRAM_CACHE_MAX_BYTES: int = int(os.getenv("SPECTROGRAM_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+    # Uploads are streamed to disk in chunks; larger uploads are rejected with 413
+    UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", str(1024 * 1024 * 1024)))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+    UPLOAD_SESSION_TTL_SECONDS: int = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", str(24 * 3600)))  # Resumable uploads
+
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
-    
+
+    # Feature extractions run by the streaming and combined analysis endpoints at once per API process
+    INPROCESS_ANALYSIS_MAX_CONCURRENCY: int = int(os.getenv("INPROCESS_ANALYSIS_MAX_CONCURRENCY", "2"))
+
+    # Lifetime of the cross-replica lock that coalesces identical analyses
+    SINGLE_FLIGHT_LOCK_TTL_SECONDS: float = float(os.getenv("SINGLE_FLIGHT_LOCK_TTL_SECONDS", "300"))
+
+    # Provider endpoints; point both at scripts/llm_stub_server.py for offline load tests
+    GEMINI_API_BASE_URL: str = os.getenv("GEMINI_API_BASE_URL", "https://generativelanguage.googleapis.com")
+    OPENAI_API_BASE_URL: Optional[str] = os.getenv("OPENAI_API_BASE_URL")  # None uses the SDK default
+
+    AI_MAX_CONCURRENCY: int = int(os.getenv("AI_MAX_CONCURRENCY", "16"))  # In-flight LLM calls per provider
+    AI_REQUEST_TIMEOUT: float = float(os.getenv("AI_REQUEST_TIMEOUT", "60"))  # Seconds per LLM call
+
+    # Hedged routing across providers, used when both API keys are configured
+    AI_HEDGING_ENABLED: bool = os.getenv("AI_HEDGING_ENABLED", "true").lower() == "true"
+    AI_HEDGE_PERCENTILE: float = float(os.getenv("AI_HEDGE_PERCENTILE", "0.95"))
+    AI_HEDGE_MIN_DELAY: float = float(os.getenv("AI_HEDGE_MIN_DELAY", "1.0"))  # Seconds
+    AI_HEDGE_DEFAULT_DELAY: float = float(os.getenv("AI_HEDGE_DEFAULT_DELAY", "10.0"))  # Until enough samples
+    AI_CIRCUIT_ERROR_RATE: float = float(os.getenv("AI_CIRCUIT_ERROR_RATE", "0.5"))
+    AI_CIRCUIT_MIN_REQUESTS: int = int(os.getenv("AI_CIRCUIT_MIN_REQUESTS", "10"))
+    AI_CIRCUIT_RESET_SECONDS: float = float(os.getenv("AI_CIRCUIT_RESET_SECONDS", "30"))
+
+    # Estimated token budget of the feature payload per analysis type.
+    # Override with JSON, e.g. AI_PROMPT_TOKEN_BUDGETS='{"general": 300}'
+    AI_PROMPT_TOKEN_BUDGETS: Dict[str, int] = {
+        "general": 400,
+        "music_theory": 350,
+        "production_feedback": 300,
+        "arrangement_analysis": 400,
+    }
+
+    AI_CACHE_ENABLED: bool = os.getenv("AI_CACHE_ENABLED", "true").lower() == "true"
+    AI_CACHE_BACKEND: str = os.getenv("AI_CACHE_BACKEND", "redis")  # "redis" or "memory"
+    AI_CACHE_TTL_SECONDS: int = int(os.getenv("AI_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    AI_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_CACHE_MAX_ENTRIES", "10000"))
+
     class Config:
         case_sensitive = True
 
@@ -0,0 +1,83 @@
+"""
+Shared Redis connection for caches, locks and other coordination state.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_failures = 0
+_retry_at = 0.0
+_lock = threading.Lock()
+
+
+def get_redis_client() -> Optional["redis.Redis"]:
+    """
+    Get the process-wide Redis client.
+
+    The connection is verified with a PING. If the redis package is missing
+    or the server is unreachable, None is returned so callers can fall back to
+    in-process state, and the connection is attempted again after
+    REDIS_RETRY_SECONDS, backing off exponentially while Redis stays down.
+    Callers whose commands fail on a connected client report it with
+    mark_unavailable, which starts the same backoff.
+
+    Returns:
+        Redis client, or None if Redis is not available
+    """
+    global _client, _failures, _retry_at
+
+    if _client is not None or time.monotonic() < _retry_at:
+        return _client
+
+    with _lock:
+        if _client is not None or time.monotonic() < _retry_at:
+            return _client
+
+        try:
+            import redis
+
+            client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=1.0,
+                socket_timeout=1.0,
+                decode_responses=True,
+            )
+            client.ping()
+            _client = client
+            _failures = 0
+        except Exception as e:
+            _back_off(e)
+
+        return _client
+
+
+def mark_unavailable(client, error: Exception) -> None:
+    """
+    Drop a client whose commands failed, so get_redis_client returns None until the next retry.
+
+    Args:
+        client: Client returned by get_redis_client
+        error: The failure, for the log
+    """
+    global _client
+    with _lock:
+        # Another caller may already have dropped it, or reconnected
+        if _client is not client:
+            return
+        _client = None
+        _back_off(error)
+
+
+def _back_off(error: Exception) -> None:
+    """Schedule the next connection attempt; the caller holds _lock."""
+    global _failures, _retry_at
+    delay = min(settings.REDIS_RETRY_SECONDS * 2 ** _failures, settings.REDIS_RETRY_MAX_SECONDS)
+    _failures += 1
+    _retry_at = time.monotonic() + delay
+    logger.warning(f"Redis not available at {settings.REDIS_URL}, retrying in {delay:.0f}s: {str(error)}")
@@ -1,11 +1,43 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Callable, Optional, Tuple, TypeVar, Union
 from passlib.context import CryptContext
 from jose import jwt
 import logging
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with another cost factor verify, and are flagged for rehashing
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+T = TypeVar("T")
+
+# bcrypt is CPU-bound for 100-300 ms per call; a dedicated, bounded pool keeps a
+# burst of logins from taking every threadpool slot and event loop tick
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_executor_lock = threading.Lock()
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+                )
+    return _hash_executor
+
+
+def _run_hashing(func: Callable[..., T], *args: Any) -> T:
+    """Run a hashing call in the password pool, blocking the calling thread."""
+    return _get_hash_executor().submit(func, *args).result()
+
+
+async def _run_hashing_async(func: Callable[..., T], *args: Any) -> T:
+    """Run a hashing call in the password pool without blocking the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), func, *args)
 
 
 def create_access_token(
@@ -50,7 +82,34 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches hash, False otherwise
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_hashing(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Async variant of verify_password."""
+    return await _run_hashing_async(pwd_context.verify, plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if the hash is outdated.
+
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password
+
+    Returns:
+        Whether the password matches, and a new hash if the stored one was made
+        with a different cost factor (None otherwise)
+    """
+    return _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Async variant of verify_and_update_password."""
+    return await _run_hashing_async(pwd_context.verify_and_update, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -63,4 +122,9 @@ def get_password_hash(password: str) -> str:
     Returns:
         Hashed password
     """
-    return pwd_context.hash(password)
+    return _run_hashing(pwd_context.hash, password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Async variant of get_password_hash."""
+    return await _run_hashing_async(pwd_context.hash, password)
@@ -0,0 +1,196 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.sql import func
+
+from app.crud.base import CRUDBase
+from app.models.audio import AudioFile, AnalysisResult
+from app.schemas.audio import (
+    AudioFileCreate,
+    AudioFileUpdate,
+    AnalysisResultCreate,
+    AnalysisResultUpdate,
+)
+
+
+class CRUDAudioFile(CRUDBase[AudioFile, AudioFileCreate, AudioFileUpdate]):
+    def get_by_user(
+        self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100
+    ) -> List[AudioFile]:
+        return (
+            db.query(AudioFile)
+            .filter(AudioFile.user_id == user_id)
+            .order_by(AudioFile.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    async def get_by_user_async(
+        self, db: AsyncSession, *, user_id: int, skip: int = 0, limit: int = 100
+    ) -> List[AudioFile]:
+        result = await db.execute(
+            select(AudioFile)
+            .where(AudioFile.user_id == user_id)
+            .order_by(AudioFile.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    def get_with_analysis_types(
+        self, db: Session, *, ids: Sequence[int], analysis_types: Sequence[str]
+    ) -> Dict[int, Tuple[AudioFile, Set[str]]]:
+        """
+        Load files together with which of the given analysis types are stored for them.
+
+        One query, joining only the type column of the results.
+
+        Returns:
+            File and stored analysis types, keyed by file id; missing files are absent
+        """
+        rows = (
+            db.query(AudioFile, AnalysisResult.analysis_type)
+            .outerjoin(AnalysisResult, and_(
+                AnalysisResult.audio_file_id == AudioFile.id,
+                AnalysisResult.analysis_type.in_(analysis_types),
+            ))
+            .filter(AudioFile.id.in_(ids))
+            .all()
+        )
+        files: Dict[int, Tuple[AudioFile, Set[str]]] = {}
+        for db_file, analysis_type in rows:
+            _, stored = files.setdefault(db_file.id, (db_file, set()))
+            if analysis_type is not None:
+                stored.add(analysis_type)
+        return files
+
+    def get_page_by_user(
+        self,
+        db: Session,
+        *,
+        user_id: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 100,
+        skip: int = 0,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[AudioFile]:
+        return self.get_page(
+            db, filters=[AudioFile.user_id == user_id], after=after, limit=limit, skip=skip, columns=columns
+        )
+
+
+class CRUDAnalysisResult(CRUDBase[AnalysisResult, AnalysisResultCreate, AnalysisResultUpdate]):
+    @staticmethod
+    def _upsert_statement(dialect_name: str, obj_in: AnalysisResultCreate):
+        """
+        INSERT ... ON CONFLICT (audio_file_id, analysis_type) DO UPDATE, returning the row.
+
+        A single statement, so concurrent writers of the same result never
+        create duplicates or fail on the unique index.
+        """
+        insert = sqlite.insert if dialect_name == "sqlite" else postgresql.insert
+        stmt = insert(AnalysisResult).values(**jsonable_encoder(obj_in))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AnalysisResult.audio_file_id, AnalysisResult.analysis_type],
+            set_={
+                "result": stmt.excluded.result,
+                "confidence": stmt.excluded.confidence,
+                "processing_time": stmt.excluded.processing_time,
+                "notes": stmt.excluded.notes,
+                "updated_at": func.now(),
+            },
+        )
+        return stmt.returning(AnalysisResult)
+
+    def upsert(self, db: Session, *, obj_in: AnalysisResultCreate) -> AnalysisResult:
+        """Store the result of an analysis, replacing any earlier result of the same type."""
+        stmt = self._upsert_statement(db.get_bind().dialect.name, obj_in)
+        db_obj = db.scalars(stmt, execution_options={"populate_existing": True}).one()
+        db.commit()
+        return db_obj
+
+    async def upsert_async(self, db: AsyncSession, *, obj_in: AnalysisResultCreate) -> AnalysisResult:
+        stmt = self._upsert_statement(db.get_bind().dialect.name, obj_in)
+        db_obj = (await db.scalars(stmt, execution_options={"populate_existing": True})).one()
+        await db.commit()
+        return db_obj
+
+    def get_by_type(
+        self, db: Session, *, audio_file_id: int, analysis_type: str
+    ) -> Optional[AnalysisResult]:
+        return (
+            db.query(AnalysisResult)
+            .filter(
+                AnalysisResult.audio_file_id == audio_file_id,
+                AnalysisResult.analysis_type == analysis_type,
+            )
+            .first()
+        )
+
+    async def get_by_type_async(
+        self, db: AsyncSession, *, audio_file_id: int, analysis_type: str
+    ) -> Optional[AnalysisResult]:
+        result = await db.execute(
+            select(AnalysisResult)
+            .where(
+                AnalysisResult.audio_file_id == audio_file_id,
+                AnalysisResult.analysis_type == analysis_type,
+            )
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    def get_by_audio_file(self, db: Session, *, audio_file_id: int) -> List[AnalysisResult]:
+        return (
+            db.query(AnalysisResult)
+            .filter(AnalysisResult.audio_file_id == audio_file_id)
+            .order_by(AnalysisResult.created_at.desc())
+            .all()
+        )
+
+    def get_page_by_audio_file(
+        self,
+        db: Session,
+        *,
+        audio_file_id: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 100,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[AnalysisResult]:
+        return self.get_page(
+            db, filters=[AnalysisResult.audio_file_id == audio_file_id], after=after, limit=limit, columns=columns
+        )
+
+    def get_summaries(self, db: Session, *, audio_file_id: int) -> List[AnalysisResult]:
+        """Results of a file without their result JSON and notes."""
+        return (
+            db.query(AnalysisResult)
+            .options(load_only(
+                AnalysisResult.analysis_type,
+                AnalysisResult.confidence,
+                AnalysisResult.processing_time,
+                AnalysisResult.created_at,
+                AnalysisResult.updated_at,
+            ))
+            .filter(AnalysisResult.audio_file_id == audio_file_id)
+            .order_by(AnalysisResult.analysis_type)
+            .all()
+        )
+
+    async def get_by_audio_file_async(self, db: AsyncSession, *, audio_file_id: int) -> List[AnalysisResult]:
+        result = await db.execute(
+            select(AnalysisResult)
+            .where(AnalysisResult.audio_file_id == audio_file_id)
+            .order_by(AnalysisResult.created_at.desc())
+        )
+        return list(result.scalars().all())
+
+
+audio_file = CRUDAudioFile(AudioFile)
+analysis_result = CRUDAnalysisResult(AnalysisResult)
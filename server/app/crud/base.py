@@ -0,0 +1,148 @@
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+
+from app.db.base import Base
+
+ModelType = TypeVar("ModelType", bound=Base)
+CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
+UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
+
+
+class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    def __init__(self, model: Type[ModelType]):
+        """
+        CRUD object with default methods to Create, Read, Update, Delete (CRUD).
+
+        Args:
+            model: A SQLAlchemy model class
+        """
+        self.model = model
+
+    def get(self, db: Session, id: Any) -> Optional[ModelType]:
+        return db.query(self.model).filter(self.model.id == id).first()
+
+    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        return db.query(self.model).offset(skip).limit(limit).all()
+
+    def get_page(
+        self,
+        db: Session,
+        *,
+        filters: Sequence[Any] = (),
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 100,
+        skip: int = 0,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[ModelType]:
+        """
+        Get rows newest first by (created_at, id), starting after a keyset position.
+
+        Args:
+            db: Database session
+            filters: Filter clauses, e.g. the owner of the rows
+            after: (created_at, id) of the last row of the previous page
+            limit: Maximum number of rows
+            skip: Rows to skip (offset pagination, for older clients)
+            columns: Columns to load; the others are not read from the database
+
+        Returns:
+            List of rows
+        """
+        query = db.query(self.model).filter(*filters)
+        if columns is not None:
+            loaded = {*columns, "id", "created_at"}  # Always needed for the next cursor
+            query = query.options(load_only(*[getattr(self.model, column) for column in loaded]))
+        if after is not None:
+            created_at, id = after
+            query = query.filter(
+                # The plain comparison lets an index on created_at bound the scan
+                self.model.created_at <= created_at,
+                tuple_(self.model.created_at, self.model.id) < tuple_(created_at, id),
+            )
+        return (
+            query.order_by(self.model.created_at.desc(), self.model.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(db_obj, field, value)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def remove(self, db: Session, *, id: Any) -> Optional[ModelType]:
+        obj = db.query(self.model).get(id)
+        if obj is not None:
+            db.delete(obj)
+            db.commit()
+        return obj
+
+    # Async variants for AsyncSession, used by async endpoints so queries don't block the event loop
+
+    async def get_async(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await db.get(self.model, id)
+
+    async def get_multi_async(self, db: AsyncSession, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        result = await db.execute(select(self.model).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    async def create_async(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update_async(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(db_obj, field, value)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove_async(self, db: AsyncSession, *, id: Any) -> Optional[ModelType]:
+        obj = await db.get(self.model, id)
+        if obj is not None:
+            await db.delete(obj)
+            await db.commit()
+        return obj
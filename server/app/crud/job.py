@@ -0,0 +1,189 @@
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.models.job import (
+    ProcessingJob,
+    ACTIVE_JOB_STATUSES,
+    JOB_PENDING,
+    JOB_RUNNING,
+    JOB_CANCELLED,
+    FINAL_JOB_STATUSES,
+    PRIORITIES,
+)
+from app.schemas.job import JobCreate, JobUpdate
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps (e.g. from SQLite) as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percentile * len(ordered)) - 1)]
+
+
+class CRUDJob(CRUDBase[ProcessingJob, JobCreate, JobUpdate]):
+    def get_active(
+        self,
+        db: Session,
+        *,
+        audio_file_id: int,
+        job_type: str,
+        analysis_type: Optional[str] = None,
+    ) -> Optional[ProcessingJob]:
+        """Return a pending or running job of the same kind for the file, if any."""
+        return (
+            db.query(ProcessingJob)
+            .filter(
+                ProcessingJob.audio_file_id == audio_file_id,
+                ProcessingJob.job_type == job_type,
+                ProcessingJob.analysis_type == analysis_type,
+                ProcessingJob.status.in_(ACTIVE_JOB_STATUSES),
+            )
+            .order_by(ProcessingJob.created_at.desc())
+            .first()
+        )
+
+    async def get_active_async(
+        self,
+        db: AsyncSession,
+        *,
+        audio_file_id: int,
+        job_type: str,
+        analysis_type: Optional[str] = None,
+    ) -> Optional[ProcessingJob]:
+        result = await db.execute(
+            select(ProcessingJob)
+            .where(
+                ProcessingJob.audio_file_id == audio_file_id,
+                ProcessingJob.job_type == job_type,
+                ProcessingJob.analysis_type == analysis_type,
+                ProcessingJob.status.in_(ACTIVE_JOB_STATUSES),
+            )
+            .order_by(ProcessingJob.created_at.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    def get_active_analyses(
+        self, db: Session, *, audio_file_ids: Sequence[int], analysis_types: Sequence[str]
+    ) -> Dict[Tuple[int, str], ProcessingJob]:
+        """Return pending or running analysis jobs of several files, keyed by file id and analysis type."""
+        rows = (
+            db.query(ProcessingJob)
+            .filter(
+                ProcessingJob.audio_file_id.in_(audio_file_ids),
+                ProcessingJob.job_type == "analysis",
+                ProcessingJob.analysis_type.in_(analysis_types),
+                ProcessingJob.status.in_(ACTIVE_JOB_STATUSES),
+            )
+            .order_by(ProcessingJob.created_at)
+            .all()
+        )
+        # Newest job last, so it wins
+        return {(row.audio_file_id, row.analysis_type): row for row in rows}
+
+    def create_many(self, db: Session, *, objs_in: Sequence[JobCreate]) -> List[ProcessingJob]:
+        """Create several jobs in one transaction."""
+        db_objs = [ProcessingJob(**obj_in.dict()) for obj_in in objs_in]
+        db.add_all(db_objs)
+        db.commit()
+        return db_objs
+
+    def get_active_by_audio_file(self, db: Session, *, audio_file_id: int) -> List[ProcessingJob]:
+        """Return all pending or running jobs of a file, including pipeline stages."""
+        return (
+            db.query(ProcessingJob)
+            .filter(
+                ProcessingJob.audio_file_id == audio_file_id,
+                ProcessingJob.status.in_(ACTIVE_JOB_STATUSES),
+            )
+            .all()
+        )
+
+    def update_status(self, db: Session, *, id: str, **fields: Any) -> Optional[ProcessingJob]:
+        """
+        Update a job by id, stamping started_at when it starts running and
+        completed_at when it reaches a final status.
+
+        Returns None if the job does not exist, e.g. when a task was enqueued without a job row.
+        """
+        db_obj = self.get(db, id=id)
+        if db_obj is None:
+            return None
+        if db_obj.status == JOB_CANCELLED:
+            # Cancellation is final; a task that has not noticed it yet must not revive the job
+            fields.pop("status", None)
+        if fields.get("status") == JOB_RUNNING and db_obj.started_at is None:
+            fields.setdefault("started_at", datetime.now(timezone.utc))
+        if fields.get("status") in FINAL_JOB_STATUSES:
+            fields.setdefault("completed_at", datetime.now(timezone.utc))
+        return self.update(db, db_obj=db_obj, obj_in=fields)
+
+    def get_wait_stats(
+        self, db: Session, *, user_id: Optional[int] = None, window_seconds: int = 3600
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize queue wait times per priority lane.
+
+        The wait of a job is the time from submission until a worker started it.
+        Only top-level jobs count; pipeline stages are part of their pipeline.
+
+        Args:
+            db: Database session
+            user_id: Only count this user's jobs; None for all users
+            window_seconds: How far back to look for started jobs
+
+        Returns:
+            Stats keyed by lane: pending, running and started counts, average and
+            p95 wait of jobs started in the window, and the age of the oldest pending job
+        """
+        now = datetime.now(timezone.utc)
+        since = now - timedelta(seconds=window_seconds)
+
+        query = db.query(
+            ProcessingJob.priority,
+            ProcessingJob.status,
+            ProcessingJob.created_at,
+            ProcessingJob.started_at,
+        ).filter(
+            ProcessingJob.parent_id.is_(None),
+            or_(ProcessingJob.status.in_(ACTIVE_JOB_STATUSES), ProcessingJob.started_at >= since),
+        )
+        if user_id is not None:
+            query = query.filter(ProcessingJob.user_id == user_id)
+
+        waits: Dict[str, List[float]] = {lane: [] for lane in PRIORITIES}
+        stats: Dict[str, Dict[str, Any]] = {
+            lane: {"pending": 0, "running": 0, "started": 0} for lane in PRIORITIES
+        }
+        for priority, status, created_at, started_at in query:
+            lane = stats.setdefault(priority, {"pending": 0, "running": 0, "started": 0})
+            if status == JOB_PENDING:
+                lane["pending"] += 1
+                if created_at is not None:
+                    age = (now - _as_utc(created_at)).total_seconds()
+                    lane["oldest_pending_seconds"] = max(lane.get("oldest_pending_seconds", 0.0), age)
+            elif status == JOB_RUNNING:
+                lane["running"] += 1
+            if started_at is not None and created_at is not None and _as_utc(started_at) >= since:
+                waits.setdefault(priority, []).append(
+                    max(0.0, (_as_utc(started_at) - _as_utc(created_at)).total_seconds())
+                )
+
+        for lane, lane_waits in waits.items():
+            if lane_waits:
+                stats[lane]["started"] = len(lane_waits)
+                stats[lane]["avg_wait_seconds"] = sum(lane_waits) / len(lane_waits)
+                stats[lane]["p95_wait_seconds"] = _percentile(lane_waits, 0.95)
+        return stats
+
+
+job = CRUDJob(ProcessingJob)
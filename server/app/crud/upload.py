@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from sqlalchemy import select
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.base import CRUDBase
+from app.models.audio import AudioFile
+from app.models.upload import UploadSession, UPLOAD_ACTIVE, UPLOAD_COMPLETED
+from app.schemas.audio import AudioFileCreate
+from app.schemas.upload import UploadSessionCreate
+
+
+def merge_range(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    """Add the byte range [start, end) to a sorted list of disjoint ranges, merging neighbours."""
+    merged: List[List[int]] = []
+    for r_start, r_end in sorted(ranges + [[start, end]]):
+        if merged and r_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], r_end)
+        else:
+            merged.append([r_start, r_end])
+    return merged
+
+
+class CRUDUploadSession(CRUDBase[UploadSession, UploadSessionCreate, UploadSessionCreate]):
+    def create_session(
+        self,
+        db: Session,
+        *,
+        id: str,
+        user_id: int,
+        obj_in: UploadSessionCreate,
+        file_path: str,
+    ) -> UploadSession:
+        db_obj = UploadSession(
+            id=id,
+            user_id=user_id,
+            filename=obj_in.filename,
+            content_type=obj_in.content_type,
+            file_path=file_path,
+            total_size=obj_in.size,
+            received=[],
+            offset=0,
+            status=UPLOAD_ACTIVE,
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS),
+        )
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    async def get_for_update_async(self, db: AsyncSession, *, id: str) -> Optional[UploadSession]:
+        """
+        Return an upload session with its row locked until the transaction ends.
+
+        The row is reloaded, so changes committed by whoever held the lock before are seen.
+        """
+        result = await db.execute(
+            select(UploadSession).where(UploadSession.id == id).with_for_update().execution_options(
+                populate_existing=True
+            )
+        )
+        return result.scalars().one_or_none()
+
+    async def record_range_async(self, db: AsyncSession, *, id: str, start: int, end: int) -> UploadSession:
+        """
+        Record that bytes [start, end) of an upload have been written.
+
+        The row is locked while the ranges are merged, so chunks written in
+        parallel never overwrite each other's progress.
+        """
+        db_obj = await self.get_for_update_async(db, id=id)
+        if db_obj is None:
+            raise NoResultFound(f"Upload {id} not found")
+        if end > start:
+            db_obj.received = merge_range(db_obj.received or [], start, end)
+            first = db_obj.received[0]
+            db_obj.offset = first[1] if first[0] == 0 else 0
+        db_obj.expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def complete_async(
+        self, db: AsyncSession, *, db_obj: UploadSession, file_in: AudioFileCreate
+    ) -> AudioFile:
+        """
+        Create the audio file of an upload and mark the upload completed.
+
+        Both are committed together, so a lock held on the session row covers
+        the whole completion.
+        """
+        db_file = AudioFile(**jsonable_encoder(file_in))
+        db.add(db_file)
+        await db.flush()
+        db_obj.status = UPLOAD_COMPLETED
+        db_obj.audio_file_id = db_file.id
+        await db.commit()
+        await db.refresh(db_file)
+        return db_file
+
+    def get_expired(self, db: Session, *, user_id: int) -> List[UploadSession]:
+        """Return a user's unfinished sessions that are past their expiry time."""
+        return (
+            db.query(UploadSession)
+            .filter(
+                UploadSession.user_id == user_id,
+                UploadSession.status == UPLOAD_ACTIVE,
+                UploadSession.expires_at < datetime.now(timezone.utc),
+            )
+            .all()
+        )
+
+
+upload_session = CRUDUploadSession(UploadSession)
@@ -0,0 +1,101 @@
+from typing import Any, Dict, Optional, Union
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_and_update_password,
+    verify_and_update_password_async,
+)
+from app.crud.base import CRUDBase
+from app.models.user import User
+from app.schemas.user import UserCreate, UserUpdate
+
+
+class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
+        return db.query(User).filter(User.email == email).first()
+
+    def get_by_username(self, db: Session, *, username: str) -> Optional[User]:
+        return db.query(User).filter(User.username == username).first()
+
+    async def get_by_email_async(self, db: AsyncSession, *, email: str) -> Optional[User]:
+        result = await db.execute(select(User).where(User.email == email).limit(1))
+        return result.scalars().first()
+
+    async def get_by_username_async(self, db: AsyncSession, *, username: str) -> Optional[User]:
+        result = await db.execute(select(User).where(User.username == username).limit(1))
+        return result.scalars().first()
+
+    def create(self, db: Session, *, obj_in: UserCreate) -> User:
+        db_obj = User(
+            email=obj_in.email,
+            username=obj_in.username,
+            hashed_password=get_password_hash(obj_in.password),
+            is_active=obj_in.is_active,
+            is_superuser=obj_in.is_superuser,
+        )
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    async def create_async(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+        db_obj = User(
+            email=obj_in.email,
+            username=obj_in.username,
+            hashed_password=await get_password_hash_async(obj_in.password),
+            is_active=obj_in.is_active,
+            is_superuser=obj_in.is_superuser,
+        )
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    def update(
+        self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if update_data.get("password"):
+            update_data["hashed_password"] = get_password_hash(update_data["password"])
+        update_data.pop("password", None)
+        return super().update(db, db_obj=db_obj, obj_in=update_data)
+
+    def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
+        user_obj = self.get_by_email(db, email=email)
+        if not user_obj:
+            return None
+        verified, new_hash = verify_and_update_password(password, user_obj.hashed_password)
+        if not verified:
+            return None
+        if new_hash:
+            # Stored with another cost factor; upgrade while the password is at hand
+            user_obj = super().update(db, db_obj=user_obj, obj_in={"hashed_password": new_hash})
+        return user_obj
+
+    async def authenticate_async(self, db: AsyncSession, *, email: str, password: str) -> Optional[User]:
+        user_obj = await self.get_by_email_async(db, email=email)
+        if not user_obj:
+            return None
+        verified, new_hash = await verify_and_update_password_async(password, user_obj.hashed_password)
+        if not verified:
+            return None
+        if new_hash:
+            user_obj = await self.update_async(db, db_obj=user_obj, obj_in={"hashed_password": new_hash})
+        return user_obj
+
+    def is_active(self, user_obj: User) -> bool:
+        return user_obj.is_active
+
+    def is_superuser(self, user_obj: User) -> bool:
+        return user_obj.is_superuser
+
+
+user = CRUDUser(User)
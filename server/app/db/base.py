@@ -1,13 +1,26 @@
+from typing import Any, AsyncGenerator, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 
+from app.core.config import settings
+
 load_dotenv()
 
 Base = declarative_base()
 
+# Async drivers for the synchronous drivers DATABASE_URL may name
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
 def get_database_url():
     """Get database URL from environment variables"""
     database_url = os.getenv("DATABASE_URL")
@@ -15,9 +28,60 @@ def get_database_url():
         raise ValueError("DATABASE_URL environment variable must be set")
     return database_url
 
-engine = create_engine(get_database_url())
+def get_async_database_url() -> URL:
+    """DATABASE_URL with its driver swapped for the matching async driver (asyncpg for PostgreSQL)"""
+    url = make_url(get_database_url())
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+def _engine_options(url: URL, async_driver: bool) -> Dict[str, Any]:
+    """Pool and statement timeout settings for a database URL"""
+    if url.get_backend_name() == "sqlite":
+        return {}
+
+    options: Dict[str, Any] = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS and url.get_backend_name() == "postgresql":
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if async_driver:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+engine = create_engine(get_database_url(), **_engine_options(make_url(get_database_url()), async_driver=False))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Created on first use, so processes that never touch the async path (Celery
+# workers, migrations) don't need the async driver installed
+_async_engine = None
+_async_session_factory = None
+
+def get_async_session_factory():
+    """Return the sessionmaker for AsyncSession, creating the async engine on first use"""
+    global _async_engine, _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        url = get_async_database_url()
+        _async_engine = create_async_engine(url, **_engine_options(url, async_driver=True))
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's pooled connections, e.g. at application shutdown"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
+
 def get_db():
     """
     Dependency for FastAPI endpoints that need database access.
@@ -28,3 +92,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncGenerator[Any, None]:
+    """
+    Dependency for async FastAPI endpoints that need database access.
+    Yields an AsyncSession, so queries don't block the event loop.
+    """
+    async with get_async_session_factory()() as db:
+        yield db
@@ -1,6 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api import api_router
+from app.celery_app import celery_app  # noqa: F401 - shared tasks are sent through this app
+from app.core.config import settings
+from app.services.ai_cache import get_response_cache
+from app.services.ai_service import close_async_ai_clients
+from app.db.base import dispose_async_engine
 
 app = FastAPI(
     title="Tokoroten API",
@@ -14,14 +19,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Resumable uploads, ranged downloads, binary waveform peaks, spectrogram tiles and listing cursors
+    expose_headers=[
+        "Upload-Offset", "Upload-Length", "Location", "ETag", "Content-Range", "Accept-Ranges",
+        "X-Peaks-Sample-Rate", "X-Peaks-Samples-Per-Pixel", "X-Peaks-Start-Pixel", "X-Peaks-Bits",
+        "X-Spectrogram-Sample-Rate", "X-Spectrogram-Hop", "X-Spectrogram-Min-Frequency", "X-Spectrogram-Tiles",
+        "X-Next-Cursor",
+    ],
 )
 
 app.include_router(api_router, prefix="/api/v1")
 
+@app.on_event("shutdown")
+async def shutdown_ai_clients():
+    await close_async_ai_clients()
+
+@app.on_event("shutdown")
+async def shutdown_database():
+    await dispose_async_engine()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Tokoroten API"}
 
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
+def health_check():
+    health = {"status": "healthy"}
+    if settings.AI_CACHE_ENABLED:
+        # Hit, miss and error counts of this process's AI response cache
+        health["ai_cache"] = get_response_cache().stats()
+    return health
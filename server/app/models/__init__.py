@@ -1,2 +1,4 @@
 from app.models.user import User
 from app.models.audio import AudioFile, AnalysisResult
+from app.models.job import ProcessingJob
+from app.models.upload import UploadSession
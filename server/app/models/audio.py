@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class AudioFile(Base):
     __tablename__ = "audio_files"
+    __table_args__ = (
+        Index("ix_audio_files_user_id_created_at", "user_id", "created_at"),  # Per-user listings, newest first
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -14,15 +17,21 @@ class AudioFile(Base):
     duration = Column(Float, nullable=True)  # Duration in seconds
     format = Column(String, nullable=True)  # File format (mp3, wav, etc.)
     sample_rate = Column(Integer, nullable=True)  # Sample rate in Hz
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the file contents
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     user = relationship("User", back_populates="audio_files")
     analysis_results = relationship("AnalysisResult", back_populates="audio_file", cascade="all, delete-orphan")
+    jobs = relationship("ProcessingJob", back_populates="audio_file", cascade="all, delete-orphan")
 
 
 class AnalysisResult(Base):
     __tablename__ = "analysis_results"
+    __table_args__ = (
+        # One result per file and type; the cache check in front of every analysis
+        Index("ix_analysis_results_audio_file_id_analysis_type", "audio_file_id", "analysis_type", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     audio_file_id = Column(Integer, ForeignKey("audio_files.id"), nullable=False)
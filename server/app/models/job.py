@@ -0,0 +1,61 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text, Index, text
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship, backref
+from app.db.base import Base
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+ACTIVE_JOB_STATUSES = (JOB_PENDING, JOB_RUNNING)
+FINAL_JOB_STATUSES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+ACTIVE_ANALYSIS_WHERE = "job_type = 'analysis' AND status IN ('pending', 'running')"
+
+# Scheduling lanes: interactive requests are dispatched ahead of batch work
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BATCH)
+
+
+class ProcessingJob(Base):
+    __tablename__ = "processing_jobs"
+    __table_args__ = (
+        Index("ix_processing_jobs_user_id_created_at", "user_id", "created_at"),  # Queue wait stats
+        # At most one queued or running analysis per file and type, so concurrent requests share a job
+        Index(
+            "ix_processing_jobs_active_analysis",
+            "audio_file_id",
+            "job_type",
+            "analysis_type",
+            unique=True,
+            postgresql_where=text(ACTIVE_ANALYSIS_WHERE),
+            sqlite_where=text(ACTIVE_ANALYSIS_WHERE),
+        ),
+    )
+
+    id = Column(String, primary_key=True, index=True)  # Celery task id
+    parent_id = Column(String, ForeignKey("processing_jobs.id"), nullable=True, index=True)  # Pipeline job of a stage
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    audio_file_id = Column(Integer, ForeignKey("audio_files.id"), nullable=True, index=True)
+    job_type = Column(String, nullable=False)  # e.g., "analysis", "pipeline", "separation"
+    analysis_type = Column(String, nullable=True)  # For analysis jobs
+    priority = Column(String, nullable=False, default=PRIORITY_INTERACTIVE, server_default=PRIORITY_INTERACTIVE)
+    status = Column(String, nullable=False, default=JOB_PENDING)  # pending, running, completed, failed, cancelled
+    progress = Column(Float, nullable=False, default=0.0)  # 0-1
+    result = Column(JSON, nullable=True)  # Task output once completed
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)  # First time a worker picked it up
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    audio_file = relationship("AudioFile", back_populates="jobs")
+    stages = relationship(
+        "ProcessingJob",
+        order_by="ProcessingJob.created_at",
+        cascade="all, delete-orphan",
+        backref=backref("parent", remote_side=[id]),
+    )
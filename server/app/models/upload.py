@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+UPLOAD_ACTIVE = "uploading"
+UPLOAD_COMPLETED = "completed"
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    id = Column(String, primary_key=True, index=True)  # UUID, part of the upload URL
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=True)
+    file_path = Column(String, nullable=False)  # Final path; chunks go to <file_path>.part
+    total_size = Column(BigInteger, nullable=False)  # Declared size in bytes
+    received = Column(JSON, nullable=False, default=list)  # Sorted, merged [start, end) byte ranges
+    offset = Column(BigInteger, nullable=False, default=0)  # Bytes received contiguously from the start
+    status = Column(String, nullable=False, default=UPLOAD_ACTIVE)  # uploading, completed
+    audio_file_id = Column(Integer, ForeignKey("audio_files.id", ondelete="SET NULL"), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
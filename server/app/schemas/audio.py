@@ -9,6 +9,7 @@ class AudioFileBase(BaseModel):
     duration: Optional[float] = None
     format: Optional[str] = None
     sample_rate: Optional[int] = None
+    content_hash: Optional[str] = None
     user_id: Optional[int] = None
 
 
@@ -55,10 +56,29 @@ class AnalysisResult(AnalysisResultBase):
         orm_mode = True
 
 
+class AnalysisResultSummary(BaseModel):
+    """An analysis result without its result JSON, for listing which analyses exist."""
+    id: int
+    analysis_type: str
+    confidence: Optional[float] = None
+    processing_time: Optional[float] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class AudioFileSummary(AudioFile):
+    analyses: List[AnalysisResultSummary] = []
+
+
 class AudioUploadResponse(BaseModel):
     file_id: str
     filename: str
     file_path: str
+    file_size: Optional[int] = None
+    content_hash: Optional[str] = None
 
 
 class AudioAnalysisResponse(BaseModel):
@@ -91,6 +111,11 @@ class ArrangementAnalysisResponse(AudioAnalysisResponse):
     energy_flow: Optional[str] = None
 
 
+class FullAnalysisResponse(BaseModel):
+    file_id: str
+    results: Dict[str, Dict[str, Any]]  # Analysis results keyed by analysis type
+
+
 class AIAnalysisRequest(BaseModel):
     analysis_type: str = Field(
         default="general",
@@ -100,6 +125,32 @@ class AIAnalysisRequest(BaseModel):
         default=None,
         description="AI service to use (gemini, openai, or None for default)"
     )
+    priority: str = Field(
+        default="interactive",
+        description="Scheduling lane (interactive or batch)"
+    )
+
+
+class BatchAnalysisRequest(BaseModel):
+    file_ids: List[int] = Field(
+        ...,
+        min_items=1,
+        max_items=100,
+        description="Audio files to analyze, e.g. the tracks of an album"
+    )
+    analysis_types: List[str] = Field(
+        default=["general"],
+        min_items=1,
+        description="Analysis types to run on every file"
+    )
+    ai_service: Optional[str] = Field(
+        default=None,
+        description="AI service to use (gemini, openai, or None for default)"
+    )
+    priority: str = Field(
+        default="batch",
+        description="Scheduling lane (interactive or batch)"
+    )
 
     
 class AudioSourceSeparationResponse(BaseModel):
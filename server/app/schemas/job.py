@@ -0,0 +1,85 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+
+
+class JobBase(BaseModel):
+    job_type: str
+    parent_id: Optional[str] = None
+    user_id: Optional[int] = None
+    audio_file_id: Optional[int] = None
+    analysis_type: Optional[str] = None
+    priority: str = "interactive"
+
+
+class JobCreate(JobBase):
+    id: str
+    status: str = "pending"
+
+
+class JobUpdate(BaseModel):
+    status: Optional[str] = None
+    progress: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+
+class JobStage(BaseModel):
+    id: str
+    job_type: str
+    audio_file_id: Optional[int] = None
+    analysis_type: Optional[str] = None
+    status: str
+    progress: float
+    error: Optional[str] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class Job(JobBase):
+    id: str
+    status: str
+    progress: float
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    stages: List[JobStage] = []  # Stage jobs of a pipeline
+
+    class Config:
+        orm_mode = True
+
+
+class AnalysisJobResponse(BaseModel):
+    job_id: Optional[str] = None  # None when a stored result was returned
+    file_id: str
+    analysis_type: str
+    status: str
+    result: Optional[Dict[str, Any]] = None
+
+
+class BatchAnalysisResponse(BaseModel):
+    job_id: Optional[str] = None  # Batch job of the queued items; None when nothing was queued
+    status: str  # completed once every item is, otherwise pending or running
+    items: List[AnalysisJobResponse]  # One per file and analysis type, without results
+
+
+class LaneWaitStats(BaseModel):
+    pending: int = 0
+    running: int = 0
+    started: int = 0  # Jobs started in the window
+    avg_wait_seconds: Optional[float] = None
+    p95_wait_seconds: Optional[float] = None
+    oldest_pending_seconds: Optional[float] = None
+
+
+class QueueWaitStats(BaseModel):
+    user_id: Optional[int] = None  # None for all users
+    window_seconds: int
+    lanes: Dict[str, LaneWaitStats]
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int = Field(..., gt=0, description="Total size of the file in bytes")
+    content_type: Optional[str] = None
+
+
+class UploadSession(BaseModel):
+    id: str
+    filename: str
+    content_type: Optional[str] = None
+    total_size: int
+    offset: int
+    received: List[List[int]]
+    status: str
+    audio_file_id: Optional[int] = None
+    expires_at: datetime
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
@@ -1,6 +1,26 @@
 try:
-    from app.services.ai_service import get_ai_service, AIService, GeminiService, OpenAIService
-    __all__ = ["get_ai_service", "AIService", "GeminiService", "OpenAIService"]
+    from app.services.ai_service import (
+        get_ai_service,
+        get_async_ai_service,
+        AIService,
+        GeminiService,
+        OpenAIService,
+        AsyncGeminiService,
+        AsyncOpenAIService,
+        CachedAIService,
+        HedgedAIService,
+    )
+    __all__ = [
+        "get_ai_service",
+        "get_async_ai_service",
+        "AIService",
+        "GeminiService",
+        "OpenAIService",
+        "AsyncGeminiService",
+        "AsyncOpenAIService",
+        "CachedAIService",
+        "HedgedAIService",
+    ]
 except ImportError:
     __all__ = []
 
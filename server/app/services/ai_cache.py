@@ -0,0 +1,125 @@
+"""
+Response cache for AI service analyses.
+"""
+import hashlib
+import json
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+from app.core.cache import CacheBackend, create_cache_backend
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Feature fields that identify the upload rather than the audio content
+EXCLUDED_FEATURE_KEYS = {"file_info"}
+
+FLOAT_PRECISION = 3
+
+
+def _round_payload(value: Any) -> Any:
+    """Round floats recursively so insignificant jitter doesn't change the cache key."""
+    if isinstance(value, float):
+        return round(value, FLOAT_PRECISION)
+    if isinstance(value, dict):
+        return {
+            k: _round_payload(v) for k, v in value.items() if k not in EXCLUDED_FEATURE_KEYS
+        }
+    if isinstance(value, (list, tuple)):
+        return [_round_payload(v) for v in value]
+    return value
+
+
+def make_cache_key(
+    provider: str,
+    model_name: str,
+    prompt_version: str,
+    analysis_type: str,
+    audio_data: Dict[str, Any],
+) -> str:
+    """
+    Build a canonical cache key for an AI analysis request.
+
+    Args:
+        provider: AI provider name
+        model_name: Model used by the provider
+        prompt_version: Version of the prompt template
+        analysis_type: Type of analysis
+        audio_data: Feature payload sent to the model
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    payload = {
+        "provider": provider,
+        "model": model_name,
+        "prompt_version": prompt_version,
+        "analysis_type": analysis_type,
+        "features": _round_payload(audio_data),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """AI response cache with hit/miss counters."""
+
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"AI cache lookup failed: {str(e)}")
+            value = None
+            with self._lock:
+                self.errors += 1
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        try:
+            self.backend.set(key, json.dumps(result), self.ttl)
+        except Exception as e:
+            logger.warning(f"AI cache store failed: {str(e)}")
+            with self._lock:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide AI response cache."""
+    global _response_cache
+    if _response_cache is None:
+        backend = create_cache_backend(
+            namespace="ai-cache",
+            max_entries=settings.AI_CACHE_MAX_ENTRIES,
+            backend=settings.AI_CACHE_BACKEND,
+        )
+        _response_cache = ResponseCache(backend, ttl=settings.AI_CACHE_TTL_SECONDS)
+    return _response_cache
@@ -3,16 +3,33 @@ AI service integration for audio analysis using Gemini and OpenAI APIs.
 """
 import os
 import json
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Optional, List, Callable, Awaitable, AsyncIterator
+import httpx
 import google.generativeai as genai
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from app.core.config import settings
+from app.services.ai_cache import ResponseCache, get_response_cache, make_cache_key
+from app.services.prompt_builder import build_prompt, build_combined_prompt
+from app.services.provider_health import ProviderHealth
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever prompt wording or output structure changes so cached responses are not reused
+PROMPT_TEMPLATE_VERSION = "2"
+
+# Completion token limit for one analysis type; combined requests scale it
+MAX_TOKENS_PER_ANALYSIS = 1000
+
+DEFAULT_GEMINI_API_BASE_URL = "https://generativelanguage.googleapis.com"
+
 class AIService:
     """Base class for AI service integration."""
+
+    provider: str = "base"
+    model_name: str = ""
     
     def analyze_audio_content(self, audio_data: Dict[str, Any], analysis_type: str) -> Dict[str, Any]:
         """
@@ -27,9 +44,68 @@ class AIService:
         """
         raise NotImplementedError("Subclasses must implement this method")
 
+    def analyze_audio_content_multi(
+        self, audio_data: Dict[str, Any], analysis_types: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze audio content for several analysis types.
+
+        Providers that support it answer all types in one request; this default
+        implementation falls back to one request per type.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_types: Types of analysis to perform
+            
+        Returns:
+            Dictionary mapping each analysis type to its results
+        """
+        return {
+            analysis_type: self.analyze_audio_content(audio_data, analysis_type)
+            for analysis_type in analysis_types
+        }
+
+    async def stream_audio_content(
+        self, audio_data: Dict[str, Any], analysis_type: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an analysis while it is being generated. Async services only.
+
+        Yields ``{"event": "token", "text": ...}`` for each chunk of generated
+        text, then ``{"event": "result", "result": ...}`` with the parsed result.
+        This default implementation only yields the final result.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_type: Type of analysis to perform
+            
+        Yields:
+            Token events followed by one result event
+        """
+        result = await self.analyze_audio_content(audio_data, analysis_type)
+        yield {"event": "result", "result": result}
+
+    def _split_combined_response(
+        self, response_text: str, analysis_types: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Split a combined JSON response into per-type results, defaulting missing types."""
+        combined = self._parse_response(response_text, "general")
+        results = {}
+        for analysis_type in analysis_types:
+            result = combined.get(analysis_type)
+            if isinstance(result, dict):
+                results[analysis_type] = result
+            else:
+                logger.warning(f"Combined {self.provider} response is missing {analysis_type}")
+                results[analysis_type] = self._get_default_result(analysis_type)
+        return results
+
 
 class GeminiService(AIService):
     """Gemini API integration for audio analysis."""
+
+    provider = "gemini"
+    model_name = "gemini-pro"
     
     def __init__(self):
         """Initialize Gemini API client."""
@@ -37,8 +113,16 @@ class GeminiService(AIService):
             logger.error("GEMINI_API_KEY not set in environment variables")
             raise ValueError("GEMINI_API_KEY environment variable must be set")
         
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-pro')
+        if settings.GEMINI_API_BASE_URL.rstrip("/") != DEFAULT_GEMINI_API_BASE_URL:
+            # Custom endpoints (e.g. the local stub server) are only reachable over REST
+            genai.configure(
+                api_key=settings.GEMINI_API_KEY,
+                transport="rest",
+                client_options={"api_endpoint": settings.GEMINI_API_BASE_URL},
+            )
+        else:
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+        self.model = genai.GenerativeModel(self.model_name)
     
     def analyze_audio_content(self, audio_data: Dict[str, Any], analysis_type: str) -> Dict[str, Any]:
         """
@@ -53,96 +137,58 @@ class GeminiService(AIService):
         """
         try:
             prompt = self._create_prompt(audio_data, analysis_type)
-            response = self.model.generate_content(prompt)
+            response_text = self._generate(prompt)
             
-            result = self._parse_response(response.text, analysis_type)
+            result = self._parse_response(response_text, analysis_type)
             return result
         
         except Exception as e:
             logger.error(f"Error analyzing audio with Gemini: {str(e)}")
             return self._get_default_result(analysis_type)
-    
-    def _create_prompt(self, audio_data: Dict[str, Any], analysis_type: str) -> str:
-        """Create a prompt for Gemini based on analysis type."""
-        base_prompt = f"""
-        You are a professional music producer and audio engineer. 
-        Analyze the following audio data and provide insights.
-        
-        Audio data:
-        {json.dumps(audio_data, indent=2)}
-        
-        Analysis type: {analysis_type}
+
+    def analyze_audio_content_multi(
+        self, audio_data: Dict[str, Any], analysis_types: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
         """
+        Analyze audio content for several analysis types in one Gemini request.
         
-        if analysis_type == "music_theory":
-            base_prompt += """
-            Provide a detailed music theory analysis including:
-            - Key and scale identification
-            - Chord progression analysis
-            - Harmonic structure
-            - Suggestions for complementary chords
-            
-            Format your response as JSON with the following structure:
-            {
-                "key": "C Major",
-                "scale": ["C", "D", "E", "F", "G", "A", "B"],
-                "chord_progression": ["C", "Am", "F", "G"],
-                "harmonic_analysis": "The progression follows a I-vi-IV-V pattern...",
-                "suggestions": ["Try adding a secondary dominant...", "Consider a modal interchange..."]
-            }
-            """
-        elif analysis_type == "production_feedback":
-            base_prompt += """
-            Provide production feedback including:
-            - Mix balance assessment
-            - EQ recommendations
-            - Dynamic processing suggestions
-            - Spatial effects recommendations
-            
-            Format your response as JSON with the following structure:
-            {
-                "mix_balance": "The low-end is slightly overpowering...",
-                "eq_recommendations": ["Cut around 200Hz to reduce muddiness", "Boost at 3kHz for clarity"],
-                "dynamics_suggestions": ["Apply more compression to the bass", "Consider multiband compression for..."],
-                "spatial_recommendations": ["Add a short room reverb", "Pan elements wider for more stereo width"]
-            }
-            """
-        elif analysis_type == "arrangement_analysis":
-            base_prompt += """
-            Provide arrangement analysis including:
-            - Structure identification
-            - Instrumentation assessment
-            - Energy flow analysis
-            - Arrangement improvement suggestions
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_types: Types of analysis to perform
             
-            Format your response as JSON with the following structure:
-            {
-                "structure": ["Intro", "Verse", "Chorus", "Verse", "Chorus", "Bridge", "Chorus", "Outro"],
-                "instrumentation": "The arrangement uses a standard rock band setup with...",
-                "energy_flow": "The energy builds gradually through the verses and peaks at...",
-                "suggestions": ["Consider adding a pre-chorus to build tension", "The bridge could benefit from..."]
-            }
-            """
-        else:  # general analysis
-            base_prompt += """
-            Provide a general analysis including:
-            - Key and tempo identification
-            - Overall sound quality assessment
-            - Genre classification
-            - General improvement suggestions
+        Returns:
+            Dictionary mapping each analysis type to its results
+        """
+        try:
+            prompt = self._create_combined_prompt(audio_data, analysis_types)
+            response_text = self._generate(prompt)
             
-            Format your response as JSON with the following structure:
-            {
-                "key": "C Major",
-                "tempo": 120,
-                "time_signature": "4/4",
-                "genre": "Pop/Rock",
-                "sound_quality": "Good overall balance with some issues in...",
-                "suggestions": ["Consider adjusting the levels of...", "The rhythm section could benefit from..."]
-            }
-            """
+            return self._split_combined_response(response_text, analysis_types)
         
-        return base_prompt
+        except Exception as e:
+            logger.error(f"Error analyzing audio with Gemini: {str(e)}")
+            return {t: self._get_default_result(t) for t in analysis_types}
+
+    def _generate(self, prompt: str) -> str:
+        """Send a prompt to Gemini and return the response text."""
+        response = self.model.generate_content(prompt)
+        return response.text
+    
+    def _create_prompt(self, audio_data: Dict[str, Any], analysis_type: str) -> str:
+        """Create a prompt for Gemini based on analysis type."""
+        return build_prompt(
+            audio_data,
+            analysis_type,
+            role="You are a professional music producer and audio engineer.",
+        )
+
+    def _create_combined_prompt(self, audio_data: Dict[str, Any], analysis_types: List[str]) -> str:
+        """Create a prompt for Gemini requesting several analysis types."""
+        return build_combined_prompt(
+            audio_data,
+            analysis_types,
+            role="You are a professional music producer and audio engineer.",
+        )
     
     def _parse_response(self, response_text: str, analysis_type: str) -> Dict[str, Any]:
         """Parse the response from Gemini API."""
@@ -199,6 +245,9 @@ class GeminiService(AIService):
 
 class OpenAIService(AIService):
     """OpenAI API integration for audio analysis."""
+
+    provider = "openai"
+    model_name = "gpt-4"
     
     def __init__(self):
         """Initialize OpenAI API client."""
@@ -206,7 +255,7 @@ class OpenAIService(AIService):
             logger.error("OPENAI_API_KEY not set in environment variables")
             raise ValueError("OPENAI_API_KEY environment variable must be set")
         
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_API_BASE_URL)
     
     def analyze_audio_content(self, audio_data: Dict[str, Any], analysis_type: str) -> Dict[str, Any]:
         """
@@ -221,104 +270,62 @@ class OpenAIService(AIService):
         """
         try:
             prompt = self._create_prompt(audio_data, analysis_type)
+            response_text = self._generate(prompt)
             
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a professional music producer and audio engineer."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            result = self._parse_response(response.choices[0].message.content, analysis_type)
+            result = self._parse_response(response_text, analysis_type)
             return result
         
         except Exception as e:
             logger.error(f"Error analyzing audio with OpenAI: {str(e)}")
             return self._get_default_result(analysis_type)
-    
-    def _create_prompt(self, audio_data: Dict[str, Any], analysis_type: str) -> str:
-        """Create a prompt for OpenAI based on analysis type."""
-        base_prompt = f"""
-        Analyze the following audio data and provide insights.
-        
-        Audio data:
-        {json.dumps(audio_data, indent=2)}
-        
-        Analysis type: {analysis_type}
+
+    def analyze_audio_content_multi(
+        self, audio_data: Dict[str, Any], analysis_types: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
         """
+        Analyze audio content for several analysis types in one OpenAI request.
         
-        if analysis_type == "music_theory":
-            base_prompt += """
-            Provide a detailed music theory analysis including:
-            - Key and scale identification
-            - Chord progression analysis
-            - Harmonic structure
-            - Suggestions for complementary chords
-            
-            Format your response as JSON with the following structure:
-            {
-                "key": "C Major",
-                "scale": ["C", "D", "E", "F", "G", "A", "B"],
-                "chord_progression": ["C", "Am", "F", "G"],
-                "harmonic_analysis": "The progression follows a I-vi-IV-V pattern...",
-                "suggestions": ["Try adding a secondary dominant...", "Consider a modal interchange..."]
-            }
-            """
-        elif analysis_type == "production_feedback":
-            base_prompt += """
-            Provide production feedback including:
-            - Mix balance assessment
-            - EQ recommendations
-            - Dynamic processing suggestions
-            - Spatial effects recommendations
-            
-            Format your response as JSON with the following structure:
-            {
-                "mix_balance": "The low-end is slightly overpowering...",
-                "eq_recommendations": ["Cut around 200Hz to reduce muddiness", "Boost at 3kHz for clarity"],
-                "dynamics_suggestions": ["Apply more compression to the bass", "Consider multiband compression for..."],
-                "spatial_recommendations": ["Add a short room reverb", "Pan elements wider for more stereo width"]
-            }
-            """
-        elif analysis_type == "arrangement_analysis":
-            base_prompt += """
-            Provide arrangement analysis including:
-            - Structure identification
-            - Instrumentation assessment
-            - Energy flow analysis
-            - Arrangement improvement suggestions
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_types: Types of analysis to perform
             
-            Format your response as JSON with the following structure:
-            {
-                "structure": ["Intro", "Verse", "Chorus", "Verse", "Chorus", "Bridge", "Chorus", "Outro"],
-                "instrumentation": "The arrangement uses a standard rock band setup with...",
-                "energy_flow": "The energy builds gradually through the verses and peaks at...",
-                "suggestions": ["Consider adding a pre-chorus to build tension", "The bridge could benefit from..."]
-            }
-            """
-        else:  # general analysis
-            base_prompt += """
-            Provide a general analysis including:
-            - Key and tempo identification
-            - Overall sound quality assessment
-            - Genre classification
-            - General improvement suggestions
+        Returns:
+            Dictionary mapping each analysis type to its results
+        """
+        try:
+            prompt = self._create_combined_prompt(audio_data, analysis_types)
+            response_text = self._generate(prompt, max_tokens=MAX_TOKENS_PER_ANALYSIS * len(analysis_types))
             
-            Format your response as JSON with the following structure:
-            {
-                "key": "C Major",
-                "tempo": 120,
-                "time_signature": "4/4",
-                "genre": "Pop/Rock",
-                "sound_quality": "Good overall balance with some issues in...",
-                "suggestions": ["Consider adjusting the levels of...", "The rhythm section could benefit from..."]
-            }
-            """
+            return self._split_combined_response(response_text, analysis_types)
         
-        return base_prompt
+        except Exception as e:
+            logger.error(f"Error analyzing audio with OpenAI: {str(e)}")
+            return {t: self._get_default_result(t) for t in analysis_types}
+
+    def _chat_request(self, prompt: str, max_tokens: int = MAX_TOKENS_PER_ANALYSIS) -> Dict[str, Any]:
+        """Build the chat completion request for a prompt."""
+        return {
+            "model": self.model_name,
+            "messages": [
+                {"role": "system", "content": "You are a professional music producer and audio engineer."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": max_tokens,
+        }
+
+    def _generate(self, prompt: str, max_tokens: int = MAX_TOKENS_PER_ANALYSIS) -> str:
+        """Send a prompt to OpenAI and return the response text."""
+        response = self.client.chat.completions.create(**self._chat_request(prompt, max_tokens))
+        return response.choices[0].message.content
+    
+    def _create_prompt(self, audio_data: Dict[str, Any], analysis_type: str) -> str:
+        """Create a prompt for OpenAI based on analysis type."""
+        return build_prompt(audio_data, analysis_type)
+
+    def _create_combined_prompt(self, audio_data: Dict[str, Any], analysis_types: List[str]) -> str:
+        """Create a prompt for OpenAI requesting several analysis types."""
+        return build_combined_prompt(audio_data, analysis_types)
     
     def _parse_response(self, response_text: str, analysis_type: str) -> Dict[str, Any]:
         """Parse the response from OpenAI API."""
@@ -373,6 +380,635 @@ class OpenAIService(AIService):
             }
 
 
+# Long-lived HTTP clients shared by all async services of a provider
+_http_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def _get_http_client(provider: str) -> httpx.AsyncClient:
+    """Get the pooled HTTP client for a provider, creating it on first use."""
+    client = _http_clients.get(provider)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.AI_REQUEST_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.AI_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.AI_MAX_CONCURRENCY,
+            ),
+        )
+        _http_clients[provider] = client
+    return client
+
+
+# Concurrency limits shared by all async services of a provider, so the hedged
+# and the single-provider services together stay within AI_MAX_CONCURRENCY
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _get_semaphore(provider: str) -> asyncio.Semaphore:
+    """Get the concurrency limit of a provider, creating it on first use."""
+    semaphore = _semaphores.get(provider)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+        _semaphores[provider] = semaphore
+    return semaphore
+
+
+async def _stream_events(
+    service: AIService, chunks: AsyncIterator[str], analysis_type: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """Relay provider text chunks as token events, then yield the parsed result."""
+    parts = []
+    try:
+        async with service.semaphore:
+            deadline = time.monotonic() + service.timeout
+            while True:
+                try:
+                    text = await asyncio.wait_for(chunks.__anext__(), deadline - time.monotonic())
+                except StopAsyncIteration:
+                    break
+                if text:
+                    parts.append(text)
+                    yield {"event": "token", "text": text}
+
+        result = service._parse_response("".join(parts), analysis_type)
+
+    except Exception as e:
+        logger.error(f"Error streaming analysis from {service.provider}: {repr(e)}")
+        result = service._get_default_result(analysis_type)
+
+    finally:
+        await chunks.aclose()
+
+    yield {"event": "result", "result": result}
+
+
+class AsyncGeminiService(GeminiService):
+    """
+    Async Gemini integration.
+
+    analyze_audio_content is a coroutine. Requests go through the Gemini REST API
+    on a shared connection pool and are limited by the provider's concurrency semaphore.
+    """
+
+    def __init__(self):
+        """Initialize the shared Gemini HTTP client."""
+        if not settings.GEMINI_API_KEY:
+            logger.error("GEMINI_API_KEY not set in environment variables")
+            raise ValueError("GEMINI_API_KEY environment variable must be set")
+
+        self.http_client = _get_http_client(self.provider)
+        self.semaphore = _get_semaphore(self.provider)
+        self.timeout = settings.AI_REQUEST_TIMEOUT
+
+    async def analyze_audio_content(self, audio_data: Dict[str, Any], analysis_type: str) -> Dict[str, Any]:
+        """
+        Analyze audio content using Gemini API without blocking the event loop.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_type: Type of analysis to perform
+            
+        Returns:
+            Dictionary containing analysis results
+        """
+        try:
+            prompt = self._create_prompt(audio_data, analysis_type)
+            async with self.semaphore:
+                response_text = await asyncio.wait_for(self._generate_async(prompt), self.timeout)
+            
+            return self._parse_response(response_text, analysis_type)
+        
+        except Exception as e:
+            logger.error(f"Error analyzing audio with Gemini: {repr(e)}")
+            return self._get_default_result(analysis_type)
+
+    async def analyze_audio_content_multi(
+        self, audio_data: Dict[str, Any], analysis_types: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze audio content for several analysis types in one Gemini request.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_types: Types of analysis to perform
+            
+        Returns:
+            Dictionary mapping each analysis type to its results
+        """
+        try:
+            prompt = self._create_combined_prompt(audio_data, analysis_types)
+            async with self.semaphore:
+                response_text = await asyncio.wait_for(self._generate_async(prompt), self.timeout)
+            
+            return self._split_combined_response(response_text, analysis_types)
+        
+        except Exception as e:
+            logger.error(f"Error analyzing audio with Gemini: {repr(e)}")
+            return {t: self._get_default_result(t) for t in analysis_types}
+
+    async def stream_audio_content(
+        self, audio_data: Dict[str, Any], analysis_type: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a Gemini analysis as it is generated.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_type: Type of analysis to perform
+            
+        Yields:
+            Token events followed by one result event
+        """
+        prompt = self._create_prompt(audio_data, analysis_type)
+        async for event in _stream_events(self, self._stream_async(prompt), analysis_type):
+            yield event
+
+    async def _stream_async(self, prompt: str) -> AsyncIterator[str]:
+        """Send a prompt to the Gemini streaming endpoint and yield text chunks."""
+        async with self.http_client.stream(
+            "POST",
+            f"{settings.GEMINI_API_BASE_URL.rstrip('/')}/v1beta/models/{self.model_name}:streamGenerateContent",
+            params={"alt": "sse"},
+            headers={"x-goog-api-key": settings.GEMINI_API_KEY},
+            json={"contents": [{"parts": [{"text": prompt}]}]},
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                candidates = json.loads(line[len("data:"):]).get("candidates", [])
+                if candidates:
+                    for part in candidates[0].get("content", {}).get("parts", []):
+                        yield part.get("text", "")
+
+    async def _generate_async(self, prompt: str) -> str:
+        """Send a prompt to the Gemini REST API and return the response text."""
+        response = await self.http_client.post(
+            f"{settings.GEMINI_API_BASE_URL.rstrip('/')}/v1beta/models/{self.model_name}:generateContent",
+            headers={"x-goog-api-key": settings.GEMINI_API_KEY},
+            json={"contents": [{"parts": [{"text": prompt}]}]},
+        )
+        response.raise_for_status()
+
+        candidates = response.json().get("candidates", [])
+        if not candidates:
+            raise ValueError("Gemini response contained no candidates")
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+
+class AsyncOpenAIService(OpenAIService):
+    """
+    Async OpenAI integration.
+
+    analyze_audio_content is a coroutine. The AsyncOpenAI client shares a pooled
+    HTTP client and requests are limited by the provider's concurrency semaphore.
+    """
+
+    def __init__(self):
+        """Initialize the shared OpenAI async client."""
+        if not settings.OPENAI_API_KEY:
+            logger.error("OPENAI_API_KEY not set in environment variables")
+            raise ValueError("OPENAI_API_KEY environment variable must be set")
+
+        self.client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_API_BASE_URL,
+            http_client=_get_http_client(self.provider),
+        )
+        self.semaphore = _get_semaphore(self.provider)
+        self.timeout = settings.AI_REQUEST_TIMEOUT
+
+    async def analyze_audio_content(self, audio_data: Dict[str, Any], analysis_type: str) -> Dict[str, Any]:
+        """
+        Analyze audio content using OpenAI API without blocking the event loop.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_type: Type of analysis to perform
+            
+        Returns:
+            Dictionary containing analysis results
+        """
+        try:
+            prompt = self._create_prompt(audio_data, analysis_type)
+            async with self.semaphore:
+                response_text = await asyncio.wait_for(self._generate_async(prompt), self.timeout)
+            
+            return self._parse_response(response_text, analysis_type)
+        
+        except Exception as e:
+            logger.error(f"Error analyzing audio with OpenAI: {repr(e)}")
+            return self._get_default_result(analysis_type)
+
+    async def analyze_audio_content_multi(
+        self, audio_data: Dict[str, Any], analysis_types: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze audio content for several analysis types in one OpenAI request.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_types: Types of analysis to perform
+            
+        Returns:
+            Dictionary mapping each analysis type to its results
+        """
+        try:
+            prompt = self._create_combined_prompt(audio_data, analysis_types)
+            max_tokens = MAX_TOKENS_PER_ANALYSIS * len(analysis_types)
+            async with self.semaphore:
+                response_text = await asyncio.wait_for(
+                    self._generate_async(prompt, max_tokens=max_tokens), self.timeout
+                )
+            
+            return self._split_combined_response(response_text, analysis_types)
+        
+        except Exception as e:
+            logger.error(f"Error analyzing audio with OpenAI: {repr(e)}")
+            return {t: self._get_default_result(t) for t in analysis_types}
+
+    async def stream_audio_content(
+        self, audio_data: Dict[str, Any], analysis_type: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an OpenAI analysis as it is generated.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_type: Type of analysis to perform
+            
+        Yields:
+            Token events followed by one result event
+        """
+        prompt = self._create_prompt(audio_data, analysis_type)
+        async for event in _stream_events(self, self._stream_async(prompt), analysis_type):
+            yield event
+
+    async def _stream_async(self, prompt: str, max_tokens: int = MAX_TOKENS_PER_ANALYSIS) -> AsyncIterator[str]:
+        """Send a prompt to OpenAI with streaming enabled and yield text chunks."""
+        stream = await self.client.chat.completions.create(
+            **self._chat_request(prompt, max_tokens), stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def _generate_async(self, prompt: str, max_tokens: int = MAX_TOKENS_PER_ANALYSIS) -> str:
+        """Send a prompt to OpenAI and return the response text."""
+        response = await self.client.chat.completions.create(**self._chat_request(prompt, max_tokens))
+        return response.choices[0].message.content
+
+
+class HedgedAIService(AIService):
+    """
+    Async AIService that routes requests across several providers.
+
+    Each request goes to the first provider whose circuit breaker allows it.
+    If no usable result has arrived after that provider's hedge delay (a
+    latency percentile), the same request is also sent to the next provider
+    and the first usable result wins. A failed call triggers the next provider
+    immediately. Default results count as failures.
+    """
+
+    provider = "hedged"
+
+    def __init__(self, services: Dict[str, AIService], primary: Optional[str] = None):
+        """
+        Args:
+            services: Async AI services keyed by provider name
+            primary: Provider to try first; the others follow in insertion order
+        """
+        self.services = services
+        self.order = list(services)
+        if primary in services:
+            self.order.remove(primary)
+            self.order.insert(0, primary)
+        self.health = {name: ProviderHealth(name) for name in services}
+        self.model_name = "+".join(services[name].model_name for name in self.order)
+
+    async def analyze_audio_content(self, audio_data: Dict[str, Any], analysis_type: str) -> Dict[str, Any]:
+        """
+        Analyze audio content with the fastest healthy provider.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_type: Type of analysis to perform
+            
+        Returns:
+            Dictionary containing analysis results
+        """
+        result = await self._route(
+            lambda service: service.analyze_audio_content(audio_data, analysis_type),
+            lambda service, result: result != service._get_default_result(analysis_type),
+        )
+        return result if result is not None else self._get_default_result(analysis_type)
+
+    async def analyze_audio_content_multi(
+        self, audio_data: Dict[str, Any], analysis_types: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze audio content for several analysis types with the fastest healthy provider.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_types: Types of analysis to perform
+            
+        Returns:
+            Dictionary mapping each analysis type to its results
+        """
+        result = await self._route(
+            lambda service: service.analyze_audio_content_multi(audio_data, analysis_types),
+            lambda service, result: any(
+                result[t] != service._get_default_result(t) for t in analysis_types
+            ),
+        )
+        if result is None:
+            return {t: self._get_default_result(t) for t in analysis_types}
+        return result
+
+    async def stream_audio_content(
+        self, audio_data: Dict[str, Any], analysis_type: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an analysis from the first healthy provider.
+
+        Streams are not hedged because tokens from two providers cannot be
+        interleaved. A provider that fails before producing any text is
+        skipped in favour of the next one.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_type: Type of analysis to perform
+            
+        Yields:
+            Token events followed by one result event
+        """
+        remaining = list(self.order)
+        streamed = False
+        while not streamed:
+            name = self._next_provider(remaining)
+            if name is None:
+                break
+            service = self.services[name]
+            started = time.monotonic()
+            recorded = False
+            try:
+                async for event in service.stream_audio_content(audio_data, analysis_type):
+                    if event["event"] != "result":
+                        streamed = True
+                        yield event
+                        continue
+
+                    recorded = True
+                    if event["result"] != service._get_default_result(analysis_type):
+                        self.health[name].record_success(time.monotonic() - started)
+                        yield event
+                        return
+                    self.health[name].record_failure()
+            finally:
+                if not recorded:
+                    self.health[name].record_cancelled()
+
+        yield {"event": "result", "result": self._get_default_result(analysis_type)}
+
+    def _get_default_result(self, analysis_type: str) -> Dict[str, Any]:
+        return self.services[self.order[0]]._get_default_result(analysis_type)
+
+    def _next_provider(self, remaining: List[str]) -> Optional[str]:
+        """Pop the next provider whose circuit breaker accepts a request."""
+        while remaining:
+            name = remaining.pop(0)
+            if self.health[name].allow_request():
+                return name
+            logger.debug(f"Skipping {name}: circuit open")
+        return None
+
+    async def _route(
+        self,
+        call: Callable[[AIService], Awaitable[Any]],
+        is_valid: Callable[[AIService, Any], bool],
+    ) -> Optional[Any]:
+        """Run call against the providers with hedging; return the first valid result or None."""
+        remaining = list(self.order)
+        pending: Dict[asyncio.Task, str] = {}
+        started: Dict[str, float] = {}
+
+        def launch(name: str) -> None:
+            started[name] = time.monotonic()
+            pending[asyncio.ensure_future(call(self.services[name]))] = name
+
+        name = self._next_provider(remaining)
+        if name is None:
+            logger.warning("All AI providers are unavailable (circuits open)")
+            return None
+        launch(name)
+
+        try:
+            while pending:
+                delay = None
+                if remaining:
+                    # Hedge based on the most recently started provider's latency profile
+                    delay = self.health[list(pending.values())[-1]].hedge_delay()
+
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    hedge = self._next_provider(remaining)
+                    if hedge is not None:
+                        logger.info(f"Hedging AI request to {hedge} after {delay:.2f}s")
+                        launch(hedge)
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    latency = time.monotonic() - started[name]
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.error(f"AI provider {name} failed: {repr(e)}")
+                        result = None
+
+                    if result is not None and is_valid(self.services[name], result):
+                        self.health[name].record_success(latency)
+                        return result
+                    self.health[name].record_failure()
+
+                if not pending:
+                    # Everything in flight failed; fail over without waiting for the hedge delay
+                    name = self._next_provider(remaining)
+                    if name is not None:
+                        launch(name)
+
+            return None
+
+        finally:
+            for task, name in pending.items():
+                task.cancel()
+                self.health[name].record_cancelled()
+
+
+class CachedAIService(AIService):
+    """AIService wrapper that serves repeated analyses from the response cache."""
+
+    def __init__(self, service: AIService, cache: ResponseCache):
+        self.service = service
+        self.cache = cache
+        self.provider = service.provider
+        self.model_name = service.model_name
+
+    def analyze_audio_content(self, audio_data: Dict[str, Any], analysis_type: str) -> Dict[str, Any]:
+        """
+        Analyze audio content, reusing a cached response when available.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_type: Type of analysis to perform
+            
+        Returns:
+            Dictionary containing analysis results
+        """
+        key = make_cache_key(
+            self.provider, self.model_name, PROMPT_TEMPLATE_VERSION, analysis_type, audio_data
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug(f"AI cache hit for {self.provider}/{analysis_type}")
+            return cached
+
+        result = self.service.analyze_audio_content(audio_data, analysis_type)
+
+        # Fallback results signal a failed call and must not be served from cache
+        if result != self.service._get_default_result(analysis_type):
+            self.cache.set(key, result)
+
+        return result
+
+    def analyze_audio_content_multi(
+        self, audio_data: Dict[str, Any], analysis_types: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze audio content for several types, requesting only the uncached ones.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_types: Types of analysis to perform
+            
+        Returns:
+            Dictionary mapping each analysis type to its results
+        """
+        keys = self._cache_keys(audio_data, analysis_types)
+        results = {}
+        for analysis_type in analysis_types:
+            cached = self.cache.get(keys[analysis_type])
+            if cached is not None:
+                results[analysis_type] = cached
+
+        missing = [t for t in analysis_types if t not in results]
+        if missing:
+            fresh = self.service.analyze_audio_content_multi(audio_data, missing)
+            for analysis_type, result in fresh.items():
+                if result != self.service._get_default_result(analysis_type):
+                    self.cache.set(keys[analysis_type], result)
+            results.update(fresh)
+
+        return results
+
+    def _cache_keys(self, audio_data: Dict[str, Any], analysis_types: List[str]) -> Dict[str, str]:
+        return {
+            analysis_type: make_cache_key(
+                self.provider, self.model_name, PROMPT_TEMPLATE_VERSION, analysis_type, audio_data
+            )
+            for analysis_type in analysis_types
+        }
+
+
+class AsyncCachedAIService(CachedAIService):
+    """Async counterpart of CachedAIService for the async AI services."""
+
+    async def analyze_audio_content(self, audio_data: Dict[str, Any], analysis_type: str) -> Dict[str, Any]:
+        """
+        Analyze audio content, reusing a cached response when available.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_type: Type of analysis to perform
+            
+        Returns:
+            Dictionary containing analysis results
+        """
+        key = make_cache_key(
+            self.provider, self.model_name, PROMPT_TEMPLATE_VERSION, analysis_type, audio_data
+        )
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            logger.debug(f"AI cache hit for {self.provider}/{analysis_type}")
+            return cached
+
+        result = await self.service.analyze_audio_content(audio_data, analysis_type)
+
+        if result != self.service._get_default_result(analysis_type):
+            await asyncio.to_thread(self.cache.set, key, result)
+
+        return result
+
+    async def stream_audio_content(
+        self, audio_data: Dict[str, Any], analysis_type: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an analysis, yielding a cached result immediately when available.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_type: Type of analysis to perform
+            
+        Yields:
+            Token events followed by one result event
+        """
+        key = make_cache_key(
+            self.provider, self.model_name, PROMPT_TEMPLATE_VERSION, analysis_type, audio_data
+        )
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            yield {"event": "result", "result": cached}
+            return
+
+        async for event in self.service.stream_audio_content(audio_data, analysis_type):
+            if event["event"] == "result" and event["result"] != self.service._get_default_result(analysis_type):
+                await asyncio.to_thread(self.cache.set, key, event["result"])
+            yield event
+
+    async def analyze_audio_content_multi(
+        self, audio_data: Dict[str, Any], analysis_types: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze audio content for several types, requesting only the uncached ones.
+        
+        Args:
+            audio_data: Dictionary containing audio metadata and features
+            analysis_types: Types of analysis to perform
+            
+        Returns:
+            Dictionary mapping each analysis type to its results
+        """
+        keys = self._cache_keys(audio_data, analysis_types)
+        results = {}
+        for analysis_type in analysis_types:
+            cached = await asyncio.to_thread(self.cache.get, keys[analysis_type])
+            if cached is not None:
+                results[analysis_type] = cached
+
+        missing = [t for t in analysis_types if t not in results]
+        if missing:
+            fresh = await self.service.analyze_audio_content_multi(audio_data, missing)
+            for analysis_type, result in fresh.items():
+                if result != self.service._get_default_result(analysis_type):
+                    await asyncio.to_thread(self.cache.set, keys[analysis_type], result)
+            results.update(fresh)
+
+        return results
+
+
 def get_ai_service(service_name: str = None) -> AIService:
     """
     Factory function to get the appropriate AI service.
@@ -381,8 +1017,16 @@ def get_ai_service(service_name: str = None) -> AIService:
         service_name: Name of the AI service to use ('gemini' or 'openai')
         
     Returns:
-        AIService instance
+        AIService instance, wrapped in the response cache when AI_CACHE_ENABLED is set
     """
+    service = _create_ai_service(service_name)
+    if settings.AI_CACHE_ENABLED:
+        return CachedAIService(service, get_response_cache())
+    return service
+
+
+def _create_ai_service(service_name: str = None) -> AIService:
+    """Instantiate the provider-specific AI service."""
     if not service_name:
         if settings.GEMINI_API_KEY:
             return GeminiService()
@@ -397,3 +1041,63 @@ def get_ai_service(service_name: str = None) -> AIService:
         return OpenAIService()
     else:
         raise ValueError(f"Unknown AI service: {service_name}")
+
+
+_async_services: Dict[str, AIService] = {}
+
+
+def get_async_ai_service(service_name: str = None) -> AIService:
+    """
+    Get a long-lived async AI service for use inside the event loop.
+
+    Instances are shared per provider so that every request reuses the same
+    connection pool and concurrency limit. Without a service name, and with both
+    API keys configured, requests are hedged across Gemini and OpenAI.
+    
+    Args:
+        service_name: Name of the AI service to use ('gemini', 'openai' or 'hedged')
+        
+    Returns:
+        AIService instance whose analyze_audio_content is a coroutine
+    """
+    if not service_name:
+        if settings.AI_HEDGING_ENABLED and settings.GEMINI_API_KEY and settings.OPENAI_API_KEY:
+            service_name = "hedged"
+        elif settings.GEMINI_API_KEY:
+            service_name = "gemini"
+        elif settings.OPENAI_API_KEY:
+            service_name = "openai"
+        else:
+            raise ValueError("No AI service API keys configured")
+
+    service_name = service_name.lower()
+    service = _async_services.get(service_name)
+    if service is not None:
+        return service
+
+    if service_name == "gemini":
+        service = AsyncGeminiService()
+    elif service_name == "openai":
+        service = AsyncOpenAIService()
+    elif service_name == "hedged":
+        service = HedgedAIService(
+            {"gemini": AsyncGeminiService(), "openai": AsyncOpenAIService()},
+            primary="gemini",
+        )
+    else:
+        raise ValueError(f"Unknown AI service: {service_name}")
+
+    if settings.AI_CACHE_ENABLED:
+        service = AsyncCachedAIService(service, get_response_cache())
+
+    _async_services[service_name] = service
+    return service
+
+
+async def close_async_ai_clients() -> None:
+    """Close the shared HTTP clients used by the async AI services."""
+    for client in _http_clients.values():
+        await client.aclose()
+    _http_clients.clear()
+    _semaphores.clear()
+    _async_services.clear()
@@ -0,0 +1,124 @@
+"""
+File storage for intermediate and final processing artifacts.
+
+Artifacts live under ARTIFACT_DIR/<audio_file_id>/<kind>/<name>, so every
+pipeline stage can find the outputs of earlier stages, and a retried stage
+can skip work whose artifacts already exist.
+
+Tasks never return large outputs through Celery: they write them here and
+return a reference from artifact_ref, which keeps broker and result backend
+memory independent of the size of the audio.
+"""
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, Optional
+
+from app.core.config import settings
+
+STEMS = "stems"
+MIDI = "midi"
+FEATURES = "features"
+REPORT = "report"
+PEAKS = "peaks"
+SPECTROGRAMS = "spectrograms"
+
+
+def artifact_dir(audio_file_id: int, kind: str) -> Path:
+    """Return the directory for one kind of artifact of a file, creating it if needed."""
+    path = Path(settings.ARTIFACT_DIR) / str(audio_file_id) / kind
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def artifact_path(audio_file_id: int, kind: str, name: str) -> Path:
+    return artifact_dir(audio_file_id, kind) / name
+
+
+def exists(audio_file_id: int, kind: str, name: str) -> bool:
+    return (Path(settings.ARTIFACT_DIR) / str(audio_file_id) / kind / name).is_file()
+
+
+def list_artifacts(audio_file_id: int, kind: str, suffix: str = "") -> Dict[str, Path]:
+    """Map artifact stem name to path for all artifacts of a kind, e.g. {"vocals": .../vocals.wav}."""
+    path = Path(settings.ARTIFACT_DIR) / str(audio_file_id) / kind
+    if not path.is_dir():
+        return {}
+    return {p.stem: p for p in sorted(path.iterdir()) if p.is_file() and p.name.endswith(suffix)}
+
+
+def artifact_ref(audio_file_id: int, kind: str, name: str) -> Dict[str, Any]:
+    """Small, serializable reference to an artifact for task results and job rows."""
+    return {"audio_file_id": audio_file_id, "kind": kind, "name": name}
+
+
+def resolve_ref(ref: Dict[str, Any]) -> Path:
+    return Path(settings.ARTIFACT_DIR) / str(ref["audio_file_id"]) / ref["kind"] / ref["name"]
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "wb", should_stop: Optional[Callable[[], None]] = None) -> Iterator[IO]:
+    """
+    Open a temporary file next to path, moved over path once written.
+
+    Each writer gets its own uniquely named temporary file, so concurrent
+    writers of the same artifact never interleave and readers never see a
+    partial file. The temporary file is removed if writing fails.
+
+    should_stop is called right before the file is moved into place and may
+    raise to discard it. Pipeline stages pass their cancellation check, so a
+    stage whose file was deleted meanwhile does not recreate its artifacts.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    written = False
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        written = True
+        if should_stop is not None:
+            should_stop()
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        if written:
+            # Stopped: don't leave behind directories that a delete had removed
+            _remove_empty_dirs(path.parent)
+        raise
+
+
+def _remove_empty_dirs(path: Path) -> None:
+    """Remove path and its parents up to ARTIFACT_DIR while they are empty, e.g. recreated after a delete."""
+    root = Path(settings.ARTIFACT_DIR).resolve()
+    path = path.resolve()
+    while path != root and root in path.parents:
+        try:
+            path.rmdir()
+        except OSError:
+            return
+        path = path.parent
+
+
+def write_json(
+    audio_file_id: int, kind: str, name: str, data: Any, should_stop: Optional[Callable[[], None]] = None
+) -> Path:
+    """Write a JSON artifact atomically so readers never see a partial file (see atomic_write for should_stop)."""
+    path = artifact_path(audio_file_id, kind, name)
+    with atomic_write(path, "w", should_stop=should_stop) as f:
+        json.dump(data, f)
+    return path
+
+
+def read_json(audio_file_id: int, kind: str, name: str) -> Any:
+    with open(artifact_path(audio_file_id, kind, name)) as f:
+        return json.load(f)
+
+
+def delete_artifacts(audio_file_id: int) -> None:
+    """Remove every artifact of a file."""
+    shutil.rmtree(Path(settings.ARTIFACT_DIR) / str(audio_file_id), ignore_errors=True)
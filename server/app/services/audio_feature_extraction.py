@@ -35,7 +35,7 @@ def extract_audio_features(file_path: str) -> Dict[str, Any]:
         harmonic, percussive = librosa.effects.hpss(y)
         chroma = librosa.feature.chroma_cqt(y=harmonic, sr=sr).mean(axis=1)
         
-        key, scale = detect_key(chroma)
+        key, scale, key_confidence = detect_key_with_confidence(chroma)
         
         mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13).mean(axis=1)
         
@@ -49,6 +49,7 @@ def extract_audio_features(file_path: str) -> Dict[str, Any]:
             "mfccs": mfccs.tolist(),
             "detected_key": key,
             "detected_scale": scale,
+            "key_confidence": key_confidence,
             "file_info": {
                 "sample_rate": sr,
                 "file_path": file_path,
@@ -83,6 +84,21 @@ def detect_key(chroma_features: np.ndarray) -> Tuple[str, str]:
     Returns:
         Tuple of (key, scale)
     """
+    key, scale, _ = detect_key_with_confidence(chroma_features)
+    return key, scale
+
+
+def detect_key_with_confidence(chroma_features: np.ndarray) -> Tuple[str, str, float]:
+    """
+    Detect musical key from chroma features along with a confidence score.
+    
+    Args:
+        chroma_features: Chromagram features
+        
+    Returns:
+        Tuple of (key, scale, confidence), where confidence is the correlation
+        of the chroma profile with the winning key template clipped to 0-1
+    """
     major_template = np.array([1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 1])
     minor_template = np.array([1, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 0])
     
@@ -102,9 +118,12 @@ def detect_key(chroma_features: np.ndarray) -> Tuple[str, str]:
     max_minor_idx = np.argmax(minor_correlations)
     
     if major_correlations[max_major_idx] > minor_correlations[max_minor_idx]:
-        return key_names[max_major_idx], "Major"
+        key, scale, correlation = key_names[max_major_idx], "Major", major_correlations[max_major_idx]
     else:
-        return key_names[max_minor_idx], "Minor"
+        key, scale, correlation = key_names[max_minor_idx], "Minor", minor_correlations[max_minor_idx]
+    
+    confidence = float(np.clip(np.nan_to_num(correlation), 0.0, 1.0))
+    return key, scale, confidence
 
 
 def detect_beats(file_path: str) -> List[float]:
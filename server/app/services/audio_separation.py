@@ -1,7 +1,7 @@
 import os
 import uuid
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 
 import numpy as np
 import torch
@@ -11,6 +11,14 @@ from demucs.pretrained import get_model
 from demucs.separate import load_track
 import pyloudnorm as pyln
 
+from app.services.cancellation import OperationCancelled
+from app.services.artifact_store import atomic_write
+
+# Audio is separated in chunks of this length so progress can be reported and
+# cancellation checked between them; neighbouring chunks are cross-faded
+SEPARATION_CHUNK_SECONDS = 30.0
+SEPARATION_OVERLAP_SECONDS = 1.0
+
 
 def normalize_audio_lufs(audio: np.ndarray, sr: int, target_lufs: float = -23.0) -> np.ndarray:
     """
@@ -39,13 +47,99 @@ def normalize_audio_lufs(audio: np.ndarray, sr: int, target_lufs: float = -23.0)
     return normalized_audio
 
 
-def separate_stems(src_path: Path, dst_dir: Path) -> Dict[str, Path]:
+def apply_model_chunked(
+    model,
+    wav: torch.Tensor,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> torch.Tensor:
+    """
+    Run a Demucs model over audio in overlapping chunks
+    
+    Args:
+        model: Demucs model
+        wav: Audio tensor (channels, samples) at the model's sample rate
+        on_progress: Called with the fraction of chunks done after each chunk;
+            may raise to stop the separation
+        
+    Returns:
+        Sources tensor (sources, channels, samples)
+    """
+    length = wav.shape[-1]
+    chunk = int(SEPARATION_CHUNK_SECONDS * model.samplerate)
+    overlap = int(SEPARATION_OVERLAP_SECONDS * model.samplerate)
+    
+    if length <= chunk:
+        with torch.no_grad():
+            sources = apply_model(model, wav[None])[0]
+        if on_progress:
+            on_progress(1.0)
+        return sources
+    
+    starts = list(range(0, length - overlap, chunk - overlap))
+    sources = None
+    weight = torch.zeros(length, device=wav.device)
+    
+    for i, start in enumerate(starts):
+        end = min(start + chunk, length)
+        with torch.no_grad():
+            part = apply_model(model, wav[None, :, start:end])[0]
+        
+        # Linear cross-fade where this chunk overlaps its neighbours
+        fade = torch.ones(end - start, device=wav.device)
+        if start > 0:
+            fade[:overlap] = torch.linspace(0, 1, overlap, device=wav.device)
+        if end < length:
+            fade[-overlap:] = torch.linspace(1, 0, overlap, device=wav.device)
+        
+        if sources is None:
+            sources = torch.zeros(part.shape[0], part.shape[1], length, device=wav.device)
+        sources[..., start:end] += part * fade
+        weight[start:end] += fade
+        
+        if on_progress:
+            on_progress((i + 1) / len(starts))
+    
+    return sources / weight.clamp(min=1e-8)
+
+
+def _save_stems(
+    dst_dir: Path,
+    sources: Dict[str, torch.Tensor],
+    sr: int,
+    should_stop: Optional[Callable[[], None]] = None,
+) -> Dict[str, Path]:
+    """Write each stem next to its final name and swap, so a crash never leaves a partial stem that looks done."""
+    stem_paths = {}
+    for source, source_audio in sources.items():
+        source_path = dst_dir / f"{source}.wav"
+        with atomic_write(source_path, should_stop=should_stop) as f:
+            torchaudio.save(f, source_audio, sr, format="wav")
+        stem_paths[source] = source_path
+    return stem_paths
+
+
+def separate_stems(
+    src_path: Path,
+    dst_dir: Path,
+    on_progress: Optional[Callable[[float], None]] = None,
+    dummy_stems_on_error: bool = True,
+    should_stop: Optional[Callable[[], None]] = None,
+) -> Dict[str, Path]:
     """
     Separate audio file into stems (vocals, drums, bass, other)
     
+    Each stem is written under a temporary name and renamed once complete, so
+    an interrupted separation never leaves a partial stem behind.
+    
     Args:
         src_path: Path to source audio file
         dst_dir: Directory to save stems to
+        on_progress: Called with the fraction of the audio separated; may raise
+            OperationCancelled to stop the separation
+        dummy_stems_on_error: Write the unseparated mix as every stem if the
+            model fails, instead of raising; for testing without the model
+        should_stop: Called before each stem is moved into place; may raise
+            OperationCancelled to discard it
         
     Returns:
         Dictionary mapping stem names to file paths
@@ -77,36 +171,26 @@ def separate_stems(src_path: Path, dst_dir: Path) -> Dict[str, Path]:
         wav = (wav - wav.mean(0)) / wav.std(0)
         wav = wav.to(device)
         
-        with torch.no_grad():
-            sources = apply_model(model, wav[None])[0]
+        sources = apply_model_chunked(model, wav, on_progress)
         
         sources = sources.cpu()
         
         sources = sources * wav.std(0).cpu()
         sources = sources + ref.view(-1, 1)
         
-        stem_paths = {}
-        sources_list = model.sources
-        
-        for i, source in enumerate(sources_list):
-            source_path = dst_dir / f"{source}.wav"
-            source_audio = sources[i]
-            torchaudio.save(source_path, source_audio, model.samplerate)
-            stem_paths[source] = source_path
-        
-        return stem_paths
+        return _save_stems(dst_dir, dict(zip(model.sources, sources)), model.samplerate, should_stop)
+    
+    except OperationCancelled:
+        raise
     
     except Exception as e:
+        if not dummy_stems_on_error:
+            raise
+        
         print(f"Error in stem separation: {e}")
         print("Creating dummy stems for testing purposes")
         
-        stem_paths = {}
-        for source in ["vocals", "drums", "bass", "other"]:
-            source_path = dst_dir / f"{source}.wav"
-            torchaudio.save(source_path, audio, sr)
-            stem_paths[source] = source_path
-        
-        return stem_paths
+        return _save_stems(dst_dir, {source: audio for source in ["vocals", "drums", "bass", "other"]}, sr, should_stop)
     
     finally:
         if temp_path.exists():
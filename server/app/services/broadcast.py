@@ -0,0 +1,87 @@
+"""
+Fan-out of streamed computations to any number of listeners.
+
+Each computation runs in its own task, independent of the responses that
+stream its events: a listener joining late gets every event from the start,
+and a listener disconnecting neither stops the computation nor affects the
+other listeners.
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+Event = Dict[str, Any]
+
+
+class Broadcast:
+    """Events of one computation, kept until it finishes so late listeners can replay them."""
+
+    def __init__(self):
+        self.events: List[Event] = []
+        self.closed = False
+        self._changed = asyncio.Condition()
+
+    async def publish(self, event: Event) -> None:
+        async with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    async def close(self) -> None:
+        async with self._changed:
+            self.closed = True
+            self._changed.notify_all()
+
+    async def listen(self) -> AsyncIterator[Event]:
+        """Yield every event published so far, then new ones until the broadcast is closed."""
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.events) > sent or self.closed)
+                events, closed = self.events[sent:], self.closed
+            for event in events:
+                yield event
+            sent += len(events)
+            if closed and sent == len(self.events):
+                return
+
+
+class BroadcastGroup:
+    """Broadcasts keyed by computation; at most one computation runs per key at a time."""
+
+    def __init__(self):
+        self._broadcasts: Dict[str, Broadcast] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def subscribe(self, key: str, produce: Callable[[Broadcast], Awaitable[None]]) -> AsyncIterator[Event]:
+        """
+        Listen to the computation for key, starting it if none is running.
+
+        Args:
+            key: Identity of the computation
+            produce: Coroutine function running the computation and publishing its events
+
+        Returns:
+            Async iterator over the computation's events
+        """
+        broadcast = self._broadcasts.get(key)
+        if broadcast is None:
+            broadcast = Broadcast()
+            self._broadcasts[key] = broadcast
+            task = asyncio.ensure_future(self._produce(key, broadcast, produce))
+            # The event loop only keeps weak references to tasks
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return broadcast.listen()
+
+    async def _produce(self, key: str, broadcast: Broadcast, produce: Callable[[Broadcast], Awaitable[None]]) -> None:
+        try:
+            await produce(broadcast)
+        except Exception as e:
+            logger.error(f"Error producing {key}: {str(e)}")
+            await broadcast.publish({"event": "error", "detail": str(e)})
+        finally:
+            if self._broadcasts.get(key) is broadcast:
+                del self._broadcasts[key]
+            await broadcast.close()
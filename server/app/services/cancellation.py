@@ -0,0 +1,66 @@
+"""
+Cooperative cancellation of processing jobs.
+
+Cancelling a job marks its row cancelled and sets a short-lived Redis flag.
+Long-running tasks check for either between units of work (separation
+segments, stems) and stop by raising OperationCancelled. Deleting a job's row,
+e.g. with its audio file, cancels it too.
+"""
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.core.redis_client import get_redis_client
+from app.crud.job import job
+from app.db.base import SessionLocal
+from app.models.job import JOB_CANCELLED
+
+logger = logging.getLogger(__name__)
+
+CANCEL_KEY_PREFIX = "job-cancel:"
+
+
+class OperationCancelled(Exception):
+    """Raised inside a task when its job has been cancelled."""
+
+
+def request_cancellation(job_id: str) -> None:
+    """Flag a job as cancelled for fast checks by the workers."""
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        client.set(CANCEL_KEY_PREFIX + job_id, "1", ex=settings.CELERY_VISIBILITY_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Failed to flag job {job_id} as cancelled: {str(e)}")
+
+
+def is_cancelled(job_id: Optional[str]) -> bool:
+    """
+    Return whether a job has been cancelled, checking the Redis flag before the job row.
+
+    A job whose row no longer exists counts as cancelled: jobs are deleted
+    together with their audio file, whose work must stop as well.
+    """
+    if not job_id:
+        return False
+
+    client = get_redis_client()
+    if client is not None:
+        try:
+            if client.exists(CANCEL_KEY_PREFIX + job_id):
+                return True
+        except Exception as e:
+            logger.warning(f"Failed to check cancellation of job {job_id}: {str(e)}")
+
+    db = SessionLocal()
+    try:
+        db_job = job.get(db, id=job_id)
+        return db_job is None or db_job.status == JOB_CANCELLED
+    finally:
+        db.close()
+
+
+def raise_if_cancelled(job_id: Optional[str]) -> None:
+    if is_cancelled(job_id):
+        raise OperationCancelled(f"Job {job_id} was cancelled")
@@ -0,0 +1,99 @@
+"""
+Size-bounded file cache on local disk with least-recently-used eviction.
+
+Entries are files under the cache directory, named by their key. Reads bump
+an entry's modification time, so the order survives restarts: on first use
+the cache scans its directory and orders entries by modification time.
+"""
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.services.artifact_store import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+class DiskLRUCache:
+    """Bytes cache in a directory, evicting least recently used entries beyond max_bytes."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        """
+        Args:
+            directory: Directory holding the entries, created on first write
+            max_bytes: Total size of the entries above which the oldest are evicted
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._entries: Optional["OrderedDict[str, int]"] = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key
+
+    def _load(self) -> "OrderedDict[str, int]":
+        """Index existing entries by last use; caller holds the lock."""
+        if self._entries is None:
+            found = []
+            if self.directory.is_dir():
+                for path in self.directory.rglob("*"):
+                    if path.is_file() and not path.name.startswith("."):
+                        stat = path.stat()
+                        found.append((stat.st_mtime, path.relative_to(self.directory).as_posix(), stat.st_size))
+            self._entries = OrderedDict((key, size) for _, key, size in sorted(found))
+            self._size = sum(self._entries.values())
+        return self._entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            entries = self._load()
+            if key in entries:
+                entries.move_to_end(key)
+            else:
+                # Written by another process since the index was built
+                entries[key] = len(data)
+                self._size += len(data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(path.parent, exist_ok=True)
+            with atomic_write(path) as f:
+                f.write(data)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {key}: {str(e)}")
+            return
+
+        with self._lock:
+            entries = self._load()
+            self._size += len(data) - entries.pop(key, 0)
+            entries[key] = len(data)
+            while self._size > self.max_bytes and len(entries) > 1:
+                old_key, old_size = entries.popitem(last=False)
+                self._size -= old_size
+                try:
+                    os.remove(self._path(old_key))
+                except OSError:
+                    pass
+
+    def evict_prefix(self, prefix: str) -> None:
+        """Remove every entry under a key prefix, e.g. all tiles of one file."""
+        with self._lock:
+            entries = self._load()
+            for key in [k for k in entries if k.startswith(prefix + "/")]:
+                self._size -= entries.pop(key)
+        shutil.rmtree(self._path(prefix), ignore_errors=True)
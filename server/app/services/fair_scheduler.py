@@ -0,0 +1,266 @@
+"""
+Weighted fair dispatch of processing jobs across users.
+
+Jobs are not sent to the broker when they are submitted. They wait in a Redis
+queue per flow, where a flow is one user's jobs in one priority lane, and are
+dispatched when a slot of their job class frees up. The next job always comes
+from the flow with the lowest virtual finish time, and every dispatch advances
+its flow by 1 / lane weight. Every user with waiting jobs therefore gets an
+equal share of the slots within a lane, however many jobs they submitted, and
+interactive flows get a larger share than batch flows. Part of each class's
+capacity is reserved for interactive jobs, and their Celery messages carry a
+higher priority, so a single interactive request starts quickly even behind a
+large batch upload.
+
+Slots are released when a job reaches a final status (see
+app.tasks.tracking.update_job), which also dispatches the next job. Checking
+the capacity, popping the next job and reserving its slot happen in one Redis
+script, so concurrent dispatchers in API processes and workers never exceed a
+class's capacity or the interactive reserve. Without Redis, jobs are
+dispatched immediately.
+"""
+import json
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from celery.canvas import Signature
+
+from app.celery_app import celery_app
+from app.core.config import settings
+from app.core.redis_client import get_redis_client
+from app.services.cancellation import is_cancelled
+from app.crud.job import job
+from app.db.base import SessionLocal
+from app.models.job import PRIORITY_INTERACTIVE, PRIORITY_BATCH, JOB_FAILED
+
+logger = logging.getLogger(__name__)
+
+# Job classes with their own capacity
+CLASS_ANALYSIS = "analysis"
+CLASS_PIPELINE = "pipeline"
+JOB_CLASSES = (CLASS_ANALYSIS, CLASS_PIPELINE)
+
+# Celery message priority per lane; with Redis, 0 is consumed first
+LANE_MESSAGE_PRIORITIES = {PRIORITY_INTERACTIVE: 0, PRIORITY_BATCH: 6}
+
+KEY_PREFIX = "sched"
+
+# Appends a job to its flow, and activates the flow at the current virtual time
+SUBMIT_SCRIPT = """
+redis.call("rpush", KEYS[3], ARGV[2])
+if not redis.call("zscore", KEYS[1], ARGV[1]) then
+    local vtime = tonumber(redis.call("get", KEYS[2]) or "0")
+    redis.call("zadd", KEYS[1], vtime + tonumber(ARGV[3]), ARGV[1])
+end
+return redis.call("llen", KEYS[3])
+"""
+
+# Reserves a slot and pops the next job from the flow with the lowest virtual
+# finish time, in one step so concurrent dispatchers never exceed the capacity.
+# KEYS: interactive flows, batch flows, virtual time, in-flight jobs, in-flight batch jobs
+# ARGV: flow list key prefix, capacity, batch capacity, interactive cost, batch cost,
+#       current time, in-flight entries older than this are stale, batch lane name
+DISPATCH_SCRIPT = """
+redis.call("zremrangebyscore", KEYS[4], "-inf", ARGV[7])
+redis.call("zremrangebyscore", KEYS[5], "-inf", ARGV[7])
+if redis.call("zcard", KEYS[4]) >= tonumber(ARGV[2]) then
+    return nil
+end
+local flows_key, flow, score, cost
+local head = redis.call("zrange", KEYS[1], 0, 0, "WITHSCORES")
+if #head > 0 then
+    flows_key, flow, score, cost = KEYS[1], head[1], tonumber(head[2]), ARGV[4]
+end
+if redis.call("zcard", KEYS[5]) < tonumber(ARGV[3]) then
+    head = redis.call("zrange", KEYS[2], 0, 0, "WITHSCORES")
+    if #head > 0 and (score == nil or tonumber(head[2]) < score) then
+        flows_key, flow, score, cost = KEYS[2], head[1], tonumber(head[2]), ARGV[5]
+    end
+end
+if flows_key == nil then
+    return nil
+end
+local list_key = ARGV[1] .. flow
+local item = redis.call("lpop", list_key)
+redis.call("set", KEYS[3], score)
+if redis.call("llen", list_key) == 0 then
+    redis.call("zrem", flows_key, flow)
+else
+    redis.call("zincrby", flows_key, cost, flow)
+end
+local entry = cjson.decode(item)
+redis.call("zadd", KEYS[4], ARGV[6], entry["job_id"])
+if entry["lane"] == ARGV[8] then
+    redis.call("zadd", KEYS[5], ARGV[6], entry["job_id"])
+end
+return item
+"""
+
+
+def lane_priority(lane: str) -> int:
+    """Celery message priority for a lane."""
+    return LANE_MESSAGE_PRIORITIES.get(lane, LANE_MESSAGE_PRIORITIES[PRIORITY_BATCH])
+
+
+class FairScheduler:
+    """Per-class job queues with weighted fair dispatch across users and lanes."""
+
+    def __init__(self, prefix: str = KEY_PREFIX):
+        self.prefix = prefix
+
+    def _key(self, job_class: str, *parts: str) -> str:
+        return ":".join([self.prefix, job_class, *parts])
+
+    def _flow_key_prefix(self, job_class: str) -> str:
+        return self._key(job_class, "flow") + ":"
+
+    def _cost(self, lane: str) -> float:
+        return 1.0 / max(settings.SCHEDULER_LANE_WEIGHTS.get(lane, 1.0), 1e-6)
+
+    def capacity(self, job_class: str) -> int:
+        return settings.SCHEDULER_CAPACITY.get(job_class, 1)
+
+    def submit(
+        self,
+        signature: Signature,
+        job_id: str,
+        user_id: Optional[int],
+        lane: str = PRIORITY_INTERACTIVE,
+        job_class: str = CLASS_ANALYSIS,
+    ) -> None:
+        """
+        Queue a job for fair dispatch.
+
+        Args:
+            signature: Task or canvas that runs the job
+            job_id: ProcessingJob id, released when the job finishes
+            user_id: Tenant the job is accounted to
+            lane: Priority lane (interactive or batch)
+            job_class: Class whose capacity the job occupies
+        """
+        self.submit_many([(signature, job_id)], user_id, lane=lane, job_class=job_class)
+
+    def submit_many(
+        self,
+        jobs: List[Tuple[Signature, str]],
+        user_id: Optional[int],
+        lane: str = PRIORITY_INTERACTIVE,
+        job_class: str = CLASS_ANALYSIS,
+    ) -> None:
+        """
+        Queue several jobs of one user for fair dispatch in a single round trip.
+
+        The jobs join the user's flow in order, so a batch competes with other
+        users' work exactly as the same jobs submitted one by one would.
+
+        Args:
+            jobs: Signature and ProcessingJob id of each job
+            user_id: Tenant the jobs are accounted to
+            lane: Priority lane (interactive or batch)
+            job_class: Class whose capacity the jobs occupy
+        """
+        client = get_redis_client() if settings.SCHEDULER_ENABLED else None
+        if client is None:
+            for signature, _ in jobs:
+                signature.apply_async()
+            return
+
+        flow = f"{lane}:{user_id}"
+        pipe = client.pipeline(transaction=False)
+        for signature, job_id in jobs:
+            entry = json.dumps({
+                "job_id": job_id,
+                "lane": lane,
+                "task": dict(signature),
+            })
+            pipe.eval(
+                SUBMIT_SCRIPT,
+                3,
+                self._key(job_class, "flows", lane),
+                self._key(job_class, "vtime"),
+                self._flow_key_prefix(job_class) + flow,
+                flow,
+                entry,
+                self._cost(lane),
+            )
+        pipe.execute()
+        self.dispatch(job_class)
+
+    def dispatch(self, job_class: str) -> int:
+        """
+        Send queued jobs of a class to the broker while it has free slots.
+
+        Returns:
+            Number of jobs dispatched
+        """
+        client = get_redis_client()
+        if client is None:
+            return 0
+
+        capacity = self.capacity(job_class)
+        batch_capacity = capacity - settings.SCHEDULER_INTERACTIVE_RESERVE
+        dispatched = 0
+
+        while True:
+            # Slots of jobs whose worker died without reporting back eventually expire
+            now = time.time()
+            item = client.eval(
+                DISPATCH_SCRIPT,
+                5,
+                self._key(job_class, "flows", PRIORITY_INTERACTIVE),
+                self._key(job_class, "flows", PRIORITY_BATCH),
+                self._key(job_class, "vtime"),
+                self._key(job_class, "inflight"),
+                self._key(job_class, "inflight", PRIORITY_BATCH),
+                self._flow_key_prefix(job_class),
+                capacity,
+                batch_capacity,
+                self._cost(PRIORITY_INTERACTIVE),
+                self._cost(PRIORITY_BATCH),
+                now,
+                now - settings.CELERY_VISIBILITY_TIMEOUT,
+                PRIORITY_BATCH,
+            )
+            if item is None:
+                break
+
+            entry = json.loads(item)
+            if is_cancelled(entry["job_id"]):
+                logger.info(f"Skipping cancelled job {entry['job_id']}")
+                self.release(entry["job_id"], dispatch_next=False)
+                continue
+
+            try:
+                celery_app.signature(entry["task"]).apply_async()
+                dispatched += 1
+            except Exception as e:
+                logger.error(f"Error dispatching job {entry['job_id']}: {str(e)}")
+                self.release(entry["job_id"], dispatch_next=False)
+                self._fail_job(entry["job_id"], f"Dispatch failed: {str(e)}")
+
+        if dispatched:
+            logger.debug(f"Dispatched {dispatched} {job_class} jobs")
+        return dispatched
+
+    def release(self, job_id: str, dispatch_next: bool = True) -> None:
+        """Free the slot of a finished job and dispatch the next job of its class."""
+        client = get_redis_client()
+        if client is None:
+            return
+
+        for job_class in JOB_CLASSES:
+            removed = client.zrem(self._key(job_class, "inflight"), job_id)
+            client.zrem(self._key(job_class, "inflight", PRIORITY_BATCH), job_id)
+            if removed and dispatch_next:
+                self.dispatch(job_class)
+
+    def _fail_job(self, job_id: str, error: str) -> None:
+        db = SessionLocal()
+        try:
+            job.update_status(db, id=job_id, status=JOB_FAILED, error=error)
+        finally:
+            db.close()
+
+
+scheduler = FairScheduler()
@@ -0,0 +1,183 @@
+"""
+HTTP file responses with Range requests, strong ETags and conditional GETs.
+
+Audio players seek by requesting byte ranges, so downloads answer a single
+"bytes=" range with 206 Partial Content and stream only those bytes. ETags are
+derived from the SHA-256 of the content, which lets browsers and CDNs revalidate
+with If-None-Match (304). Only files that never change under their URL, such
+as uploaded originals, are marked immutable and kept for a long time.
+"""
+import asyncio
+import hashlib
+import mimetypes
+import os
+import re
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.core.config import settings
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Cache lifetime for files whose content never changes under the same URL
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+MEDIA_TYPES = {
+    ".wav": "audio/wav",
+    ".flac": "audio/flac",
+    ".mp3": "audio/mpeg",
+    ".mid": "audio/midi",
+    ".midi": "audio/midi",
+}
+
+
+def etag_for_hash(content_hash: str) -> str:
+    return f'"{content_hash}"'
+
+
+@lru_cache(maxsize=1024)
+def _hash_file(path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file, cached per path, size and modification time."""
+    stat = os.stat(path)
+    return _hash_file(path, stat.st_size, stat.st_mtime_ns)
+
+
+def media_type_for(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    return MEDIA_TYPES.get(extension) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range header into an inclusive (start, end) pair.
+
+    Returns:
+        The range, or None to send the whole file (no header, or a form that
+        is not supported such as multiple ranges)
+
+    Raises:
+        ValueError: If the range cannot be satisfied for a file of this size
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if size == 0:
+        # An empty file has no bytes to address, not even with a suffix range
+        raise ValueError("Range not satisfiable")
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+async def _iter_file(path: str, start: int, length: int) -> AsyncIterator[bytes]:
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        await asyncio.to_thread(f.seek, start)
+        remaining = length
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, min(settings.UPLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+def ranged_file_response(
+    request: Request,
+    path: str,
+    content_hash: Optional[str] = None,
+    media_type: Optional[str] = None,
+    filename: Optional[str] = None,
+    immutable: bool = False,
+) -> Response:
+    """
+    Serve a file with Range, ETag and If-None-Match support.
+
+    Args:
+        request: Incoming request, for its Range and conditional headers
+        path: File to serve
+        content_hash: SHA-256 of the file if known; computed (and cached) otherwise
+        media_type: Content type; guessed from the extension if omitted
+        filename: Name for the Content-Disposition header
+        immutable: Whether the content never changes under this URL; otherwise
+            clients revalidate with the ETag on every use
+
+    Returns:
+        200 with the whole file, 206 with one range, 304 if the client's copy
+        is current, or 416 if the range cannot be satisfied
+    """
+    size = os.path.getsize(path)
+    etag = etag_for_hash(content_hash or file_hash(path))
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+    }
+    if filename:
+        headers["Content-Disposition"] = f"inline; filename*=utf-8''{quote(filename)}"
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    # A range only applies if the client's partial copy is still current
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != etag:
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    media_type = media_type or media_type_for(path)
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    length = end - start + 1 if size else 0
+    headers["Content-Length"] = str(length)
+
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        _iter_file(path, start, length), status_code=status_code, headers=headers, media_type=media_type
+    )
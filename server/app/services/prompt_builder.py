@@ -0,0 +1,323 @@
+"""
+Compact, token-budgeted prompts for AI audio analysis.
+
+Raw feature dictionaries carry full-precision arrays, every beat timestamp and
+local file paths. This module reduces them to the summary statistics each
+analysis type actually needs and keeps the feature payload within a per-type
+token budget.
+"""
+import json
+import logging
+import math
+import statistics
+import textwrap
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough ratio for JSON-heavy text; numbers tokenize worse than prose
+CHARS_PER_TOKEN = 3
+
+KEY_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+
+MAX_SECTIONS = 16
+
+# Feature fields per analysis type, most important first. When the payload is
+# over budget, fields are dropped from the end of the list.
+ANALYSIS_FIELDS = {
+    "music_theory": ["key", "key_confidence", "pitch_profile", "tempo", "duration", "beat_stats", "sections"],
+    "production_feedback": ["spectral", "timbre", "tempo", "duration", "key", "beat_stats", "sections"],
+    "arrangement_analysis": ["sections", "duration", "tempo", "beat_stats", "key", "spectral"],
+    "general": ["key", "tempo", "duration", "key_confidence", "spectral", "beat_stats", "timbre", "sections", "pitch_profile"],
+}
+
+# Fields that are never dropped when enforcing the budget
+REQUIRED_FIELD_COUNT = 2
+
+ANALYSIS_INSTRUCTIONS = {
+    "music_theory": """
+        Provide a detailed music theory analysis including:
+        - Key and scale identification
+        - Chord progression analysis
+        - Harmonic structure
+        - Suggestions for complementary chords
+        """,
+    "production_feedback": """
+        Provide production feedback including:
+        - Mix balance assessment
+        - EQ recommendations
+        - Dynamic processing suggestions
+        - Spatial effects recommendations
+        """,
+    "arrangement_analysis": """
+        Provide arrangement analysis including:
+        - Structure identification
+        - Instrumentation assessment
+        - Energy flow analysis
+        - Arrangement improvement suggestions
+        """,
+    "general": """
+        Provide a general analysis including:
+        - Key and tempo identification
+        - Overall sound quality assessment
+        - Genre classification
+        - General improvement suggestions
+        """,
+}
+
+RESPONSE_STRUCTURES = {
+    "music_theory": """
+        {
+            "key": "C Major",
+            "scale": ["C", "D", "E", "F", "G", "A", "B"],
+            "chord_progression": ["C", "Am", "F", "G"],
+            "harmonic_analysis": "The progression follows a I-vi-IV-V pattern...",
+            "suggestions": ["Try adding a secondary dominant...", "Consider a modal interchange..."]
+        }
+        """,
+    "production_feedback": """
+        {
+            "mix_balance": "The low-end is slightly overpowering...",
+            "eq_recommendations": ["Cut around 200Hz to reduce muddiness", "Boost at 3kHz for clarity"],
+            "dynamics_suggestions": ["Apply more compression to the bass", "Consider multiband compression for..."],
+            "spatial_recommendations": ["Add a short room reverb", "Pan elements wider for more stereo width"]
+        }
+        """,
+    "arrangement_analysis": """
+        {
+            "structure": ["Intro", "Verse", "Chorus", "Verse", "Chorus", "Bridge", "Chorus", "Outro"],
+            "instrumentation": "The arrangement uses a standard rock band setup with...",
+            "energy_flow": "The energy builds gradually through the verses and peaks at...",
+            "suggestions": ["Consider adding a pre-chorus to build tension", "The bridge could benefit from..."]
+        }
+        """,
+    "general": """
+        {
+            "key": "C Major",
+            "tempo": 120,
+            "time_signature": "4/4",
+            "genre": "Pop/Rock",
+            "sound_quality": "Good overall balance with some issues in...",
+            "suggestions": ["Consider adjusting the levels of...", "The rhythm section could benefit from..."]
+        }
+        """,
+}
+
+ANALYSIS_TYPES = list(ANALYSIS_INSTRUCTIONS)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of model tokens in a piece of text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _pitch_profile(chroma: List[float], top: int = 3) -> Dict[str, float]:
+    """Summarize a chroma vector as its strongest pitch classes."""
+    total = sum(chroma) or 1.0
+    ranked = sorted(range(len(chroma)), key=lambda i: chroma[i], reverse=True)[:top]
+    return {KEY_NAMES[i % 12]: round(chroma[i] / total, 2) for i in ranked}
+
+
+def _beat_stats(beats: List[float]) -> Dict[str, Any]:
+    """Summarize beat timestamps as count and inter-beat interval statistics."""
+    stats: Dict[str, Any] = {"count": len(beats)}
+    if beats:
+        stats["first"] = round(beats[0], 2)
+    intervals = [b - a for a, b in zip(beats, beats[1:])]
+    if intervals:
+        stats["mean_interval"] = round(statistics.fmean(intervals), 3)
+        stats["interval_std"] = round(statistics.pstdev(intervals), 3)
+    return stats
+
+
+def _sections(segments: List[Dict[str, Any]], limit: int = MAX_SECTIONS) -> List[List[float]]:
+    """Reduce structural segments to rounded [start, end] pairs."""
+    return [[round(s["start"], 1), round(s["end"], 1)] for s in segments[:limit]]
+
+
+def compact_audio_features(audio_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce raw audio features to compact summary fields.
+
+    Args:
+        audio_data: Feature dictionary produced by the analysis pipeline
+
+    Returns:
+        Dictionary with every compact field that could be derived
+    """
+    compact: Dict[str, Any] = {}
+
+    if audio_data.get("detected_key"):
+        compact["key"] = f"{audio_data['detected_key']} {audio_data.get('detected_scale', '')}".strip()
+    if "key_confidence" in audio_data:
+        compact["key_confidence"] = round(audio_data["key_confidence"], 2)
+    if "tempo" in audio_data:
+        compact["tempo"] = round(float(audio_data["tempo"]), 1)
+    if "duration" in audio_data:
+        compact["duration"] = round(float(audio_data["duration"]), 1)
+
+    if audio_data.get("chroma_features"):
+        compact["pitch_profile"] = _pitch_profile(audio_data["chroma_features"])
+
+    spectral = {
+        name: int(audio_data[f"spectral_{name}"])
+        for name in ("centroid", "bandwidth", "rolloff")
+        if f"spectral_{name}" in audio_data
+    }
+    if spectral:
+        compact["spectral"] = spectral
+
+    if audio_data.get("mfccs"):
+        compact["timbre"] = [round(c, 1) for c in audio_data["mfccs"][:5]]
+
+    if "beats" in audio_data:
+        compact["beat_stats"] = _beat_stats(audio_data["beats"])
+
+    if audio_data.get("segments"):
+        compact["sections"] = _sections(audio_data["segments"])
+
+    if "error" in audio_data:
+        compact["error"] = str(audio_data["error"])[:200]
+
+    return compact
+
+
+def _dumps(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def _build_payload(audio_data: Dict[str, Any], fields: List[str], token_budget: int, label: str) -> str:
+    """Select fields from the compact features and trim them to the token budget."""
+    compact = compact_audio_features(audio_data)
+    payload = {field: compact[field] for field in fields if field in compact}
+    if "error" in compact:
+        payload["error"] = compact["error"]
+
+    text = _dumps(payload)
+
+    # Halve the section list first, then drop the least important fields
+    while estimate_tokens(text) > token_budget and len(payload.get("sections", [])) > 4:
+        payload["sections"] = payload["sections"][: len(payload["sections"]) // 2]
+        text = _dumps(payload)
+
+    droppable = [field for field in fields[REQUIRED_FIELD_COUNT:] if field in payload]
+    while estimate_tokens(text) > token_budget and droppable:
+        del payload[droppable.pop()]
+        text = _dumps(payload)
+
+    if logger.isEnabledFor(logging.INFO):
+        raw_tokens = estimate_tokens(json.dumps(audio_data, indent=2, default=str))
+        logger.info(
+            f"Compacted {label} feature payload from ~{raw_tokens} to ~{estimate_tokens(text)} tokens "
+            f"(budget {token_budget})"
+        )
+
+    return text
+
+
+def _token_budget(analysis_type: str) -> int:
+    budgets = settings.AI_PROMPT_TOKEN_BUDGETS
+    return budgets.get(analysis_type, budgets.get("general", 400))
+
+
+def build_feature_payload(
+    audio_data: Dict[str, Any],
+    analysis_type: str,
+    token_budget: Optional[int] = None,
+) -> str:
+    """
+    Build the feature section of a prompt within a token budget.
+
+    Args:
+        audio_data: Feature dictionary produced by the analysis pipeline
+        analysis_type: Type of analysis to perform
+        token_budget: Maximum estimated tokens for the payload. Defaults to the
+            AI_PROMPT_TOKEN_BUDGETS entry for the analysis type.
+
+    Returns:
+        Compact JSON string of the features relevant to the analysis type
+    """
+    fields = ANALYSIS_FIELDS.get(analysis_type, ANALYSIS_FIELDS["general"])
+    if token_budget is None:
+        token_budget = _token_budget(analysis_type)
+
+    return _build_payload(audio_data, fields, token_budget, analysis_type)
+
+
+def build_prompt(audio_data: Dict[str, Any], analysis_type: str, role: Optional[str] = None) -> str:
+    """
+    Create the analysis prompt for an AI service.
+
+    Args:
+        audio_data: Feature dictionary produced by the analysis pipeline
+        analysis_type: Type of analysis to perform
+        role: Optional role description placed at the start of the prompt
+
+    Returns:
+        Prompt text
+    """
+    key = analysis_type if analysis_type in ANALYSIS_INSTRUCTIONS else "general"
+
+    prompt = f"{role}\n" if role else ""
+    prompt += (
+        "Analyze the following audio data and provide insights.\n\n"
+        f"Audio data:\n{build_feature_payload(audio_data, analysis_type)}\n\n"
+        f"Analysis type: {analysis_type}\n"
+    )
+    prompt += textwrap.dedent(ANALYSIS_INSTRUCTIONS[key])
+    prompt += "\nFormat your response as JSON with the following structure:"
+    prompt += textwrap.dedent(RESPONSE_STRUCTURES[key])
+
+    return prompt
+
+
+def build_combined_prompt(
+    audio_data: Dict[str, Any],
+    analysis_types: List[str],
+    role: Optional[str] = None,
+) -> str:
+    """
+    Create one prompt that requests several analysis types in a single response.
+
+    The model is asked for a JSON object keyed by analysis type, each value
+    following the structure of the corresponding single-analysis prompt.
+
+    Args:
+        audio_data: Feature dictionary produced by the analysis pipeline
+        analysis_types: Analysis types to request
+        role: Optional role description placed at the start of the prompt
+
+    Returns:
+        Prompt text
+    """
+    fields: List[str] = []
+    for analysis_type in analysis_types:
+        for field in ANALYSIS_FIELDS.get(analysis_type, ANALYSIS_FIELDS["general"]):
+            if field not in fields:
+                fields.append(field)
+    token_budget = max(_token_budget(analysis_type) for analysis_type in analysis_types)
+    payload = _build_payload(audio_data, fields, token_budget, "+".join(analysis_types))
+
+    prompt = f"{role}\n" if role else ""
+    prompt += (
+        "Analyze the following audio data and provide insights.\n\n"
+        f"Audio data:\n{payload}\n\n"
+        f"Analysis types: {', '.join(analysis_types)}\n"
+    )
+
+    structures = []
+    for analysis_type in analysis_types:
+        key = analysis_type if analysis_type in ANALYSIS_INSTRUCTIONS else "general"
+        prompt += f"\n{analysis_type}:"
+        prompt += textwrap.dedent(ANALYSIS_INSTRUCTIONS[key])
+        structure = textwrap.indent(textwrap.dedent(RESPONSE_STRUCTURES[key]).strip(), "    ")
+        structures.append(f'    "{analysis_type}": {structure.lstrip()}')
+
+    prompt += (
+        "\nFormat your response as a single JSON object with one key per analysis type, "
+        "using the following structure:\n{\n" + ",\n".join(structures) + "\n}\n"
+    )
+
+    return prompt
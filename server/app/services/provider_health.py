@@ -0,0 +1,115 @@
+"""
+Per-provider latency and error tracking with a circuit breaker.
+
+Used by the hedged AI router to decide when to send a duplicate request to
+another provider and when to skip a provider that keeps failing.
+"""
+import logging
+import math
+import time
+from collections import deque
+from typing import Deque, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Latency samples required before the percentile replaces the default hedge delay
+MIN_LATENCY_SAMPLES = 20
+
+
+class ProviderHealth:
+    """
+    Rolling latency and outcome window plus circuit breaker state for one provider.
+
+    The breaker opens when the error rate over the window reaches the threshold,
+    rejects requests for reset_seconds, then lets a single probe request through.
+    A successful probe closes the breaker, a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 100,
+        error_rate_threshold: Optional[float] = None,
+        min_requests: Optional[int] = None,
+        reset_seconds: Optional[float] = None,
+    ):
+        self.name = name
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.error_rate_threshold = (
+            settings.AI_CIRCUIT_ERROR_RATE if error_rate_threshold is None else error_rate_threshold
+        )
+        self.min_requests = settings.AI_CIRCUIT_MIN_REQUESTS if min_requests is None else min_requests
+        self.reset_seconds = settings.AI_CIRCUIT_RESET_SECONDS if reset_seconds is None else reset_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of failed requests in the window."""
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Return the given latency percentile (0-1) of successful requests, if any."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = max(0, min(len(ordered) - 1, math.ceil(percentile * len(ordered)) - 1))
+        return ordered[index]
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for this provider before sending a hedged request elsewhere."""
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return settings.AI_HEDGE_DEFAULT_DELAY
+        return max(settings.AI_HEDGE_MIN_DELAY, self.latency_percentile(settings.AI_HEDGE_PERCENTILE))
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent, reserving the probe slot when half-open."""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+
+        if self.state == HALF_OPEN:
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+
+        return True
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        if self.state == HALF_OPEN:
+            logger.info(f"Circuit for {self.name} closed after successful probe")
+            self.state = CLOSED
+            self.probe_in_flight = False
+            self.outcomes.clear()
+
+    def record_failure(self) -> None:
+        self.outcomes.append(False)
+        if self.state == HALF_OPEN:
+            self._open()
+        elif len(self.outcomes) >= self.min_requests and self.error_rate >= self.error_rate_threshold:
+            self._open()
+
+    def record_cancelled(self) -> None:
+        """Release a request that lost a hedge race without counting it either way."""
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = False
+
+    def _open(self) -> None:
+        logger.warning(f"Circuit for {self.name} opened (error rate {self.error_rate:.0%})")
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
@@ -0,0 +1,211 @@
+"""
+Coalescing of identical in-flight computations.
+
+Concurrent calls with the same key share one computation: within a process,
+followers await the leader's task; across API replicas, a Redis lock per key
+elects one leader and the other replicas poll for the stored result.
+
+A computation runs in its own task, so it is not cancelled when the request
+that started it goes away: the remaining callers still get its result, and the
+result is stored even if every caller has disconnected.
+"""
+import asyncio
+import inspect
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+from app.core.config import settings
+from app.core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Deletes the lock only if it is still held by the caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time and share its result."""
+
+    def __init__(
+        self,
+        namespace: str,
+        lock_ttl: Optional[float] = None,
+        poll_interval: float = 0.5,
+    ):
+        """
+        Args:
+            namespace: Prefix for the Redis lock keys
+            lock_ttl: Seconds before a lock held by a crashed replica expires
+            poll_interval: Seconds between result lookups while another replica computes
+        """
+        self.namespace = namespace
+        self.lock_ttl = settings.SINGLE_FLIGHT_LOCK_TTL_SECONDS if lock_ttl is None else lock_ttl
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def run(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Union[Optional[Any], Awaitable[Optional[Any]]]],
+    ) -> Any:
+        """
+        Return the result for key, computing it only if no identical call is in flight.
+
+        Args:
+            key: Identity of the computation
+            compute: Coroutine function that computes and stores the result
+            lookup: Function (or coroutine function) returning the stored result, or None if not stored yet
+
+        Returns:
+            The result of compute, or the result stored by another caller
+        """
+        async def compute_one(keys: List[str]) -> Dict[str, Any]:
+            return {key: await compute()}
+
+        results = await self.run_many([key], compute_one, lambda _: lookup())
+        return results[key]
+
+    async def run_many(
+        self,
+        keys: Sequence[str],
+        compute: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        lookup: Callable[[str], Union[Optional[Any], Awaitable[Optional[Any]]]],
+    ) -> Dict[str, Any]:
+        """
+        Return the results for several keys, sharing in-flight computations key by key.
+
+        Keys already in flight are joined; the others are computed together with
+        one call to compute, which later callers can join for any of its keys.
+
+        Args:
+            keys: Identities of the computations
+            compute: Coroutine function computing and storing the results of the given keys
+            lookup: Function (or coroutine function) returning the stored result of a key, or None
+
+        Returns:
+            Result per key
+        """
+        tasks = {key: self._inflight.get(key) for key in keys}
+        led = [key for key, task in tasks.items() if task is None]
+        if len(led) < len(tasks):
+            logger.debug(f"Joining in-flight computations {', '.join(k for k in keys if k not in led)}")
+
+        if led:
+            group = asyncio.ensure_future(self._run_locked(led, compute, lookup))
+            for key in led:
+                tasks[key] = self._register(key, asyncio.ensure_future(self._pick(group, key)))
+
+        # Shielded: a caller going away must not cancel the computation for the others
+        return {key: await asyncio.shield(task) for key, task in tasks.items()}
+
+    def _register(self, key: str, task: asyncio.Future) -> asyncio.Future:
+        self._inflight[key] = task
+
+        def done(finished: asyncio.Future) -> None:
+            if self._inflight.get(key) is finished:
+                del self._inflight[key]
+            if not finished.cancelled():
+                # Mark the exception as retrieved when nobody was left waiting
+                finished.exception()
+
+        task.add_done_callback(done)
+        return task
+
+    @staticmethod
+    async def _pick(group: asyncio.Future, key: str) -> Any:
+        return (await group)[key]
+
+    @staticmethod
+    async def _lookup(lookup: Callable[[str], Any], key: str) -> Optional[Any]:
+        result = lookup(key)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def _run_locked(
+        self,
+        keys: List[str],
+        compute: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        lookup: Callable[[str], Union[Optional[Any], Awaitable[Optional[Any]]]],
+    ) -> Dict[str, Any]:
+        """Elect one leader per key across replicas with Redis locks; others poll lookup."""
+        client = get_redis_client()
+        if client is None:
+            return await compute(keys)
+
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_ttl
+        results: Dict[str, Any] = {}
+        pending = list(keys)
+
+        first_attempt = True
+        while pending:
+            if not first_attempt:
+                # Keys another replica finished in the meantime
+                for key in list(pending):
+                    result = await self._lookup(lookup, key)
+                    if result is not None:
+                        results[key] = result
+                        pending.remove(key)
+                if not pending:
+                    break
+            first_attempt = False
+
+            try:
+                acquired = [
+                    key for key in pending
+                    if await asyncio.to_thread(
+                        client.set, self._lock_key(key), token, nx=True, px=int(self.lock_ttl * 1000)
+                    )
+                ]
+            except Exception as e:
+                logger.warning(f"Single-flight lock unavailable for {', '.join(pending)}: {str(e)}")
+                results.update(await compute(pending))
+                return results
+
+            if acquired:
+                try:
+                    results.update(await compute(acquired))
+                finally:
+                    for key in acquired:
+                        try:
+                            await asyncio.to_thread(client.eval, RELEASE_LOCK_SCRIPT, 1, self._lock_key(key), token)
+                        except Exception as e:
+                            logger.warning(f"Failed to release single-flight lock {key}: {str(e)}")
+                pending = [key for key in pending if key not in acquired]
+                continue
+
+            logger.debug(f"Waiting for another replica to finish {', '.join(pending)}")
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                released = False
+                for key in list(pending):
+                    result = await self._lookup(lookup, key)
+                    if result is not None:
+                        results[key] = result
+                        pending.remove(key)
+                        continue
+                    try:
+                        released = released or not await asyncio.to_thread(client.exists, self._lock_key(key))
+                    except Exception:
+                        released = True
+                # Try to take over keys whose leader finished without storing a result (or died)
+                if not pending or released:
+                    break
+            else:
+                logger.warning(f"Timed out waiting for {', '.join(pending)}; computing locally")
+                results.update(await compute(pending))
+                return results
+
+        return results
@@ -0,0 +1,233 @@
+"""
+Tiled log-magnitude spectrograms for the editor view.
+
+A tile is TILE_WIDTH columns by TILE_HEIGHT log-spaced frequency rows, quantized
+to uint8 over a fixed dB range so neighbouring tiles line up. At zoom level z
+each column is the maximum of 2**z columns of the base STFT (hop BASE_HOP), so
+zooming out never skips transients.
+
+Tiles are looked up in this order:
+    1. the disk cache of rendered tiles (LRU, SPECTROGRAM_CACHE_MAX_BYTES)
+    2. the base spectrogram written by the pipeline's feature stage, which
+       only needs slicing and pooling
+    3. an STFT of just the samples the tile covers
+"""
+import struct
+import zlib
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import soundfile as sf
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.core.config import settings
+from app.services import artifact_store
+from app.services.disk_cache import DiskLRUCache
+
+N_FFT = 2048
+BASE_HOP = 512
+TILE_WIDTH = 256
+TILE_HEIGHT = 256
+MIN_FREQUENCY = 27.5  # A0, the bottom of the piano roll
+DB_RANGE = 90.0  # dB below full scale mapped to 0
+MAX_ZOOM = 7
+
+# Base columns computed at once; a multiple of every pooling factor
+CHUNK_COLUMNS = 1024
+
+SPECTROGRAM_MAGIC = b"SPEC"
+SPECTROGRAM_VERSION = 1
+HEADER = struct.Struct("<4sHIIIIQ")
+
+ORIGINAL = "original"
+
+WINDOW = np.hanning(N_FFT).astype(np.float32)
+
+tile_cache = DiskLRUCache(settings.SPECTROGRAM_CACHE_DIR, settings.SPECTROGRAM_CACHE_MAX_BYTES)
+
+
+def spectrogram_name(source: str) -> str:
+    """Artifact name of the base spectrogram of the original upload or of a stem."""
+    return f"{source}.spec"
+
+
+def column_count(frames: int) -> int:
+    """Number of base columns for a signal, with frames centred on multiples of BASE_HOP."""
+    return 1 + frames // BASE_HOP
+
+
+def tile_count(frames: int, zoom: int) -> int:
+    per_tile = TILE_WIDTH << zoom
+    return -(-column_count(frames) // per_tile)
+
+
+def _read_mono(f: sf.SoundFile, start: int, length: int) -> np.ndarray:
+    """Read length mono samples from start, zero-padded outside the file."""
+    samples = np.zeros(length, dtype=np.float32)
+    first, last = max(start, 0), min(start + length, f.frames)
+    if last > first:
+        f.seek(first)
+        data = f.read(last - first, dtype="float32", always_2d=True).mean(axis=1)
+        samples[first - start:first - start + len(data)] = data
+    return samples
+
+
+def _band_starts(sample_rate: int) -> np.ndarray:
+    """First STFT bin of each log-spaced row; narrow low rows share their nearest bin."""
+    edges = np.geomspace(MIN_FREQUENCY, sample_rate / 2, TILE_HEIGHT + 1)[:-1]
+    return np.minimum(np.floor(edges * N_FFT / sample_rate).astype(int), N_FFT // 2)
+
+
+def _quantize(magnitudes: np.ndarray) -> np.ndarray:
+    db = 20 * np.log10(np.maximum(magnitudes, 1e-10))
+    return np.clip((db + DB_RANGE) / DB_RANGE * 255, 0, 255).astype(np.uint8)
+
+
+def _pool(columns: np.ndarray, factor: int) -> np.ndarray:
+    """Maximum over each group of factor columns."""
+    if factor == 1:
+        return columns
+    pad = (-len(columns)) % factor
+    if pad:
+        columns = np.concatenate([columns, np.zeros((pad, columns.shape[1]), dtype=columns.dtype)])
+    return columns.reshape(-1, factor, columns.shape[1]).max(axis=1)
+
+
+def compute_columns(f: sf.SoundFile, start_column: int, count: int, factor: int = 1) -> np.ndarray:
+    """
+    STFT columns of a file, quantized and pooled.
+
+    Args:
+        f: Open audio file
+        start_column: First base column
+        count: Number of base columns, a multiple of factor
+        factor: Base columns pooled into each output column
+
+    Returns:
+        uint8 array of shape (count // factor, TILE_HEIGHT), lowest frequency first
+    """
+    band_starts = _band_starts(f.samplerate)
+    scale = WINDOW.sum() / 2  # A full-scale sine reads 0 dB
+    total = column_count(f.frames)
+    pooled = []
+    for chunk_start in range(start_column, start_column + count, CHUNK_COLUMNS):
+        chunk = min(CHUNK_COLUMNS, start_column + count - chunk_start)
+        columns = np.zeros((chunk, TILE_HEIGHT), dtype=np.uint8)
+        # Columns past the end of the file stay empty
+        real = min(chunk, max(total - chunk_start, 0))
+        if real:
+            samples = _read_mono(f, chunk_start * BASE_HOP - N_FFT // 2, (real - 1) * BASE_HOP + N_FFT)
+            frames = sliding_window_view(samples, N_FFT)[::BASE_HOP]
+            magnitudes = np.abs(np.fft.rfft(frames * WINDOW, axis=1)) / scale
+            columns[:real] = _quantize(np.maximum.reduceat(magnitudes, band_starts, axis=1))
+        pooled.append(_pool(columns, factor))
+    return np.concatenate(pooled)
+
+
+def compute_spectrogram(
+    audio_path: Path,
+    output_path: Path,
+    should_stop: Optional[Callable[[], None]] = None,
+) -> Path:
+    """
+    Write the base spectrogram of a whole file, computed chunk by chunk.
+
+    should_stop is called between chunks and may raise to abort, e.g. on cancellation.
+    """
+    with sf.SoundFile(str(audio_path)) as f, artifact_store.atomic_write(output_path, should_stop=should_stop) as out:
+        columns = column_count(f.frames)
+        out.write(HEADER.pack(
+            SPECTROGRAM_MAGIC, SPECTROGRAM_VERSION, f.samplerate, N_FFT, BASE_HOP, TILE_HEIGHT, columns
+        ))
+        for start in range(0, columns, CHUNK_COLUMNS):
+            if should_stop is not None:
+                should_stop()
+            out.write(compute_columns(f, start, min(CHUNK_COLUMNS, columns - start)).tobytes())
+    return output_path
+
+
+def ensure_spectrogram(
+    audio_file_id: int,
+    audio_path: Path,
+    source: str = ORIGINAL,
+    should_stop: Optional[Callable[[], None]] = None,
+) -> Path:
+    """Return the base spectrogram artifact of a file or stem, computing it if missing."""
+    path = artifact_store.artifact_path(audio_file_id, artifact_store.SPECTROGRAMS, spectrogram_name(source))
+    if not path.is_file():
+        compute_spectrogram(audio_path, path, should_stop=should_stop)
+    return path
+
+
+def _columns_from_artifact(path: Path, start_column: int, count: int, factor: int) -> Optional[np.ndarray]:
+    """Slice and pool base columns from a stored spectrogram, or None if it doesn't match."""
+    with open(path, "rb") as f:
+        magic, version, _, n_fft, hop, height, columns = HEADER.unpack(f.read(HEADER.size))
+    expected = (SPECTROGRAM_MAGIC, SPECTROGRAM_VERSION, N_FFT, BASE_HOP, TILE_HEIGHT)
+    if (magic, version, n_fft, hop, height) != expected:
+        return None
+
+    stored = np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER.size, shape=(columns, TILE_HEIGHT))
+    end = min(start_column + count, columns)
+    window = np.zeros((count, TILE_HEIGHT), dtype=np.uint8)
+    if end > start_column:
+        window[:end - start_column] = stored[start_column:end]
+    return _pool(window, factor)
+
+
+def render_tile(
+    audio_file_id: int,
+    audio_path: Path,
+    zoom: int,
+    tile: int,
+    source: str = ORIGINAL,
+) -> np.ndarray:
+    """
+    Return one spectrogram tile.
+
+    Args:
+        audio_file_id: Audio file the tile belongs to
+        audio_path: Audio of the original upload or of the stem
+        zoom: Zoom level, 0 (BASE_HOP samples per column) to MAX_ZOOM
+        tile: Tile index along the time axis
+        source: "original" or a stem name
+
+    Returns:
+        uint8 array of shape (TILE_HEIGHT, TILE_WIDTH), highest frequency in the first row
+    """
+    key = f"{audio_file_id}/{source}/{zoom}/{tile}.u8"
+    cached = tile_cache.get(key)
+    if cached is not None and len(cached) == TILE_HEIGHT * TILE_WIDTH:
+        return np.frombuffer(cached, dtype=np.uint8).reshape(TILE_HEIGHT, TILE_WIDTH)
+
+    factor = 1 << zoom
+    start_column, count = tile * TILE_WIDTH * factor, TILE_WIDTH * factor
+
+    columns = None
+    artifact = artifact_store.artifact_path(audio_file_id, artifact_store.SPECTROGRAMS, spectrogram_name(source))
+    if artifact.is_file():
+        columns = _columns_from_artifact(artifact, start_column, count, factor)
+    if columns is None:
+        with sf.SoundFile(str(audio_path)) as f:
+            columns = compute_columns(f, start_column, count, factor)
+
+    image = np.ascontiguousarray(columns.T[::-1])
+    tile_cache.put(key, image.tobytes())
+    return image
+
+
+def encode_png(image: np.ndarray) -> bytes:
+    """Encode a uint8 array as an 8-bit grayscale PNG."""
+    height, width = image.shape
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + image[row].tobytes() for row in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows, 6))
+        + chunk(b"IEND", b"")
+    )
@@ -3,7 +3,7 @@ import uuid
 import io
 import random
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import BinaryIO, Dict, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -302,18 +302,19 @@ def create_midi_with_correct_tempo(source_midi: Optional[pretty_midi.PrettyMIDI]
     return midi
 
 
-def save_midi(midi: pretty_midi.PrettyMIDI, output_path: Path) -> Path:
+def save_midi(midi: pretty_midi.PrettyMIDI, output_path: Union[Path, BinaryIO]) -> Union[Path, BinaryIO]:
     """
     Save a PrettyMIDI object to a file
     
     Args:
         midi: PrettyMIDI object to save
-        output_path: Path to save the MIDI file to
+        output_path: Path to save the MIDI file to, or a binary file to write it into
         
     Returns:
-        Path to the saved MIDI file
+        Path to the saved MIDI file, or the file written into
     """
-    os.makedirs(output_path.parent, exist_ok=True)
+    if isinstance(output_path, Path):
+        os.makedirs(output_path.parent, exist_ok=True)
     
     mid = mido.MidiFile(type=1, ticks_per_beat=480)
     
@@ -348,7 +349,10 @@ def save_midi(midi: pretty_midi.PrettyMIDI, output_path: Path) -> Path:
             
             last_time = note_off_time
     
-    mid.save(str(output_path))
+    if isinstance(output_path, Path):
+        mid.save(str(output_path))
+    else:
+        mid.save(file=output_path)
     
     return output_path
 
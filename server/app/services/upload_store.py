@@ -0,0 +1,316 @@
+"""
+Streaming storage of uploaded audio.
+
+Uploads are copied to disk in chunks of UPLOAD_CHUNK_SIZE bytes, with file
+writes run in a worker thread so the event loop never blocks on disk I/O.
+Multipart uploads are parsed while the request body streams in, so the file
+is written once, straight to its destination, without being spooled to a
+temporary file first. The SHA-256 hash and byte count are computed while
+streaming, and the size limit is enforced per chunk, so memory per upload
+stays constant whatever the file size.
+
+Resumable uploads (see app/api/endpoints/uploads.py) write each chunk straight
+to its offset in a preallocated file and hash the file once it is complete.
+Chunk writers hold a shared lock on the file and finalize takes an exclusive
+one, so a file is never hashed and moved while a chunk is being written.
+"""
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+from typing import AsyncIterator, List, Mapping, Optional, Tuple
+
+from starlette.requests import ClientDisconnect
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured maximum size."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the maximum size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class UploadInProgress(Exception):
+    """Raised when an upload is finalized while chunks are still being written into it."""
+
+
+class UploadFinalized(Exception):
+    """Raised when a chunk arrives for an upload whose file has already been finalized."""
+
+
+class MultipartFile:
+    """File field of a multipart/form-data request whose contents are still being received."""
+
+    def __init__(self, filename: str, content_type: str, chunks: AsyncIterator[bytes]):
+        self.filename = filename
+        self.content_type = content_type
+        self.chunks = chunks
+
+
+async def _multipart_events(
+    parser: MultipartParser, events: List[Tuple[str, bytes]], body: AsyncIterator[bytes]
+) -> AsyncIterator[Tuple[str, bytes]]:
+    """Feed the request body to the parser and yield its events as they occur."""
+    async for chunk in body:
+        parser.write(chunk)
+        for event in events:
+            yield event
+        events.clear()
+    parser.finalize()
+    for event in events:
+        yield event
+    events.clear()
+
+
+async def _part_data(events: AsyncIterator[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    async for kind, data in events:
+        if kind == "data":
+            if data:
+                yield data
+        elif kind == "part_end":
+            return
+    raise ValueError("Multipart body ended inside the file")
+
+
+async def read_multipart_file(
+    headers: Mapping[str, str],
+    body: AsyncIterator[bytes],
+    field_name: str = "file",
+) -> MultipartFile:
+    """
+    Read a multipart/form-data body up to the start of a file field.
+
+    Fields before the file are skipped. The returned file's chunks continue
+    reading the body, so the file can be stored while it is being received.
+
+    Args:
+        headers: Request headers
+        body: Request body stream
+        field_name: Name of the file field
+
+    Returns:
+        The file field, with its contents still to be read from chunks
+
+    Raises:
+        ValueError: If the body is not multipart/form-data or has no such file field
+    """
+    content_type, params = parse_options_header(headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+        raise ValueError("Expected a multipart/form-data body")
+
+    events: List[Tuple[str, bytes]] = []
+
+    def on_data(kind: str):
+        return lambda data, start, end: events.append((kind, data[start:end]))
+
+    def on_event(kind: str):
+        return lambda: events.append((kind, b""))
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_event("part_begin"),
+        "on_header_field": on_data("header_field"),
+        "on_header_value": on_data("header_value"),
+        "on_header_end": on_event("header_end"),
+        "on_headers_finished": on_event("headers_finished"),
+        "on_part_data": on_data("data"),
+        "on_part_end": on_event("part_end"),
+    })
+    parsed = _multipart_events(parser, events, body)
+
+    part_headers = {}
+    header_field = header_value = b""
+    async for kind, data in parsed:
+        if kind == "part_begin":
+            part_headers = {}
+        elif kind == "header_field":
+            header_field += data
+        elif kind == "header_value":
+            header_value += data
+        elif kind == "header_end":
+            part_headers[header_field.lower()] = header_value
+            header_field = header_value = b""
+        elif kind == "headers_finished":
+            _, options = parse_options_header(part_headers.get(b"content-disposition", b""))
+            if options.get(b"name") == field_name.encode() and b"filename" in options:
+                return MultipartFile(
+                    filename=options[b"filename"].decode("utf-8"),
+                    content_type=part_headers.get(b"content-type", b"").decode("latin-1"),
+                    chunks=_part_data(parsed),
+                )
+
+    raise ValueError(f"No file field named {field_name}")
+
+
+async def save_stream(
+    chunks: AsyncIterator[bytes],
+    path: str,
+    max_bytes: Optional[int] = None,
+) -> Tuple[int, str]:
+    """
+    Write a stream of chunks to a file, hashing it on the way.
+
+    The data is written to a temporary file next to path and moved into place
+    once complete, so a failed or oversized upload never leaves a partial file.
+    Network chunks are buffered up to UPLOAD_CHUNK_SIZE bytes per write, so
+    small chunks don't cost a thread hop each.
+
+    Args:
+        chunks: Async iterator of file contents
+        path: Destination file path
+        max_bytes: Maximum size in bytes (defaults to UPLOAD_MAX_BYTES)
+
+    Returns:
+        Tuple of (size in bytes, hex SHA-256 digest)
+
+    Raises:
+        UploadTooLarge: If the stream is larger than max_bytes
+    """
+    max_bytes = settings.UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    tmp_path = f"{path}.part"
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+
+    f = await asyncio.to_thread(open, tmp_path, "wb")
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            digest.update(chunk)
+            buffer += chunk
+            if len(buffer) >= settings.UPLOAD_CHUNK_SIZE:
+                data, buffer = buffer, bytearray()
+                await asyncio.to_thread(f.write, data)
+        if buffer:
+            await asyncio.to_thread(f.write, buffer)
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.replace, tmp_path, path)
+    except BaseException:
+        f.close()
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    logger.debug(f"Stored upload {path} ({size} bytes)")
+    return size, digest.hexdigest()
+
+
+def allocate(path: str, size: int) -> None:
+    """Create a file of the given size for chunks to be written into."""
+    with open(path, "wb") as f:
+        f.truncate(size)
+
+
+async def write_stream_at(
+    chunks: AsyncIterator[bytes],
+    path: str,
+    offset: int,
+    max_bytes: int,
+) -> int:
+    """
+    Write a stream of chunks into an existing file, starting at offset.
+
+    If the client disconnects midway, the bytes received so far stay written
+    and are counted, so a resumed upload does not have to send them again.
+
+    Args:
+        chunks: Async iterator of file contents
+        path: File allocated with allocate()
+        offset: Byte position of the first chunk
+        max_bytes: Maximum number of bytes to accept from the stream
+
+    Returns:
+        Number of bytes written
+
+    Raises:
+        UploadTooLarge: If the stream is longer than max_bytes
+        UploadFinalized: If the file was finalized before the write started
+    """
+    written = 0
+    f = await asyncio.to_thread(_open_for_write, path)
+    try:
+        await asyncio.to_thread(f.seek, offset)
+        async for chunk in chunks:
+            if written + len(chunk) > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            await asyncio.to_thread(f.write, chunk)
+            written += len(chunk)
+    except ClientDisconnect:
+        logger.info(f"Client disconnected after {written} bytes at offset {offset} of {path}")
+    finally:
+        await asyncio.to_thread(f.close)
+    return written
+
+
+def _open_for_write(path: str):
+    """Open an allocated file for writing, holding a shared lock on it until it is closed."""
+    f = open(path, "r+b")
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+        # The file may have been finalized, and moved, between opening and locking it
+        try:
+            moved = os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+        except FileNotFoundError:
+            moved = True
+        if moved:
+            raise UploadFinalized(path)
+    except BaseException:
+        f.close()
+        raise
+    return f
+
+
+def finalize(part_path: str, path: str) -> Tuple[int, str]:
+    """
+    Hash a fully written upload and move it to its final path.
+
+    Args:
+        part_path: File allocated with allocate()
+        path: Final path of the file
+
+    Returns:
+        Tuple of (size in bytes, hex SHA-256 digest)
+
+    Raises:
+        UploadInProgress: If chunks are still being written into the file
+    """
+    with open(part_path, "rb") as f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadInProgress(part_path)
+        # Writers opening the file from now on find it moved and stop
+        size, content_hash = hash_file(part_path)
+        os.replace(part_path, path)
+    return size, content_hash
+
+
+def hash_file(path: str, chunk_size: Optional[int] = None) -> Tuple[int, str]:
+    """Return the size and hex SHA-256 digest of a file, reading it in chunks."""
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            digest.update(chunk)
+    return size, digest.hexdigest()
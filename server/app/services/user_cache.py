@@ -0,0 +1,103 @@
+"""
+Short-lived cache of authenticated users.
+
+Every authenticated request resolves its token to a user; caching the user row
+by id for USER_CACHE_TTL_SECONDS saves that database round trip for clients
+that poll job status or fetch peaks. The password hash is never cached: a
+cached user is attached to the request's session with the hash expired, so it
+is loaded only if an endpoint reads it.
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import CacheBackend, create_cache_backend
+from app.core.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+CACHED_FIELDS = ("id", "email", "username", "is_active", "is_superuser", "created_at", "updated_at")
+DATETIME_FIELDS = ("created_at", "updated_at")
+
+
+def _serialize(user_obj: User) -> str:
+    data: Dict[str, Any] = {field: getattr(user_obj, field) for field in CACHED_FIELDS}
+    for field in DATETIME_FIELDS:
+        if data[field] is not None:
+            data[field] = data[field].isoformat()
+    return json.dumps(data)
+
+
+def _deserialize(value: str) -> User:
+    data = json.loads(value)
+    for field in DATETIME_FIELDS:
+        if data.get(field) is not None:
+            data[field] = datetime.fromisoformat(data[field])
+    user_obj = User(**data)
+    # Treat the object as loaded from the database; hashed_password stays expired
+    make_transient_to_detached(user_obj)
+    return user_obj
+
+
+class UserCache:
+    """Users keyed by id, invalidated when a user is updated."""
+
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+
+    def get(self, db: Session, user_id: int) -> Optional[User]:
+        """
+        Get a cached user, attached to db without querying it.
+
+        Args:
+            db: Session of the current request
+            user_id: User id from the access token
+
+        Returns:
+            User, or None on a cache miss
+        """
+        if self.ttl <= 0:
+            return None
+        try:
+            value = self.backend.get(str(user_id))
+        except Exception as e:
+            logger.warning(f"User cache lookup failed: {str(e)}")
+            return None
+        if value is None:
+            return None
+        return db.merge(_deserialize(value), load=False)
+
+    def set(self, user_obj: User) -> None:
+        if self.ttl <= 0:
+            return
+        try:
+            self.backend.set(str(user_obj.id), _serialize(user_obj), self.ttl)
+        except Exception as e:
+            logger.warning(f"User cache store failed: {str(e)}")
+
+    def invalidate(self, user_id: int) -> None:
+        try:
+            self.backend.delete(str(user_id))
+        except Exception as e:
+            logger.warning(f"User cache invalidation failed: {str(e)}")
+
+
+_user_cache: Optional[UserCache] = None
+
+
+def get_user_cache() -> UserCache:
+    """Get the process-wide user cache."""
+    global _user_cache
+    if _user_cache is None:
+        backend = create_cache_backend(
+            namespace="user-cache",
+            max_entries=settings.USER_CACHE_MAX_ENTRIES,
+            backend=settings.USER_CACHE_BACKEND,
+        )
+        _user_cache = UserCache(backend, ttl=settings.USER_CACHE_TTL_SECONDS)
+    return _user_cache
@@ -0,0 +1,203 @@
+"""
+Multi-resolution waveform peaks for drawing track and stem overviews.
+
+The audio is read once, in blocks, and reduced to min/max pairs of 256 samples
+each. Every coarser level halves the previous one, up to 65536 samples per
+pixel. All levels are stored as int16 in one small binary file, so drawing a
+ten-minute track at any zoom reads a few kilobytes instead of decoding audio.
+
+File layout (little-endian):
+    header:  magic "PEAK", version (u16), bits (u16), sample rate (u32),
+             frame count (u64), level count (u32)
+    levels:  samples per pixel (u32) and pixel count (u32) per level
+    data:    for each level in order, pixel count (min, max) int16 pairs
+"""
+import logging
+import struct
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from app.services import artifact_store
+
+logger = logging.getLogger(__name__)
+
+PEAKS_MAGIC = b"PEAK"
+PEAKS_VERSION = 1
+PEAKS_BITS = 16
+HEADER = struct.Struct("<4sHHIQI")
+LEVEL_ENTRY = struct.Struct("<II")
+
+BASE_SAMPLES_PER_PIXEL = 256
+LEVELS = [BASE_SAMPLES_PER_PIXEL << i for i in range(9)]  # 256 ... 65536
+
+READ_BLOCK_FRAMES = BASE_SAMPLES_PER_PIXEL * 4096
+
+ORIGINAL = "original"
+
+
+def peaks_name(source: str) -> str:
+    """Artifact name of the peaks of the original upload or of a stem."""
+    return f"{source}.peaks"
+
+
+def _reduce_block(block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Min and max of each BASE_SAMPLES_PER_PIXEL frames of a block, across channels."""
+    if block.ndim > 1:
+        low, high = block.min(axis=1), block.max(axis=1)
+    else:
+        low = high = block
+    pad = (-len(low)) % BASE_SAMPLES_PER_PIXEL
+    if pad:
+        # Repeat the last sample so padding never widens the final pixel
+        low = np.concatenate([low, np.full(pad, low[-1], dtype=low.dtype)])
+        high = np.concatenate([high, np.full(pad, high[-1], dtype=high.dtype)])
+    return (
+        low.reshape(-1, BASE_SAMPLES_PER_PIXEL).min(axis=1),
+        high.reshape(-1, BASE_SAMPLES_PER_PIXEL).max(axis=1),
+    )
+
+
+def _halve(low: np.ndarray, high: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge neighbouring pixels pairwise into the next coarser level."""
+    if len(low) % 2:
+        low = np.append(low, low[-1])
+        high = np.append(high, high[-1])
+    return low.reshape(-1, 2).min(axis=1), high.reshape(-1, 2).max(axis=1)
+
+
+def _quantize(values: np.ndarray) -> np.ndarray:
+    return np.clip(np.round(values * 32767), -32768, 32767).astype("<i2")
+
+
+def compute_peaks(
+    audio_path: Path,
+    output_path: Path,
+    should_stop: Optional[Callable[[], None]] = None,
+) -> Path:
+    """
+    Compute the peak pyramid of an audio file in one streaming pass.
+
+    Args:
+        audio_path: Audio file to read
+        output_path: Peaks file to write (atomically)
+        should_stop: Called between blocks; may raise to abort, e.g. on cancellation
+
+    Returns:
+        Path of the peaks file
+    """
+    lows: List[np.ndarray] = []
+    highs: List[np.ndarray] = []
+
+    with sf.SoundFile(str(audio_path)) as f:
+        sample_rate = f.samplerate
+        frames = 0
+        for block in f.blocks(blocksize=READ_BLOCK_FRAMES, dtype="float32", always_2d=True):
+            if should_stop is not None:
+                should_stop()
+            low, high = _reduce_block(block)
+            lows.append(low)
+            highs.append(high)
+            frames += len(block)
+
+    low = np.concatenate(lows) if lows else np.zeros(0, dtype=np.float32)
+    high = np.concatenate(highs) if highs else np.zeros(0, dtype=np.float32)
+
+    levels: List[Tuple[int, np.ndarray]] = []
+    for samples_per_pixel in LEVELS:
+        pairs = np.empty(2 * len(low), dtype="<i2")
+        pairs[0::2] = _quantize(low)
+        pairs[1::2] = _quantize(high)
+        levels.append((samples_per_pixel, pairs))
+        if len(low) > 1:
+            low, high = _halve(low, high)
+
+    with artifact_store.atomic_write(output_path, should_stop=should_stop) as out:
+        out.write(HEADER.pack(PEAKS_MAGIC, PEAKS_VERSION, PEAKS_BITS, sample_rate, frames, len(levels)))
+        for samples_per_pixel, pairs in levels:
+            out.write(LEVEL_ENTRY.pack(samples_per_pixel, len(pairs) // 2))
+        for _, pairs in levels:
+            out.write(pairs.tobytes())
+
+    logger.debug(f"Computed waveform peaks of {audio_path} ({frames} frames)")
+    return output_path
+
+
+def read_header(path: Path) -> Dict[str, object]:
+    """Read the header and level table of a peaks file."""
+    with open(path, "rb") as f:
+        magic, version, bits, sample_rate, frames, level_count = HEADER.unpack(f.read(HEADER.size))
+        if magic != PEAKS_MAGIC or version != PEAKS_VERSION:
+            raise ValueError(f"Not a peaks file: {path}")
+        levels = {}
+        offset = HEADER.size + LEVEL_ENTRY.size * level_count
+        for _ in range(level_count):
+            samples_per_pixel, pixels = LEVEL_ENTRY.unpack(f.read(LEVEL_ENTRY.size))
+            levels[samples_per_pixel] = (offset, pixels)
+            offset += pixels * 2 * (bits // 8)
+    return {"bits": bits, "sample_rate": sample_rate, "frames": frames, "levels": levels}
+
+
+def read_peaks(
+    path: Path,
+    samples_per_pixel: int,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> Dict[str, object]:
+    """
+    Read the peaks of one level between two times.
+
+    Only the requested pixels are read from disk.
+
+    Args:
+        path: Peaks file
+        samples_per_pixel: Level to read, one of LEVELS
+        start: Start time in seconds (default: beginning)
+        end: End time in seconds (default: end of the audio)
+
+    Returns:
+        dict: Sample rate, level, first pixel and the interleaved min/max int16 values
+
+    Raises:
+        ValueError: If the file has no such level
+    """
+    header = read_header(path)
+    if samples_per_pixel not in header["levels"]:
+        raise ValueError(f"Unknown level {samples_per_pixel}, expected one of {sorted(header['levels'])}")
+    offset, pixels = header["levels"][samples_per_pixel]
+    sample_rate = header["sample_rate"]
+
+    first = 0 if start is None else int(start * sample_rate) // samples_per_pixel
+    last = pixels if end is None else -(-int(end * sample_rate) // samples_per_pixel)
+    first = min(max(first, 0), pixels)
+    last = min(max(last, first), pixels)
+
+    with open(path, "rb") as f:
+        f.seek(offset + first * 4)
+        data = np.frombuffer(f.read((last - first) * 4), dtype="<i2")
+
+    return {
+        "sample_rate": sample_rate,
+        "samples_per_pixel": samples_per_pixel,
+        "bits": header["bits"],
+        "start_pixel": first,
+        "length": last - first,
+        "total_pixels": pixels,
+        "data": data,
+    }
+
+
+def ensure_peaks(
+    audio_file_id: int,
+    audio_path: Path,
+    source: str = ORIGINAL,
+    should_stop: Optional[Callable[[], None]] = None,
+) -> Path:
+    """Return the peaks artifact of a file or stem, computing it if missing (see compute_peaks for should_stop)."""
+    name = peaks_name(source)
+    path = artifact_store.artifact_path(audio_file_id, artifact_store.PEAKS, name)
+    if not path.is_file():
+        compute_peaks(audio_path, path, should_stop=should_stop)
+    return path
@@ -0,0 +1,99 @@
+from celery import shared_task
+import logging
+import time
+from typing import Dict, Any, Optional
+
+from app.models.job import JOB_COMPLETED
+from app.services import artifact_store
+from app.services.cancellation import OperationCancelled
+from app.services.ai_service import get_ai_service
+from app.services.prompt_builder import ANALYSIS_TYPES
+from app.tasks.audio_analysis import (
+    FEATURES_ARTIFACT,
+    BASIC_ARTIFACT,
+    merge_results,
+    store_analysis_result,
+    get_stored_result,
+)
+from app.tasks.tracking import TrackedTask, update_job
+
+logger = logging.getLogger(__name__)
+
+REPORT_ARTIFACT = "report.json"
+
+
+@shared_task(
+    bind=True,
+    base=TrackedTask,
+    autoretry_for=(Exception,),
+    dont_autoretry_for=(OperationCancelled,),
+    retry_backoff=True,
+    max_retries=2,
+)
+def generate_ai_report(
+    self,
+    audio_file_id: int,
+    ai_service: Optional[str] = None,
+    pipeline_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Final pipeline stage: run the AI analyses on the extracted features and write the report.
+
+    Analysis types that already have a stored result are not sent to the AI
+    service again. The report lists the analyses together with the stem and
+    MIDI artifacts of the earlier stages.
+
+    Args:
+        audio_file_id: Audio file to report on
+        ai_service: AI service to use (gemini, openai, or None for default)
+        pipeline_id: Pipeline job to mark completed with the report
+
+    Returns:
+        dict: Reference to the report artifact; the report itself is stored on the pipeline job
+    """
+    start_time = time.time()
+    audio_features = artifact_store.read_json(audio_file_id, artifact_store.FEATURES, FEATURES_ARTIFACT)
+    basic_result = artifact_store.read_json(audio_file_id, artifact_store.FEATURES, BASIC_ARTIFACT)
+
+    analyses = {}
+    missing_types = []
+    for analysis_type in ANALYSIS_TYPES:
+        stored = get_stored_result(audio_file_id, analysis_type)
+        if stored is not None:
+            analyses[analysis_type] = stored
+        else:
+            missing_types.append(analysis_type)
+
+    if missing_types:
+        logger.info(f"Generating {missing_types} analyses for audio file {audio_file_id}")
+        self.report_progress(0.1, "analyzing")
+        try:
+            ai_results = get_ai_service(ai_service).analyze_audio_content_multi(audio_features, missing_types)
+        except Exception as e:
+            # Report the basic analysis without storing it, so a later run can still add the AI analyses
+            logger.error(f"Error in AI analysis: {str(e)}")
+            logger.info(f"Falling back to basic analysis for audio file {audio_file_id}")
+            ai_results = None
+
+        processing_time = time.time() - start_time
+        for analysis_type in missing_types:
+            if ai_results is None:
+                analyses[analysis_type] = dict(basic_result)
+                continue
+            result = merge_results(basic_result, ai_results[analysis_type])
+            store_analysis_result(audio_file_id, analysis_type, ai_service, result, processing_time)
+            analyses[analysis_type] = result
+
+    report = {
+        "audio_file_id": audio_file_id,
+        "basic": basic_result,
+        "analyses": analyses,
+        "stems": sorted(artifact_store.list_artifacts(audio_file_id, artifact_store.STEMS, ".wav")),
+        "midi": sorted(artifact_store.list_artifacts(audio_file_id, artifact_store.MIDI, ".mid")),
+    }
+    artifact_store.write_json(
+        audio_file_id, artifact_store.REPORT, REPORT_ARTIFACT, report, should_stop=self.check_cancelled
+    )
+
+    update_job(pipeline_id, status=JOB_COMPLETED, progress=1.0, result=report)
+    return {"report": artifact_store.artifact_ref(audio_file_id, artifact_store.REPORT, REPORT_ARTIFACT)}
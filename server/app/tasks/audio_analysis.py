@@ -1,96 +1,556 @@
 from celery import shared_task
+import asyncio
 import logging
 import os
 import time
-from typing import Dict, Any, Optional, List
+import soundfile as sf
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator, Callable
 
-from app.services.ai_service import get_ai_service
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.crud.audio import audio_file, analysis_result
+from app.models.job import JOB_RUNNING, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED
+from app.schemas.audio import AnalysisResultCreate
+from app.services import artifact_store
+from app.services.cancellation import OperationCancelled, is_cancelled
+from app.services.spectrogram_tiles import ensure_spectrogram
+from app.services.waveform_peaks import ensure_peaks
+from app.services.ai_service import get_ai_service, get_async_ai_service
 from app.services.audio_feature_extraction import (
     extract_audio_features,
     detect_beats,
     detect_segments
 )
+from app.tasks.tracking import TrackedTask, get_parent_job_id, update_job, update_parent_progress
 
 logger = logging.getLogger(__name__)
 
-@shared_task
-def analyze_audio(file_path: str, analysis_type: str = "general", ai_service: str = None) -> Dict[str, Any]:
+FILE_NOT_FOUND_RESULT = {
+    "key": "Unknown",
+    "tempo": 0,
+    "time_signature": "Unknown",
+    "downbeats": [],
+    "error": "File not found"
+}
+
+# Feature artifacts written by extract_features and read by the AI report stage
+FEATURES_ARTIFACT = "features.json"
+BASIC_ARTIFACT = "basic.json"
+
+
+def _extract_features(file_path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Run the DSP part of the analysis.
+
+    Args:
+        file_path: Path to the audio file to analyze
+
+    Returns:
+        Tuple of (audio features for the AI service, basic analysis result)
+    """
+    audio_features = extract_audio_features(file_path)
+
+    beats = detect_beats(file_path)
+
+    segments = detect_segments(file_path)
+
+    audio_features["beats"] = beats
+    audio_features["segments"] = segments
+
+    basic_result = {
+        "key": f"{audio_features['detected_key']} {audio_features['detected_scale']}",
+        "tempo": audio_features["tempo"],
+        "time_signature": "4/4",  # Default, could be improved with better detection
+        "downbeats": beats[:10] if beats else []  # First 10 beats as downbeats
+    }
+
+    return audio_features, basic_result
+
+
+def merge_results(basic_result: Dict[str, Any], ai_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine the AI result with the basic analysis, keeping basic fields the AI left out."""
+    result = {**basic_result, **ai_result}
+
+    if "key" not in result:
+        result["key"] = basic_result["key"]
+    if "tempo" not in result:
+        result["tempo"] = basic_result["tempo"]
+    if "time_signature" not in result:
+        result["time_signature"] = basic_result["time_signature"]
+    if "downbeats" not in result:
+        result["downbeats"] = basic_result["downbeats"]
+
+    return result
+
+
+# The streaming and combined endpoints extract features inside the API process
+# (streamed tokens have to reach the viewer as they are generated), so the
+# CPU-bound librosa work is bounded per process; the LLM calls are bounded by
+# AI_MAX_CONCURRENCY.
+_feature_slots = asyncio.Semaphore(settings.INPROCESS_ANALYSIS_MAX_CONCURRENCY)
+
+
+async def _extract_features_async(file_path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Run _extract_features in a worker thread, waiting for a free in-process slot."""
+    async with _feature_slots:
+        return await asyncio.to_thread(_extract_features, file_path)
+
+
+def _error_result(error: Exception) -> Dict[str, Any]:
+    return {
+        "key": "C Major",
+        "tempo": 120,
+        "time_signature": "4/4",
+        "downbeats": [0.0, 2.0, 4.0],
+        "error": str(error)
+    }
+
+
+def _run_analysis(
+    file_path: str,
+    analysis_type: str,
+    ai_service: Optional[str],
+    on_progress: Callable[[float, str], None],
+) -> Dict[str, Any]:
+    """Run the DSP and AI analysis of a file, reporting progress between stages."""
+    start_time = time.time()
+
+    try:
+        if not os.path.exists(file_path):
+            logger.error(f"File not found: {file_path}")
+            return dict(FILE_NOT_FOUND_RESULT)
+
+        on_progress(0.1, "extracting_features")
+        audio_features, basic_result = _extract_features(file_path)
+
+        if analysis_type == "basic":
+            logger.info(f"Completed basic audio analysis for {file_path} in {time.time() - start_time:.2f}s")
+            return basic_result
+
+        on_progress(0.6, "analyzing")
+
+        try:
+            ai_service_instance = get_ai_service(ai_service)
+
+            ai_result = ai_service_instance.analyze_audio_content(audio_features, analysis_type)
+
+            result = merge_results(basic_result, ai_result)
+
+            logger.info(f"Completed AI audio analysis for {file_path} in {time.time() - start_time:.2f}s")
+            return result
+
+        except Exception as e:
+            logger.error(f"Error in AI analysis: {str(e)}")
+            logger.info(f"Falling back to basic analysis for {file_path}")
+            return basic_result
+
+    except Exception as e:
+        logger.error(f"Error analyzing audio: {str(e)}")
+        return _error_result(e)
+
+
+def store_analysis_result(
+    audio_file_id: int,
+    analysis_type: str,
+    ai_service: Optional[str],
+    result: Dict[str, Any],
+    processing_time: float,
+) -> None:
+    db = SessionLocal()
+    try:
+        analysis_result.upsert(db=db, obj_in=AnalysisResultCreate(
+            audio_file_id=audio_file_id,
+            analysis_type=analysis_type,
+            result=result,
+            confidence=result.get("confidence", 0.85),
+            processing_time=processing_time,
+            notes=f"{analysis_type} analysis using {ai_service or 'default'} service"
+        ))
+    finally:
+        db.close()
+
+
+def get_stored_result(audio_file_id: int, analysis_type: str) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        existing_analysis = analysis_result.get_by_type(
+            db=db, audio_file_id=audio_file_id, analysis_type=analysis_type
+        )
+        return existing_analysis.result if existing_analysis else None
+    finally:
+        db.close()
+
+
+# The result is kept in the job row and as an AnalysisResult, so it is not
+# stored in the result backend as well
+@shared_task(bind=True, ignore_result=True)
+def analyze_audio(
+    self,
+    file_path: str,
+    analysis_type: str = "general",
+    ai_service: str = None,
+    audio_file_id: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     Analyze audio file to extract key, tempo, time signature, and other musical features.
     Uses AI services for advanced analysis.
-    
+
+    When audio_file_id is given, the result is stored as an AnalysisResult and
+    the ProcessingJob whose id is this task's id is kept up to date.
+
     Args:
         file_path: Path to the audio file to analyze
         analysis_type: Type of analysis to perform (general, music_theory, production_feedback, arrangement_analysis)
         ai_service: AI service to use (gemini, openai, or None for default)
-        
+        audio_file_id: Audio file to store the result for
+
     Returns:
         dict: Analysis results including key, tempo, time signature, etc.
     """
     logger.info(f"Starting audio analysis for {file_path} with type {analysis_type}")
+    job_id = self.request.id
     start_time = time.time()
-    
+
+    def on_progress(progress: float, stage: str) -> None:
+        # request.id is only set when running on a worker, not when called directly
+        if job_id:
+            self.update_state(state="PROGRESS", meta={"progress": progress, "stage": stage})
+        update_job(job_id, status=JOB_RUNNING, progress=progress)
+
+    def finish(**fields: Any) -> None:
+        update_job(job_id, **fields)
+        # Analyses queued as part of a batch advance their batch job
+        parent_id = get_parent_job_id(job_id)
+        if parent_id:
+            update_parent_progress(parent_id)
+
+    if is_cancelled(job_id):
+        logger.info(f"Skipping cancelled analysis job {job_id}")
+        finish(status=JOB_CANCELLED)
+        return {}
+
+    try:
+        if audio_file_id is not None:
+            # A duplicate job may have been queued before an earlier one stored its result
+            existing_result = get_stored_result(audio_file_id, analysis_type)
+            if existing_result is not None:
+                finish(status=JOB_COMPLETED, progress=1.0, result=existing_result)
+                return existing_result
+
+        result = _run_analysis(file_path, analysis_type, ai_service, on_progress)
+
+        if audio_file_id is None:
+            return result
+
+        if "error" in result:
+            finish(status=JOB_FAILED, error=result["error"], result=result)
+            return result
+
+        if is_cancelled(job_id):
+            logger.info(f"Discarding result of cancelled analysis job {job_id}")
+            finish(status=JOB_CANCELLED)
+            return result
+
+        try:
+            store_analysis_result(audio_file_id, analysis_type, ai_service, result, time.time() - start_time)
+        except Exception as e:
+            raise RuntimeError(f"Failed to store result: {str(e)}") from e
+    except Exception as e:
+        # Without this the job would stay running, and its batch would never finish
+        logger.error(f"Analysis job {job_id} for file {audio_file_id} failed: {str(e)}")
+        finish(status=JOB_FAILED, error=str(e))
+        raise
+
+    finish(status=JOB_COMPLETED, progress=1.0, result=result)
+    return result
+
+
+def get_audio_file_path(audio_file_id: int) -> str:
+    """Return the stored path of an audio file, raising if the row or the file is gone."""
+    db = SessionLocal()
+    try:
+        db_file = audio_file.get(db=db, id=audio_file_id)
+    finally:
+        db.close()
+    if db_file is None:
+        raise ValueError(f"Audio file {audio_file_id} not found")
+    if not os.path.exists(db_file.file_path):
+        raise FileNotFoundError(db_file.file_path)
+    return db_file.file_path
+
+
+@shared_task(bind=True, base=TrackedTask)
+def ingest_audio(self, audio_file_id: int) -> Dict[str, Any]:
+    """
+    First pipeline stage: check the upload is readable, record its properties
+    and compute its waveform peaks.
+
+    Args:
+        audio_file_id: Audio file to ingest
+
+    Returns:
+        dict: Duration, sample rate and format of the file
+    """
+    file_path = get_audio_file_path(audio_file_id)
+    info = sf.info(file_path)
+
+    properties = {
+        "duration": float(info.duration),
+        "sample_rate": int(info.samplerate),
+        "format": info.format.lower(),
+    }
+
+    db = SessionLocal()
+    try:
+        db_file = audio_file.get(db=db, id=audio_file_id)
+        audio_file.update(db=db, db_obj=db_file, obj_in=properties)
+    finally:
+        db.close()
+
+    try:
+        ensure_peaks(audio_file_id, Path(file_path), should_stop=self.check_cancelled)
+    except OperationCancelled:
+        raise
+    except Exception as e:
+        # The overview can still be computed on request; don't fail the pipeline over it
+        logger.warning(f"Could not compute waveform peaks of audio file {audio_file_id}: {str(e)}")
+
+    logger.info(f"Ingested audio file {audio_file_id}: {properties}")
+    return properties
+
+
+@shared_task(bind=True, base=TrackedTask)
+def extract_features(self, audio_file_id: int) -> Dict[str, Any]:
+    """
+    Pipeline stage: extract audio features, the basic analysis and the base
+    spectrogram for the editor's tiles into the artifact store.
+
+    Skipped when the artifacts already exist, so a retried pipeline does not redo it.
+
+    Args:
+        audio_file_id: Audio file to analyze
+
+    Returns:
+        dict: References to the features and basic analysis artifacts
+    """
+    refs = {
+        "features": artifact_store.artifact_ref(audio_file_id, artifact_store.FEATURES, FEATURES_ARTIFACT),
+        "basic": artifact_store.artifact_ref(audio_file_id, artifact_store.FEATURES, BASIC_ARTIFACT),
+    }
+    if (
+        artifact_store.exists(audio_file_id, artifact_store.FEATURES, FEATURES_ARTIFACT)
+        and artifact_store.exists(audio_file_id, artifact_store.FEATURES, BASIC_ARTIFACT)
+    ):
+        logger.info(f"Features for audio file {audio_file_id} already extracted")
+        return refs
+
+    file_path = get_audio_file_path(audio_file_id)
+    self.report_progress(0.1, "extracting_features")
+    audio_features, basic_result = _extract_features(file_path)
+    if "error" in audio_features:
+        raise RuntimeError(f"Feature extraction failed: {audio_features['error']}")
+
+    artifact_store.write_json(
+        audio_file_id, artifact_store.FEATURES, FEATURES_ARTIFACT, audio_features, should_stop=self.check_cancelled
+    )
+    artifact_store.write_json(
+        audio_file_id, artifact_store.FEATURES, BASIC_ARTIFACT, basic_result, should_stop=self.check_cancelled
+    )
+
+    self.report_progress(0.8, "spectrogram")
+    try:
+        ensure_spectrogram(audio_file_id, Path(file_path), should_stop=self.check_cancelled)
+    except OperationCancelled:
+        raise
+    except Exception as e:
+        # Spectrogram tiles fall back to computing their own STFT
+        logger.warning(f"Could not compute spectrogram of audio file {audio_file_id}: {str(e)}")
+    return refs
+
+
+async def analyze_audio_async(file_path: str, analysis_type: str = "general", ai_service: str = None) -> Dict[str, Any]:
+    """
+    Event-loop friendly variant of analyze_audio for use inside API handlers.
+
+    Feature extraction runs in a worker thread and the AI call uses the shared
+    async AI service clients.
+
+    Args:
+        file_path: Path to the audio file to analyze
+        analysis_type: Type of analysis to perform (general, music_theory, production_feedback, arrangement_analysis)
+        ai_service: AI service to use (gemini, openai, or None for default)
+
+    Returns:
+        dict: Analysis results including key, tempo, time signature, etc.
+    """
+    logger.info(f"Starting async audio analysis for {file_path} with type {analysis_type}")
+    start_time = time.time()
+
     try:
         if not os.path.exists(file_path):
             logger.error(f"File not found: {file_path}")
-            return {
-                "key": "Unknown",
-                "tempo": 0,
-                "time_signature": "Unknown",
-                "downbeats": [],
-                "error": "File not found"
-            }
-        
-        audio_features = extract_audio_features(file_path)
-        
-        beats = detect_beats(file_path)
-        
-        segments = detect_segments(file_path)
-        
-        audio_features["beats"] = beats
-        audio_features["segments"] = segments
-        
-        basic_result = {
-            "key": f"{audio_features['detected_key']} {audio_features['detected_scale']}",
-            "tempo": audio_features["tempo"],
-            "time_signature": "4/4",  # Default, could be improved with better detection
-            "downbeats": beats[:10] if beats else []  # First 10 beats as downbeats
-        }
-        
+            return dict(FILE_NOT_FOUND_RESULT)
+
+        audio_features, basic_result = await _extract_features_async(file_path)
+
         if analysis_type == "basic":
-            logger.info(f"Completed basic audio analysis for {file_path} in {time.time() - start_time:.2f}s")
             return basic_result
-        
+
         try:
-            ai_service_instance = get_ai_service(ai_service)
-            
-            ai_result = ai_service_instance.analyze_audio_content(audio_features, analysis_type)
-            
-            result = {**basic_result, **ai_result}
-            
-            if "key" not in result:
-                result["key"] = basic_result["key"]
-            if "tempo" not in result:
-                result["tempo"] = basic_result["tempo"]
-            if "time_signature" not in result:
-                result["time_signature"] = basic_result["time_signature"]
-            if "downbeats" not in result:
-                result["downbeats"] = basic_result["downbeats"]
-            
+            ai_service_instance = get_async_ai_service(ai_service)
+
+            ai_result = await ai_service_instance.analyze_audio_content(audio_features, analysis_type)
+
+            result = merge_results(basic_result, ai_result)
+
             logger.info(f"Completed AI audio analysis for {file_path} in {time.time() - start_time:.2f}s")
             return result
-            
+
         except Exception as e:
             logger.error(f"Error in AI analysis: {str(e)}")
             logger.info(f"Falling back to basic analysis for {file_path}")
             return basic_result
-    
+
+    except Exception as e:
+        logger.error(f"Error analyzing audio: {str(e)}")
+        return _error_result(e)
+
+
+async def stream_audio_analysis(
+    file_path: str, analysis_type: str = "general", ai_service: str = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of analyze_audio_async.
+
+    Yields ``status`` events while the audio is processed, ``token`` events with
+    AI-generated text as it arrives and a final ``result`` event carrying the
+    same result analyze_audio_async would return.
+
+    Args:
+        file_path: Path to the audio file to analyze
+        analysis_type: Type of analysis to perform (general, music_theory, production_feedback, arrangement_analysis)
+        ai_service: AI service to use (gemini, openai, or None for default)
+
+    Yields:
+        dict: Events with an "event" key of status, token or result
+    """
+    logger.info(f"Starting streamed audio analysis for {file_path} with type {analysis_type}")
+    start_time = time.time()
+
+    if not os.path.exists(file_path):
+        logger.error(f"File not found: {file_path}")
+        yield {"event": "result", "result": dict(FILE_NOT_FOUND_RESULT)}
+        return
+
+    yield {"event": "status", "stage": "extracting_features"}
+
+    try:
+        audio_features, basic_result = await _extract_features_async(file_path)
+    except Exception as e:
+        logger.error(f"Error analyzing audio: {str(e)}")
+        yield {"event": "result", "result": _error_result(e)}
+        return
+
+    yield {"event": "status", "stage": "analyzing", "basic_result": basic_result}
+
+    try:
+        ai_service_instance = get_async_ai_service(ai_service)
+    except Exception as e:
+        logger.error(f"Error in AI analysis: {str(e)}")
+        logger.info(f"Falling back to basic analysis for {file_path}")
+        yield {"event": "result", "result": basic_result}
+        return
+
+    async for event in ai_service_instance.stream_audio_content(audio_features, analysis_type):
+        if event["event"] == "result":
+            logger.info(f"Completed streamed AI audio analysis for {file_path} in {time.time() - start_time:.2f}s")
+            event = {"event": "result", "result": merge_results(basic_result, event["result"])}
+        yield event
+
+
+@shared_task
+def analyze_audio_multi(file_path: str, analysis_types: List[str], ai_service: str = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Run several analysis types on an audio file with one feature extraction and one AI request.
+
+    Args:
+        file_path: Path to the audio file to analyze
+        analysis_types: Types of analysis to perform
+        ai_service: AI service to use (gemini, openai, or None for default)
+
+    Returns:
+        dict: Analysis results keyed by analysis type
+    """
+    logger.info(f"Starting combined audio analysis for {file_path} with types {analysis_types}")
+    start_time = time.time()
+
+    try:
+        if not os.path.exists(file_path):
+            logger.error(f"File not found: {file_path}")
+            return {t: dict(FILE_NOT_FOUND_RESULT) for t in analysis_types}
+
+        audio_features, basic_result = _extract_features(file_path)
+
+        try:
+            ai_service_instance = get_ai_service(ai_service)
+
+            ai_results = ai_service_instance.analyze_audio_content_multi(audio_features, analysis_types)
+
+            results = {t: merge_results(basic_result, ai_results[t]) for t in analysis_types}
+
+            logger.info(f"Completed combined AI audio analysis for {file_path} in {time.time() - start_time:.2f}s")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error in AI analysis: {str(e)}")
+            logger.info(f"Falling back to basic analysis for {file_path}")
+            return {t: dict(basic_result) for t in analysis_types}
+
+    except Exception as e:
+        logger.error(f"Error analyzing audio: {str(e)}")
+        return {t: _error_result(e) for t in analysis_types}
+
+
+async def analyze_audio_multi_async(
+    file_path: str, analysis_types: List[str], ai_service: str = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Event-loop friendly variant of analyze_audio_multi for use inside API handlers.
+
+    Args:
+        file_path: Path to the audio file to analyze
+        analysis_types: Types of analysis to perform
+        ai_service: AI service to use (gemini, openai, or None for default)
+
+    Returns:
+        dict: Analysis results keyed by analysis type
+    """
+    logger.info(f"Starting async combined audio analysis for {file_path} with types {analysis_types}")
+    start_time = time.time()
+
+    try:
+        if not os.path.exists(file_path):
+            logger.error(f"File not found: {file_path}")
+            return {t: dict(FILE_NOT_FOUND_RESULT) for t in analysis_types}
+
+        audio_features, basic_result = await _extract_features_async(file_path)
+
+        try:
+            ai_service_instance = get_async_ai_service(ai_service)
+
+            ai_results = await ai_service_instance.analyze_audio_content_multi(audio_features, analysis_types)
+
+            results = {t: merge_results(basic_result, ai_results[t]) for t in analysis_types}
+
+            logger.info(f"Completed combined AI audio analysis for {file_path} in {time.time() - start_time:.2f}s")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error in AI analysis: {str(e)}")
+            logger.info(f"Falling back to basic analysis for {file_path}")
+            return {t: dict(basic_result) for t in analysis_types}
+
     except Exception as e:
         logger.error(f"Error analyzing audio: {str(e)}")
-        return {
-            "key": "C Major",
-            "tempo": 120,
-            "time_signature": "4/4",
-            "downbeats": [0.0, 2.0, 4.0],
-            "error": str(e)
-        }
+        return {t: _error_result(e) for t in analysis_types}
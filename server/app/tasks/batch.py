@@ -0,0 +1,97 @@
+"""
+Batch analysis of several audio files, e.g. all tracks of an album.
+
+A batch job is the parent of one analysis job per file and analysis type,
+the same way a pipeline job is the parent of its stages. The analyses are
+queued with the fair scheduler in one round trip and run as independent
+analysis jobs, so they share the analysis capacity with other users' work
+like the same analyses requested one by one. The batch job completes once
+every analysis has finished.
+"""
+import logging
+import uuid
+from typing import List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.crud.job import job
+from app.models.audio import AudioFile
+from app.models.job import ProcessingJob, JOB_FAILED, PRIORITY_BATCH
+from app.schemas.job import JobCreate
+from app.services.fair_scheduler import scheduler, lane_priority, CLASS_ANALYSIS
+from app.tasks.audio_analysis import analyze_audio
+
+logger = logging.getLogger(__name__)
+
+
+def start_batch_analysis(
+    db: Session,
+    items: List[Tuple[AudioFile, str]],
+    user_id: int,
+    ai_service: Optional[str] = None,
+    priority: str = PRIORITY_BATCH,
+) -> ProcessingJob:
+    """
+    Create a batch job with one analysis job per item and queue the analyses.
+
+    Args:
+        db: Database session
+        items: Audio file and analysis type of each analysis to run
+        user_id: Owner of the jobs
+        ai_service: AI service to use (gemini, openai, or None for default)
+        priority: Scheduling lane (interactive or batch)
+
+    Returns:
+        The batch job; its analysis jobs are available as ``stages``
+    """
+    batch = job.create(db=db, obj_in=JobCreate(
+        id=str(uuid.uuid4()),
+        job_type="batch",
+        user_id=user_id,
+        priority=priority
+    ))
+    stages_in = [
+        JobCreate(
+            id=str(uuid.uuid4()),
+            job_type="analysis",
+            parent_id=batch.id,
+            user_id=user_id,
+            audio_file_id=db_file.id,
+            analysis_type=analysis_type,
+            priority=priority
+        )
+        for db_file, analysis_type in items
+    ]
+    try:
+        job.create_many(db=db, objs_in=stages_in)
+    except IntegrityError:
+        # Another request queued one of the analyses since the caller checked
+        db.rollback()
+        job.update_status(db=db, id=batch.id, status=JOB_FAILED, error="Analysis queued concurrently")
+        raise
+
+    # The job id doubles as the Celery task id so the worker can update it
+    signatures = [
+        (
+            analyze_audio.s(
+                file_path=db_file.file_path,
+                analysis_type=analysis_type,
+                ai_service=ai_service,
+                audio_file_id=db_file.id,
+            ).set(task_id=stage_in.id, priority=lane_priority(priority)),
+            stage_in.id,
+        )
+        for (db_file, analysis_type), stage_in in zip(items, stages_in)
+    ]
+
+    try:
+        scheduler.submit_many(signatures, user_id, lane=priority, job_class=CLASS_ANALYSIS)
+    except Exception as e:
+        logger.error(f"Error enqueueing batch {batch.id}: {str(e)}")
+        for job_id in [batch.id] + [stage_in.id for stage_in in stages_in]:
+            job.update_status(db=db, id=job_id, status=JOB_FAILED, error=str(e))
+        raise
+
+    db.refresh(batch)
+    return batch
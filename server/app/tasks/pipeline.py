@@ -0,0 +1,124 @@
+"""
+End-to-end processing pipeline for an uploaded audio file.
+
+The stages form a Celery task graph:
+
+    ingest -> (features | separation -> transcription per stem) -> AI report
+
+Feature extraction runs in parallel with separation and the transcription of
+its stems, each on their own queues. Transcription only waits for separation,
+not for features, and the AI report waits for both branches.
+Every stage has its own ProcessingJob under the pipeline job and writes its
+outputs to the artifact store. Stages skip work whose artifacts exist, so
+starting the pipeline again after a failure only redoes the failed stages.
+"""
+import logging
+import uuid
+from typing import Any, Dict, Optional
+
+from celery import chain, group
+from celery.canvas import Signature
+from sqlalchemy.orm import Session
+
+from app.celery_app import celery_app
+from app.crud.job import job
+from app.models.audio import AudioFile
+from app.models.job import ProcessingJob, JOB_FAILED, PRIORITY_INTERACTIVE
+from app.schemas.job import JobCreate
+from app.services.fair_scheduler import scheduler, lane_priority, CLASS_PIPELINE
+
+logger = logging.getLogger(__name__)
+
+# Stems produced by the htdemucs models; the list is fixed, so the
+# transcription fan-out can be built up front
+STEM_NAMES = ["vocals", "drums", "bass", "other"]
+
+# Tasks are referenced by name so the API process doesn't import the model code
+INGEST_TASK = "app.tasks.audio_analysis.ingest_audio"
+FEATURES_TASK = "app.tasks.audio_analysis.extract_features"
+SEPARATION_TASK = "app.tasks.source_separation.separate_audio"
+TRANSCRIPTION_TASK = "app.tasks.transcription.transcribe_audio_stem"
+REPORT_TASK = "app.tasks.ai_analysis_reporting.generate_ai_report"
+
+
+def _stage(
+    db: Session,
+    pipeline: ProcessingJob,
+    task_name: str,
+    job_type: str,
+    kwargs: Dict[str, Any],
+    analysis_type: Optional[str] = None,
+) -> Signature:
+    """Create the job row of a stage and an immutable signature whose task id is the job id."""
+    db_job = job.create(db=db, obj_in=JobCreate(
+        id=str(uuid.uuid4()),
+        job_type=job_type,
+        parent_id=pipeline.id,
+        user_id=pipeline.user_id,
+        audio_file_id=pipeline.audio_file_id,
+        analysis_type=analysis_type,
+        priority=pipeline.priority
+    ))
+    return celery_app.signature(task_name, kwargs=kwargs, immutable=True).set(
+        task_id=db_job.id, priority=lane_priority(pipeline.priority)
+    )
+
+
+def start_pipeline(
+    db: Session,
+    db_file: AudioFile,
+    user_id: int,
+    ai_service: Optional[str] = None,
+    priority: str = PRIORITY_INTERACTIVE,
+) -> ProcessingJob:
+    """
+    Create the jobs of a processing pipeline for a file and submit its task graph.
+
+    The graph is dispatched by the fair scheduler once a pipeline slot is free.
+
+    Args:
+        db: Database session
+        db_file: Audio file to process
+        user_id: Owner of the jobs
+        ai_service: AI service for the report (gemini, openai, or None for default)
+        priority: Scheduling lane (interactive or batch)
+
+    Returns:
+        The pipeline job; its stages are available as ``stages``
+    """
+    pipeline = job.create(db=db, obj_in=JobCreate(
+        id=str(uuid.uuid4()),
+        job_type="pipeline",
+        user_id=user_id,
+        audio_file_id=db_file.id,
+        priority=priority
+    ))
+    file_kwargs = {"audio_file_id": db_file.id}
+
+    graph = chain(
+        _stage(db, pipeline, INGEST_TASK, "ingest", file_kwargs),
+        group(
+            _stage(db, pipeline, FEATURES_TASK, "features", file_kwargs),
+            chain(
+                _stage(db, pipeline, SEPARATION_TASK, "separation", file_kwargs),
+                group(
+                    # The stem name is recorded as the job's analysis_type
+                    _stage(db, pipeline, TRANSCRIPTION_TASK, "transcription", {**file_kwargs, "stem": stem}, stem)
+                    for stem in STEM_NAMES
+                ),
+            ),
+        ),
+        _stage(db, pipeline, REPORT_TASK, "report", {
+            **file_kwargs, "ai_service": ai_service, "pipeline_id": pipeline.id
+        }),
+    )
+
+    try:
+        scheduler.submit(graph, pipeline.id, user_id, lane=priority, job_class=CLASS_PIPELINE)
+    except Exception as e:
+        logger.error(f"Error enqueueing pipeline {pipeline.id}: {str(e)}")
+        job.update_status(db=db, id=pipeline.id, status=JOB_FAILED, error=str(e))
+        raise
+
+    db.refresh(pipeline)
+    return pipeline
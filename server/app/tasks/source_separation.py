@@ -0,0 +1,74 @@
+from celery import shared_task
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Any
+
+from app.services import artifact_store
+from app.services.cancellation import OperationCancelled
+from app.services.audio_separation import separate_stems
+from app.services.waveform_peaks import ensure_peaks
+from app.tasks.audio_analysis import get_audio_file_path
+from app.tasks.pipeline import STEM_NAMES
+from app.tasks.tracking import TrackedTask
+
+logger = logging.getLogger(__name__)
+
+
+def _compute_stem_peaks(audio_file_id: int, stem_paths: Dict[str, Path], should_stop: Callable[[], None]) -> None:
+    """Compute the waveform peaks of each stem that has none yet, stopping when should_stop raises."""
+    for stem, path in stem_paths.items():
+        try:
+            ensure_peaks(audio_file_id, Path(path), source=stem, should_stop=should_stop)
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            logger.warning(f"Could not compute waveform peaks of stem {stem} of audio file {audio_file_id}: {str(e)}")
+
+
+@shared_task(
+    bind=True,
+    base=TrackedTask,
+    autoretry_for=(Exception,),
+    dont_autoretry_for=(OperationCancelled,),
+    retry_backoff=True,
+    max_retries=2,
+)
+def separate_audio(self, audio_file_id: int) -> Dict[str, Any]:
+    """
+    Pipeline stage: separate an audio file into stems in the artifact store.
+
+    Skipped when every stem already exists, so a retried pipeline does not
+    run the separation model again; stems are only written once the model
+    has separated them, and a model failure fails the stage. Progress is reported per separated chunk,
+    and a cancelled job stops after the current chunk. Waveform peaks are
+    computed for every stem.
+
+    Args:
+        audio_file_id: Audio file to separate
+
+    Returns:
+        dict: Names of the separated stems
+    """
+    stems = artifact_store.list_artifacts(audio_file_id, artifact_store.STEMS, ".wav")
+    if all(name in stems for name in STEM_NAMES):
+        logger.info(f"Stems for audio file {audio_file_id} already separated")
+        _compute_stem_peaks(audio_file_id, stems, self.check_cancelled)
+        return {"stems": sorted(stems)}
+
+    file_path = get_audio_file_path(audio_file_id)
+    stem_dir = artifact_store.artifact_dir(audio_file_id, artifact_store.STEMS)
+
+    logger.info(f"Separating stems for audio file {audio_file_id}")
+    self.report_progress(0.05, "separating")
+    stem_paths = separate_stems(
+        Path(file_path),
+        stem_dir,
+        on_progress=lambda fraction: self.report_progress(0.05 + 0.9 * fraction, "separating"),
+        # A failed separation must fail the stage so it is retried, not leave the mix as stems
+        dummy_stems_on_error=False,
+        should_stop=self.check_cancelled,
+    )
+
+    self.report_progress(0.95, "peaks")
+    _compute_stem_peaks(audio_file_id, stem_paths, self.check_cancelled)
+    return {"stems": sorted(stem_paths)}
@@ -0,0 +1,198 @@
+"""
+Mirroring of Celery task state into ProcessingJob rows.
+"""
+import logging
+from typing import Any, Optional
+
+from celery import Task
+
+from sqlalchemy.orm import Session
+
+from app.celery_app import celery_app
+from app.db.base import SessionLocal
+from app.crud.job import job
+from app.models.job import (
+    ProcessingJob,
+    JOB_RUNNING,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_CANCELLED,
+    ACTIVE_JOB_STATUSES,
+    FINAL_JOB_STATUSES,
+)
+from app.services.cancellation import OperationCancelled, is_cancelled, raise_if_cancelled, request_cancellation
+from app.services.fair_scheduler import scheduler
+
+logger = logging.getLogger(__name__)
+
+
+def update_job(job_id: Optional[str], **fields: Any) -> None:
+    """
+    Update the processing job of a task; tasks run without a job id are not tracked.
+
+    A job reaching a final status frees its scheduler slot for the next job.
+    """
+    if not job_id:
+        return
+    db = SessionLocal()
+    try:
+        job.update_status(db, id=job_id, **fields)
+    except Exception as e:
+        logger.error(f"Failed to update job {job_id}: {str(e)}")
+    finally:
+        db.close()
+
+    if fields.get("status") in FINAL_JOB_STATUSES:
+        try:
+            scheduler.release(job_id)
+        except Exception as e:
+            logger.error(f"Failed to release scheduler slot of job {job_id}: {str(e)}")
+
+
+def get_parent_job_id(job_id: Optional[str]) -> Optional[str]:
+    if not job_id:
+        return None
+    db = SessionLocal()
+    try:
+        db_job = job.get(db, id=job_id)
+        return db_job.parent_id if db_job else None
+    finally:
+        db.close()
+
+
+def update_parent_progress(parent_id: str) -> None:
+    """
+    Set a parent job's progress to the share of its stages that have completed.
+
+    A parent whose stages have all finished is finished too, e.g. a batch of
+    analyses: completed, failed if any stage failed, or cancelled if every
+    stage was cancelled. Pipelines are completed by their report stage before
+    this runs.
+    """
+    db = SessionLocal()
+    try:
+        parent = job.get(db, id=parent_id)
+        if parent is None or not parent.stages or parent.status in FINAL_JOB_STATUSES:
+            return
+        done = sum(1 for stage in parent.stages if stage.status == JOB_COMPLETED)
+        if all(stage.status in FINAL_JOB_STATUSES for stage in parent.stages):
+            failed = sum(1 for stage in parent.stages if stage.status == JOB_FAILED)
+            if failed:
+                update_job(parent_id, status=JOB_FAILED, error=f"{failed} of {len(parent.stages)} stages failed")
+            elif all(stage.status == JOB_CANCELLED for stage in parent.stages):
+                update_job(parent_id, status=JOB_CANCELLED)
+            else:
+                update_job(parent_id, status=JOB_COMPLETED, progress=1.0)
+            return
+        job.update_status(db, id=parent_id, status=JOB_RUNNING, progress=done / len(parent.stages))
+    except Exception as e:
+        logger.error(f"Failed to update progress of job {parent_id}: {str(e)}")
+    finally:
+        db.close()
+
+
+def cancel_job(db: Session, db_job: ProcessingJob) -> ProcessingJob:
+    """
+    Cancel a job and its active stages.
+
+    Queued work is dropped: jobs still waiting in the scheduler are skipped and
+    their Celery messages are revoked. Running tasks stop at their next
+    cancellation check. The job's scheduler slot is freed right away, and the
+    progress of a parent job such as a batch is updated, finishing it if this
+    was its last active stage.
+
+    Args:
+        db: Database session
+        db_job: Job to cancel
+
+    Returns:
+        The updated job
+    """
+    jobs = [db_job] + [stage for stage in db_job.stages if stage.status in ACTIVE_JOB_STATUSES]
+    job_ids = [j.id for j in jobs if j.status in ACTIVE_JOB_STATUSES]
+    if not job_ids:
+        return db_job
+    parent_ids = {j.parent_id for j in jobs if j.id in job_ids and j.parent_id and j.parent_id not in job_ids}
+
+    for job_id in job_ids:
+        request_cancellation(job_id)
+        job.update_status(db, id=job_id, status=JOB_CANCELLED)
+
+    try:
+        celery_app.control.revoke(job_ids)
+    except Exception as e:
+        logger.warning(f"Failed to revoke tasks {job_ids}: {str(e)}")
+
+    for job_id in job_ids:
+        try:
+            scheduler.release(job_id)
+        except Exception as e:
+            logger.error(f"Failed to release scheduler slot of job {job_id}: {str(e)}")
+
+    for parent_id in parent_ids:
+        update_parent_progress(parent_id)
+
+    logger.info(f"Cancelled jobs {job_ids}")
+    db.refresh(db_job)
+    return db_job
+
+
+class TrackedTask(Task):
+    """
+    Task base class that keeps the ProcessingJob with the task's id up to date.
+
+    The job is marked running when the task starts, completed with the task's
+    return value when it succeeds and failed when it gives up. A completed
+    stage advances its parent pipeline job's progress; a failed stage fails it.
+
+    A task whose job was cancelled does not start, and long tasks call
+    report_progress between units of work, which stops them once cancelled.
+    """
+
+    def __call__(self, *args, **kwargs):
+        raise_if_cancelled(self.request.id)
+        return super().__call__(*args, **kwargs)
+
+    def check_cancelled(self) -> None:
+        """
+        Stop the task if its job has been cancelled.
+
+        Raises:
+            OperationCancelled: If the job has been cancelled
+        """
+        raise_if_cancelled(self.request.id)
+
+    def report_progress(self, progress: float, stage: str) -> None:
+        """
+        Publish progress through the task state and the job row.
+
+        Raises:
+            OperationCancelled: If the job has been cancelled
+        """
+        job_id = self.request.id
+        raise_if_cancelled(job_id)
+        # request.id is only set when running on a worker, not when called directly
+        if job_id:
+            self.update_state(state="PROGRESS", meta={"progress": progress, "stage": stage})
+        update_job(job_id, progress=progress)
+
+    def before_start(self, task_id, args, kwargs):
+        update_job(task_id, status=JOB_RUNNING, error=None)
+
+    def on_success(self, retval, task_id, args, kwargs):
+        result = retval if isinstance(retval, dict) else None
+        update_job(task_id, status=JOB_COMPLETED, progress=1.0, result=result)
+        parent_id = get_parent_job_id(task_id)
+        if parent_id:
+            update_parent_progress(parent_id)
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        if isinstance(exc, OperationCancelled):
+            update_job(task_id, status=JOB_CANCELLED)
+            return
+
+        error = f"{type(exc).__name__}: {exc}"
+        update_job(task_id, status=JOB_FAILED, error=error)
+        parent_id = get_parent_job_id(task_id)
+        if parent_id and not is_cancelled(parent_id):
+            update_job(parent_id, status=JOB_FAILED, error=f"Stage {self.name} failed: {error}")
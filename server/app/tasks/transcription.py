@@ -0,0 +1,58 @@
+from celery import shared_task
+import logging
+from typing import Dict, Any
+
+from app.services import artifact_store
+from app.services.cancellation import OperationCancelled
+from app.services.transcription import transcribe_stem, save_midi
+from app.tasks.tracking import TrackedTask
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    bind=True,
+    base=TrackedTask,
+    autoretry_for=(Exception,),
+    dont_autoretry_for=(OperationCancelled,),
+    retry_backoff=True,
+    max_retries=2,
+)
+def transcribe_audio_stem(self, audio_file_id: int, stem: str) -> Dict[str, Any]:
+    """
+    Pipeline stage: transcribe one separated stem to MIDI in the artifact store.
+
+    One task runs per stem so the stems are transcribed in parallel. Skipped
+    when the MIDI file already exists.
+
+    Args:
+        audio_file_id: Audio file whose stem to transcribe
+        stem: Stem name, e.g. "vocals"
+
+    Returns:
+        dict: Stem name and MIDI artifact name
+    """
+    midi_name = f"{stem}.mid"
+    if artifact_store.exists(audio_file_id, artifact_store.MIDI, midi_name):
+        logger.info(f"Stem {stem} of audio file {audio_file_id} already transcribed")
+        return {"stem": stem, "midi": midi_name}
+
+    stem_path = artifact_store.artifact_path(audio_file_id, artifact_store.STEMS, f"{stem}.wav")
+    if not stem_path.exists():
+        raise FileNotFoundError(f"Stem {stem} of audio file {audio_file_id} has not been separated")
+
+    logger.info(f"Transcribing stem {stem} of audio file {audio_file_id}")
+    self.report_progress(0.1, "transcribing")
+    midi = transcribe_stem(stem_path)
+    self.report_progress(0.9, "saving")
+
+    for instrument in midi.instruments:
+        instrument.name = stem
+
+    # Write next to the final name and swap, so a crash never leaves a partial file that looks done;
+    # a stage cancelled meanwhile, e.g. because its file was deleted, discards the MIDI instead
+    midi_path = artifact_store.artifact_path(audio_file_id, artifact_store.MIDI, midi_name)
+    with artifact_store.atomic_write(midi_path, should_stop=self.check_cancelled) as f:
+        save_midi(midi, f)
+
+    return {"stem": stem, "midi": midi_name}
@@ -0,0 +1,219 @@
+"""
+Local stand-in for the Gemini and OpenAI APIs, for offline load tests.
+
+Serves the endpoints used by the AI services with canned JSON analyses after a
+configurable log-normal latency, and fails a configurable share of requests.
+
+Usage:
+    python scripts/llm_stub_server.py --port 8090 --latency-median 1.5 --error-rate 0.02
+
+Then start the API with:
+    GEMINI_API_BASE_URL=http://localhost:8090
+    OPENAI_API_BASE_URL=http://localhost:8090/v1
+    GEMINI_API_KEY=stub OPENAI_API_KEY=stub
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CANNED_RESULTS: Dict[str, Dict[str, Any]] = {
+    "general": {
+        "key": "A Minor",
+        "tempo": 124,
+        "time_signature": "4/4",
+        "genre": "Electronic",
+        "sound_quality": "Clean mix with a slightly dominant low end.",
+        "suggestions": ["Tighten the kick and bass relationship", "Add contrast before the drop"],
+    },
+    "music_theory": {
+        "key": "A Minor",
+        "scale": ["A", "B", "C", "D", "E", "F", "G"],
+        "chord_progression": ["Am", "F", "C", "G"],
+        "harmonic_analysis": "An i-VI-III-VII loop with a stable tonal centre.",
+        "suggestions": ["Try a borrowed iv chord in the bridge"],
+    },
+    "production_feedback": {
+        "mix_balance": "Low end is about 2 dB hot relative to the mids.",
+        "eq_recommendations": ["Cut 250Hz on the pads", "Gentle high shelf on the vocal"],
+        "dynamics_suggestions": ["Parallel compression on drums"],
+        "spatial_recommendations": ["Shorter pre-delay on the main reverb"],
+    },
+    "arrangement_analysis": {
+        "structure": ["Intro", "Build", "Drop", "Break", "Drop", "Outro"],
+        "instrumentation": "Synth bass, pads, lead, programmed drums.",
+        "energy_flow": "Energy rises steadily into each drop.",
+        "suggestions": ["Shorten the second break"],
+    },
+}
+
+ERROR_STATUSES = [429, 500, 503]
+
+
+class StubConfig:
+    """Runtime behaviour of the stub, set from the command line."""
+
+    latency_median: float = 1.0
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    stream_chunks: int = 20
+    results: Dict[str, Dict[str, Any]] = CANNED_RESULTS
+
+
+config = StubConfig()
+app = FastAPI(title="LLM stub server")
+
+
+def _sample_latency() -> float:
+    """Draw a latency from a log-normal distribution around the configured median."""
+    if config.latency_median <= 0:
+        return 0.0
+    return random.lognormvariate(0, config.latency_sigma) * config.latency_median
+
+
+def _analysis_types(prompt: str) -> List[str]:
+    """Find the analysis type(s) a prompt asks for."""
+    match = re.search(r"Analysis types?: ([\w, ]+)", prompt)
+    if not match:
+        return ["general"]
+    return [t.strip() for t in match.group(1).split(",") if t.strip()]
+
+
+def _response_text(prompt: str) -> str:
+    """Build the canned JSON answer for a prompt."""
+    types = _analysis_types(prompt)
+    if "Analysis types:" in prompt:
+        body = {t: config.results.get(t, config.results["general"]) for t in types}
+    else:
+        body = config.results.get(types[0], config.results["general"])
+    return json.dumps(body)
+
+
+def _chunks(text: str) -> List[str]:
+    size = max(1, len(text) // max(1, config.stream_chunks))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+async def _maybe_fail() -> Optional[JSONResponse]:
+    """Sleep for the sampled latency and return an error response for a share of requests."""
+    if random.random() < config.error_rate:
+        # Failures usually come back faster than successful generations
+        await asyncio.sleep(_sample_latency() / 4)
+        status = random.choice(ERROR_STATUSES)
+        return JSONResponse({"error": {"code": status, "message": "Stub failure"}}, status_code=status)
+    return None
+
+
+@app.post("/v1beta/models/{model_action}")
+async def gemini_generate(model_action: str, request: Request):
+    """Gemini generateContent and streamGenerateContent (alt=sse)."""
+    body = await request.json()
+    prompt = "".join(part.get("text", "") for part in body["contents"][0]["parts"])
+
+    error = await _maybe_fail()
+    if error is not None:
+        return error
+
+    text = _response_text(prompt)
+    latency = _sample_latency()
+
+    if model_action.endswith(":streamGenerateContent"):
+        async def events():
+            chunks = _chunks(text)
+            for chunk in chunks:
+                await asyncio.sleep(latency / len(chunks))
+                payload = {"candidates": [{"content": {"parts": [{"text": chunk}], "role": "model"}}]}
+                yield f"data: {json.dumps(payload)}\r\n\r\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(latency)
+    return {
+        "candidates": [
+            {"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}
+        ]
+    }
+
+
+@app.post("/v1/chat/completions")
+async def openai_chat_completions(request: Request):
+    """OpenAI chat completions, with and without stream=true."""
+    body = await request.json()
+    prompt = "".join(m.get("content", "") for m in body.get("messages", []) if m.get("role") == "user")
+    model = body.get("model", "gpt-4")
+    completion_id = f"chatcmpl-stub-{random.getrandbits(32):08x}"
+    created = int(time.time())
+
+    error = await _maybe_fail()
+    if error is not None:
+        return error
+
+    text = _response_text(prompt)
+    latency = _sample_latency()
+
+    if body.get("stream"):
+        async def events():
+            chunks = _chunks(text)
+            for chunk in chunks:
+                await asyncio.sleep(latency / len(chunks))
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(latency)
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}
+        ],
+        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4,
+                  "total_tokens": (len(prompt) + len(text)) // 4},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini/OpenAI stub for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-median", type=float, default=1.0, help="Median response latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal sigma; larger means a longer tail")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 429/5xx")
+    parser.add_argument("--stream-chunks", type=int, default=20, help="Chunks per streamed response")
+    parser.add_argument("--responses", help="JSON file mapping analysis type to canned result")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    config.latency_median = args.latency_median
+    config.latency_sigma = args.latency_sigma
+    config.error_rate = args.error_rate
+    config.stream_chunks = args.stream_chunks
+    if args.responses:
+        with open(args.responses) as f:
+            config.results = {**CANNED_RESULTS, **json.load(f)}
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Load generator for the audio analysis API.
+
+Logs in, uploads an audio file a number of times (or reuses given file ids)
+and drives an analysis endpoint at a fixed concurrency, then reports
+throughput, latency percentiles and status codes.
+
+The analysis endpoints queue a job and answer 202; each request is then
+followed by polling GET /jobs/{id} until the job finishes, so the reported
+end-to-end latency covers queueing and analysis, and the response latency
+only the enqueue.
+
+Run the API against scripts/llm_stub_server.py to keep the test offline.
+Note that each file/type pair is stored after its first analysis, so later
+requests for the same pair measure the stored-result path; use --files to
+control how many distinct pairs exercise the AI path.
+
+Usage:
+    python scripts/load_test.py --email user@example.com --password secret \\
+        --upload sample.wav --files 20 --concurrency 32 --requests 500
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+ENDPOINTS = {
+    "general": "/audio/analyze/{file_id}",
+    "music_theory": "/audio/analyze/music-theory/{file_id}",
+    "production_feedback": "/audio/analyze/production/{file_id}",
+    "arrangement_analysis": "/audio/analyze/arrangement/{file_id}",
+    "full": "/audio/analyze/full/{file_id}",
+}
+
+FINAL_JOB_STATUSES = ("completed", "failed", "cancelled")
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of a list of values (p in 0-100)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post("/auth/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def upload_files(client: httpx.AsyncClient, path: str, count: int) -> List[int]:
+    file_ids = []
+    for _ in range(count):
+        with open(path, "rb") as f:
+            response = await client.post("/audio/upload", files={"file": (path.rsplit("/", 1)[-1], f)})
+        response.raise_for_status()
+        file_ids.append(int(response.json()["file_id"]))
+    return file_ids
+
+
+async def wait_for_job(client: httpx.AsyncClient, job_id: str, poll_interval: float) -> Dict[str, Any]:
+    """Poll a job until it reaches a final status."""
+    while True:
+        response = await client.get(f"/jobs/{job_id}")
+        response.raise_for_status()
+        job = response.json()
+        if job["status"] in FINAL_JOB_STATUSES:
+            return job
+        await asyncio.sleep(poll_interval)
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    file_ids: List[int],
+    analysis_types: List[str],
+    ai_service: Optional[str],
+    concurrency: int,
+    total_requests: int,
+    poll_interval: float = 0.5,
+) -> Dict[str, object]:
+    """Send total_requests analysis requests with at most concurrency in flight, each followed to completion."""
+    targets = itertools.cycle(itertools.product(file_ids, analysis_types))
+    latencies: List[float] = []
+    end_to_end: List[float] = []
+    statuses: Counter = Counter()
+    job_statuses: Counter = Counter()
+    remaining = total_requests
+    params = {"ai_service": ai_service} if ai_service else {}
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            file_id, analysis_type = next(targets)
+            url = ENDPOINTS[analysis_type].format(file_id=file_id)
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, params=params)
+                statuses[response.status_code] += 1
+                latencies.append(time.perf_counter() - start)
+                if response.status_code == 202:
+                    job = await wait_for_job(client, response.json()["job_id"], poll_interval)
+                    job_statuses[job["status"]] += 1
+                elif response.is_success:
+                    job_statuses["completed"] += 1
+                else:
+                    continue
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            end_to_end.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    return {
+        "elapsed": elapsed,
+        "latencies": latencies,
+        "end_to_end": end_to_end,
+        "statuses": statuses,
+        "job_statuses": job_statuses,
+    }
+
+
+def report(stats: Dict[str, object]) -> None:
+    elapsed = stats["elapsed"]
+    end_to_end = stats["end_to_end"]
+    print(f"Requests:   {len(stats['latencies'])} in {elapsed:.1f}s")
+    print(f"Throughput: {len(end_to_end) / elapsed:.1f} analyses/s")
+    for label, latencies in (("Response", stats["latencies"]), ("End-to-end", end_to_end)):
+        print(f"{label} latency:")
+        for p in (50, 95, 99):
+            print(f"  p{p}:      {percentile(latencies, p) * 1000:.0f} ms")
+        print(f"  max:      {max(latencies, default=0) * 1000:.0f} ms")
+    print("Statuses:   " + ", ".join(f"{k}={v}" for k, v in sorted(stats["statuses"].items(), key=str)))
+    print("Jobs:       " + ", ".join(f"{k}={v}" for k, v in sorted(stats["job_statuses"].items())))
+
+
+async def main(args: argparse.Namespace) -> None:
+    base_url = args.base_url.rstrip("/") + "/api/v1"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        token = await login(client, args.email, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        file_ids = args.file_ids or await upload_files(client, args.upload, args.files)
+        print(f"Using {len(file_ids)} files, types {', '.join(args.types)}, concurrency {args.concurrency}")
+
+        stats = await run_load(
+            client, file_ids, args.types, args.ai_service, args.concurrency, args.requests, args.poll_interval
+        )
+        report(stats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the audio analysis endpoints")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--upload", help="Audio file to upload --files times")
+    source.add_argument("--file-ids", type=int, nargs="+", help="Existing audio file ids to analyze")
+    parser.add_argument("--files", type=int, default=10, help="Number of uploads when using --upload")
+    parser.add_argument("--types", nargs="+", default=["general"], choices=sorted(ENDPOINTS))
+    parser.add_argument("--ai-service", choices=["gemini", "openai", "hedged"])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between job status polls")
+    asyncio.run(main(parser.parse_args()))
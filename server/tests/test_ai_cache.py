@@ -0,0 +1,166 @@
+import time
+
+import fakeredis
+import pytest
+import redis
+
+from app.core import redis_client
+from app.core.cache import InMemoryCacheBackend, create_cache_backend
+from app.services.ai_cache import ResponseCache, make_cache_key
+from app.services.ai_service import AIService, CachedAIService
+
+
+class FakeAIService(AIService):
+    """AI service that counts calls instead of contacting a provider"""
+
+    provider = "fake"
+    model_name = "fake-model"
+
+    def __init__(self, result=None):
+        self.calls = 0
+        self.result = result
+
+    def analyze_audio_content(self, audio_data, analysis_type):
+        self.calls += 1
+        if self.result is None:
+            return self._get_default_result(analysis_type)
+        return self.result
+
+    def _get_default_result(self, analysis_type):
+        return {"key": "C Major", "suggestions": []}
+
+
+@pytest.fixture
+def audio_features():
+    return {
+        "tempo": 120.00001,
+        "chroma_features": [0.1, 0.2, 0.3],
+        "file_info": {"file_path": "uploads/abc.wav"},
+    }
+
+
+def test_in_memory_backend_evicts_least_recently_used():
+    """Test that the in-memory backend keeps at most max_entries"""
+    backend = InMemoryCacheBackend(max_entries=2)
+    backend.set("a", "1", ttl=60)
+    backend.set("b", "2", ttl=60)
+    backend.get("a")
+    backend.set("c", "3", ttl=60)
+
+    assert backend.get("a") == "1"
+    assert backend.get("b") is None, "Least recently used entry was not evicted"
+    assert backend.get("c") == "3"
+
+
+def test_in_memory_backend_expires_entries():
+    """Test that entries are dropped once their TTL passes"""
+    backend = InMemoryCacheBackend(max_entries=10)
+    backend.set("a", "1", ttl=0)
+    time.sleep(0.01)
+
+    assert backend.get("a") is None
+
+
+def test_cache_moves_to_redis_once_reachable(monkeypatch):
+    """Test that Redis being down at startup does not disable it for the life of the process"""
+    server = fakeredis.FakeServer()
+    server.connected = False
+    monkeypatch.setattr(redis.Redis, "from_url", lambda *args, **kwargs: fakeredis.FakeRedis(
+        server=server, decode_responses=True
+    ))
+    monkeypatch.setattr(redis_client, "_client", None)
+    monkeypatch.setattr(redis_client, "_failures", 0)
+    monkeypatch.setattr(redis_client, "_retry_at", 0.0)
+
+    backend = create_cache_backend(namespace="test-cache", max_entries=10)
+    backend.set("a", "1", ttl=60)
+    assert backend.name == "memory"
+
+    server.connected = True
+    assert backend.name == "memory", "Reconnected before the retry delay"
+
+    monkeypatch.setattr(redis_client, "_retry_at", 0.0)
+    backend.set("b", "2", ttl=60)
+
+    assert backend.name == "redis"
+    assert redis_client.get_redis_client().get("test-cache:b") == "2"
+
+
+def test_cache_falls_back_to_memory_when_redis_goes_down(monkeypatch):
+    """Test that an outage after connecting moves the cache to memory instead of failing every lookup"""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, "from_url", lambda *args, **kwargs: fakeredis.FakeRedis(
+        server=server, decode_responses=True
+    ))
+    monkeypatch.setattr(redis_client, "_client", None)
+    monkeypatch.setattr(redis_client, "_failures", 0)
+    monkeypatch.setattr(redis_client, "_retry_at", 0.0)
+
+    cache = ResponseCache(create_cache_backend(namespace="test-cache", max_entries=10), ttl=60)
+    cache.set("a", {"key": "C Major"})
+    assert cache.backend.name == "redis"
+
+    server.connected = False
+    cache.set("b", {"key": "A Minor"})
+
+    assert cache.backend.name == "memory", "Redis was still used during the outage"
+    assert cache.get("b") == {"key": "A Minor"}
+    assert cache.stats()["errors"] == 0, "The outage surfaced as cache errors"
+
+
+def test_health_reports_ai_cache_stats(monkeypatch):
+    """Test that the AI cache counters are exposed on the health endpoint"""
+    from fastapi.testclient import TestClient
+
+    from app.core.config import settings
+    from app.main import app
+    from app.services import ai_cache
+
+    cache = ResponseCache(InMemoryCacheBackend(max_entries=10), ttl=60)
+    cache.set("a", {"key": "C Major"})
+    cache.get("a")
+    cache.get("b")
+    monkeypatch.setattr(settings, "AI_CACHE_ENABLED", True)
+    monkeypatch.setattr(ai_cache, "_response_cache", cache)
+
+    stats = TestClient(app).get("/health").json()["ai_cache"]
+
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+
+def test_cache_key_ignores_file_path_and_float_jitter(audio_features):
+    """Test that the same audio content uploaded twice maps to the same key"""
+    other = dict(audio_features, tempo=120.0, file_info={"file_path": "uploads/def.wav"})
+
+    key = make_cache_key("gemini", "gemini-pro", "1", "general", audio_features)
+
+    assert key == make_cache_key("gemini", "gemini-pro", "1", "general", other)
+    assert key != make_cache_key("gemini", "gemini-pro", "1", "music_theory", audio_features)
+    assert key != make_cache_key("gemini", "gemini-pro", "2", "general", audio_features)
+
+
+def test_cached_service_reuses_response(audio_features):
+    """Test that a repeated analysis is served from the cache"""
+    inner = FakeAIService(result={"key": "A Minor", "suggestions": ["More reverb"]})
+    cache = ResponseCache(InMemoryCacheBackend(), ttl=60)
+    service = CachedAIService(inner, cache)
+
+    first = service.analyze_audio_content(audio_features, "general")
+    second = service.analyze_audio_content(audio_features, "general")
+
+    assert first == second
+    assert inner.calls == 1, f"Expected 1 provider call, got {inner.calls}"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cached_service_skips_default_results(audio_features):
+    """Test that fallback results from failed calls are not cached"""
+    inner = FakeAIService()
+    service = CachedAIService(inner, ResponseCache(InMemoryCacheBackend(), ttl=60))
+
+    service.analyze_audio_content(audio_features, "general")
+    service.analyze_audio_content(audio_features, "general")
+
+    assert inner.calls == 2, f"Expected 2 provider calls, got {inner.calls}"
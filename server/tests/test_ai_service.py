@@ -0,0 +1,175 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.ai_service import AIService, AsyncGeminiService, HedgedAIService
+from app.services.provider_health import OPEN, ProviderHealth
+
+
+@pytest.fixture
+def gemini_service(monkeypatch):
+    """Create an async Gemini service that never reaches the network"""
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    service = AsyncGeminiService()
+    service.semaphore = asyncio.Semaphore(2)
+    return service
+
+
+def test_async_service_limits_concurrency(gemini_service):
+    """Test that no more than the semaphore size of calls are in flight"""
+    in_flight = 0
+    peak = 0
+
+    async def fake_generate(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return '{"key": "D Minor"}'
+
+    gemini_service._generate_async = fake_generate
+
+    async def run():
+        return await asyncio.gather(
+            *[gemini_service.analyze_audio_content({"tempo": 100.0}, "general") for _ in range(6)]
+        )
+
+    results = asyncio.run(run())
+
+    assert all(result["key"] == "D Minor" for result in results)
+    assert peak == 2, f"Expected at most 2 concurrent calls, got {peak}"
+
+
+def test_async_service_times_out_to_default_result(gemini_service):
+    """Test that a slow provider call falls back to the default result"""
+    async def slow_generate(prompt):
+        await asyncio.sleep(1)
+        return '{"key": "D Minor"}'
+
+    gemini_service._generate_async = slow_generate
+    gemini_service.timeout = 0.01
+
+    result = asyncio.run(gemini_service.analyze_audio_content({"tempo": 100.0}, "general"))
+
+    assert result == gemini_service._get_default_result("general")
+
+
+def test_combined_analysis_uses_one_request(gemini_service):
+    """Test that several analysis types are served by a single provider call"""
+    prompts = []
+
+    async def fake_generate(prompt):
+        prompts.append(prompt)
+        return '{"general": {"key": "D Minor"}, "music_theory": {"chord_progression": ["Dm", "G"]}}'
+
+    gemini_service._generate_async = fake_generate
+
+    results = asyncio.run(gemini_service.analyze_audio_content_multi(
+        {"tempo": 100.0}, ["general", "music_theory", "arrangement_analysis"]
+    ))
+
+    assert len(prompts) == 1, f"Expected one provider call, got {len(prompts)}"
+    assert results["general"]["key"] == "D Minor"
+    assert results["music_theory"]["chord_progression"] == ["Dm", "G"]
+    assert results["arrangement_analysis"] == gemini_service._get_default_result("arrangement_analysis"), \
+        "Types missing from the combined response should fall back to the default result"
+
+
+class FakeProvider(AIService):
+    """Async provider stub with a fixed latency and optional failure"""
+
+    def __init__(self, name, delay, fail=False):
+        self.provider = name
+        self.model_name = f"{name}-model"
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def analyze_audio_content(self, audio_data, analysis_type):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            return self._get_default_result(analysis_type)
+        return {"key": f"{self.provider} result"}
+
+    def _get_default_result(self, analysis_type):
+        return {"key": "C Major"}
+
+
+def test_hedged_service_takes_faster_provider(monkeypatch):
+    """Test that a slow primary is hedged and the faster provider's result is used"""
+    monkeypatch.setattr(settings, "AI_HEDGE_DEFAULT_DELAY", 0.02)
+    slow = FakeProvider("slow", delay=1.0)
+    fast = FakeProvider("fast", delay=0.01)
+    router = HedgedAIService({"slow": slow, "fast": fast}, primary="slow")
+
+    result = asyncio.run(router.analyze_audio_content({"tempo": 100.0}, "general"))
+
+    assert result["key"] == "fast result"
+    assert slow.calls == 1 and fast.calls == 1
+
+
+def test_hedged_service_fails_over_immediately(monkeypatch):
+    """Test that a failed primary triggers the next provider without waiting for the hedge delay"""
+    monkeypatch.setattr(settings, "AI_HEDGE_DEFAULT_DELAY", 10.0)
+    broken = FakeProvider("broken", delay=0.0, fail=True)
+    backup = FakeProvider("backup", delay=0.0)
+    router = HedgedAIService({"broken": broken, "backup": backup}, primary="broken")
+
+    result = asyncio.run(asyncio.wait_for(router.analyze_audio_content({}, "general"), 1.0))
+
+    assert result["key"] == "backup result"
+
+
+def test_circuit_breaker_opens_and_probes():
+    """Test that the breaker opens on errors and lets a single probe through after the cool-down"""
+    health = ProviderHealth("test", error_rate_threshold=0.5, min_requests=4, reset_seconds=0.0)
+    for _ in range(4):
+        health.record_failure()
+
+    assert health.state == OPEN
+
+    assert health.allow_request(), "Probe should be allowed after the cool-down"
+    assert not health.allow_request(), "Only one probe may be in flight"
+
+    health.record_success(0.1)
+
+    assert health.allow_request(), "Breaker should close after a successful probe"
+
+
+def test_stream_yields_tokens_then_parsed_result(gemini_service):
+    """Test that streamed text is relayed as tokens and parsed once complete"""
+    async def fake_stream(prompt):
+        for chunk in ['{"key": ', '"D Minor", ', '"tempo": 96}']:
+            yield chunk
+
+    gemini_service._stream_async = fake_stream
+
+    async def collect():
+        return [event async for event in gemini_service.stream_audio_content({"tempo": 96.0}, "general")]
+
+    events = asyncio.run(collect())
+
+    assert [e["text"] for e in events if e["event"] == "token"] == ['{"key": ', '"D Minor", ', '"tempo": 96}']
+    assert events[-1] == {"event": "result", "result": {"key": "D Minor", "tempo": 96}}
+
+
+def test_services_of_a_provider_share_one_concurrency_limit(monkeypatch):
+    """Test that the hedged and single-provider services draw from the same per-provider limit"""
+    from app.services import ai_service
+
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "AI_CACHE_ENABLED", False)
+    monkeypatch.setattr(ai_service, "_async_services", {})
+    monkeypatch.setattr(ai_service, "_semaphores", {})
+
+    hedged = ai_service.get_async_ai_service("hedged")
+    gemini = ai_service.get_async_ai_service("gemini")
+    openai = ai_service.get_async_ai_service("openai")
+
+    assert hedged.services["gemini"].semaphore is gemini.semaphore, "Each Gemini service has its own limit"
+    assert hedged.services["openai"].semaphore is openai.semaphore, "Each OpenAI service has its own limit"
+    assert gemini.semaphore is not openai.semaphore
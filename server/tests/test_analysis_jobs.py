@@ -0,0 +1,268 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from celery.backends.cache import CacheBackend
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401 - registers all tables
+from app.api.endpoints import audio as audio_endpoints
+from app.celery_app import celery_app
+from app.db.base import Base
+from app.crud.audio import analysis_result, audio_file
+from app.crud.job import job
+from app.models.audio import AudioFile
+from app.schemas.audio import AnalysisResultCreate
+from app.schemas.job import JobCreate
+from app.services import cancellation
+from app.services.fair_scheduler import scheduler
+from app.tasks import audio_analysis, batch, tracking
+
+
+@pytest.fixture(autouse=True)
+def memory_result_backend(monkeypatch):
+    """Keep task progress updates off Redis"""
+    monkeypatch.setattr(celery_app, "_backend_cache", CacheBackend(app=celery_app, backend="memory"))
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    """Point the analysis task at an in-memory database"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(audio_analysis, "SessionLocal", factory)
+    monkeypatch.setattr(tracking, "SessionLocal", factory)
+    monkeypatch.setattr(cancellation, "SessionLocal", factory)
+    return factory
+
+
+def run_task(job_id, **kwargs):
+    """Run analyze_audio as a worker would, with the job id as task id"""
+    return audio_analysis.analyze_audio.apply(kwargs=kwargs, task_id=job_id).get()
+
+
+def test_worker_stores_result_and_completes_job(session_factory, monkeypatch):
+    """Test that a tracked analysis stores its result and marks the job completed"""
+    calls = []
+
+    def fake_run_analysis(file_path, analysis_type, ai_service, on_progress):
+        calls.append(analysis_type)
+        on_progress(0.5, "analyzing")
+        return {"key": "D Minor", "tempo": 96.0}
+
+    monkeypatch.setattr(audio_analysis, "_run_analysis", fake_run_analysis)
+
+    db = session_factory()
+    job.create(db, obj_in=JobCreate(id="job-1", job_type="analysis", audio_file_id=7, analysis_type="general"))
+
+    result = run_task("job-1", file_path="song.wav", analysis_type="general", audio_file_id=7)
+
+    db.expire_all()
+    db_job = job.get(db, id="job-1")
+    assert result["key"] == "D Minor"
+    assert db_job.status == "completed" and db_job.progress == 1.0
+    assert db_job.result == result
+    assert analysis_result.get_by_type(db, audio_file_id=7, analysis_type="general").result == result
+
+    # A duplicate job for the same file and type reuses the stored result
+    job.create(db, obj_in=JobCreate(id="job-2", job_type="analysis", audio_file_id=7, analysis_type="general"))
+    run_task("job-2", file_path="song.wav", analysis_type="general", audio_file_id=7)
+
+    assert calls == ["general"], "The stored result should have been reused"
+    db.close()
+
+
+def test_worker_marks_failed_analysis(session_factory, monkeypatch):
+    """Test that an analysis error is recorded on the job"""
+    monkeypatch.setattr(
+        audio_analysis, "_run_analysis", lambda *args: dict(audio_analysis.FILE_NOT_FOUND_RESULT)
+    )
+
+    db = session_factory()
+    job.create(db, obj_in=JobCreate(id="job-3", job_type="analysis", audio_file_id=8, analysis_type="general"))
+
+    run_task("job-3", file_path="missing.wav", analysis_type="general", audio_file_id=8)
+
+    db.expire_all()
+    db_job = job.get(db, id="job-3")
+    assert db_job.status == "failed"
+    assert db_job.error == "File not found"
+    assert analysis_result.get_by_type(db, audio_file_id=8, analysis_type="general") is None
+    db.close()
+
+
+def test_wait_stats_per_lane(session_factory):
+    """Test that queue wait times are reported per priority lane and user"""
+    db = session_factory()
+    now = datetime.now(timezone.utc)
+    for job_id, priority, wait in [("i-1", "interactive", 2), ("i-2", "interactive", 4), ("b-1", "batch", 60)]:
+        job.create(db, obj_in=JobCreate(id=job_id, job_type="analysis", user_id=1, priority=priority))
+        job.update(db, db_obj=job.get(db, id=job_id), obj_in={
+            "created_at": now - timedelta(seconds=wait), "started_at": now, "status": "completed"
+        })
+    job.create(db, obj_in=JobCreate(id="b-2", job_type="analysis", user_id=1, priority="batch"))
+    job.create(db, obj_in=JobCreate(id="other", job_type="analysis", user_id=2, priority="batch"))
+
+    stats = job.get_wait_stats(db, user_id=1)
+
+    assert stats["interactive"]["started"] == 2
+    assert stats["interactive"]["avg_wait_seconds"] == pytest.approx(3, abs=0.5)
+    assert stats["batch"]["p95_wait_seconds"] == pytest.approx(60, abs=0.5)
+    assert stats["batch"]["pending"] == 1, "Other users' jobs were counted"
+    db.close()
+
+
+def test_cancelled_job_is_not_run(session_factory, monkeypatch):
+    """Test that a job cancelled while queued is skipped and stays cancelled"""
+    calls = []
+    monkeypatch.setattr(audio_analysis, "_run_analysis", lambda *args: calls.append(args) or {})
+
+    db = session_factory()
+    job.create(db, obj_in=JobCreate(id="job-4", job_type="analysis", audio_file_id=9, analysis_type="general"))
+    job.update_status(db, id="job-4", status="cancelled")
+
+    run_task("job-4", file_path="song.wav", analysis_type="general", audio_file_id=9)
+    job.update_status(db, id="job-4", status="running")
+
+    db.expire_all()
+    assert calls == [], "A cancelled job was analyzed"
+    assert job.get(db, id="job-4").status == "cancelled"
+    assert analysis_result.get_by_type(db, audio_file_id=9, analysis_type="general") is None
+    db.close()
+
+
+def test_batch_completes_when_every_analysis_finishes(session_factory, monkeypatch):
+    """Test that a batch queues one analysis per item at once and finishes after the last one"""
+    submitted = []
+    monkeypatch.setattr(scheduler, "submit_many", lambda jobs, user_id, **kwargs: submitted.append(jobs))
+    monkeypatch.setattr(audio_analysis, "_run_analysis", lambda *args: {"tempo": 120.0})
+
+    db = session_factory()
+    files = [AudioFile(filename=f"{i}.wav", file_path=f"{i}.wav", file_size=1, user_id=1) for i in range(3)]
+    db.add_all(files)
+    db.commit()
+
+    db_batch = batch.start_batch_analysis(db, [(f, "general") for f in files], user_id=1)
+
+    assert len(submitted) == 1 and len(submitted[0]) == 3, "Analyses were not queued in one call"
+    assert [stage.audio_file_id for stage in db_batch.stages] == [f.id for f in files]
+
+    for signature, job_id in submitted[0]:
+        run_task(job_id, **signature.kwargs)
+        db.expire_all()
+        assert (job.get(db, id=db_batch.id).status == "completed") == (job_id == submitted[0][-1][1])
+
+    assert job.get(db, id=db_batch.id).progress == 1.0
+    db.close()
+
+
+def test_files_with_stored_analysis_types(session_factory):
+    """Test that files are loaded with the requested analysis types they already have"""
+    db = session_factory()
+    files = [AudioFile(filename=f"{i}.wav", file_path=f"{i}.wav", file_size=1, user_id=1) for i in range(2)]
+    db.add_all(files)
+    db.commit()
+    analysis_result.create(db, obj_in=AnalysisResultCreate(
+        audio_file_id=files[0].id, analysis_type="general", result={}
+    ))
+    analysis_result.create(db, obj_in=AnalysisResultCreate(
+        audio_file_id=files[0].id, analysis_type="production", result={}
+    ))
+
+    loaded = audio_file.get_with_analysis_types(
+        db, ids=[files[0].id, files[1].id, 999], analysis_types=["general", "music_theory"]
+    )
+
+    assert set(loaded) == {files[0].id, files[1].id}, "A missing file was returned"
+    assert loaded[files[0].id][1] == {"general"}
+    assert loaded[files[1].id][1] == set()
+    db.close()
+
+
+def test_concurrent_requests_share_one_active_job(session_factory, monkeypatch):
+    """Test that a request losing the race to queue an analysis returns the winner's job"""
+    submitted = []
+    monkeypatch.setattr(scheduler, "submit", lambda signature, job_id, *args, **kwargs: submitted.append(job_id))
+
+    db = session_factory()
+    db_file = AudioFile(filename="a.wav", file_path="a.wav", file_size=1, user_id=1)
+    db.add(db_file)
+    db.commit()
+    job.create(db, obj_in=JobCreate(
+        id="winner", job_type="analysis", audio_file_id=db_file.id, analysis_type="general"
+    ))
+
+    # The losing request checked for an active job before the winner created it
+    get_active = job.get_active
+    checks = []
+
+    def stale_get_active(*args, **kwargs):
+        checks.append(kwargs)
+        return None if len(checks) == 1 else get_active(*args, **kwargs)
+
+    monkeypatch.setattr(job, "get_active", stale_get_active)
+
+    result = audio_endpoints._enqueue_analysis(db, db_file, "general", None, 1, Response())
+
+    assert result.job_id == "winner"
+    assert submitted == [], "A duplicate job was queued"
+    job.update_status(db, id="winner", status="completed")
+    job.create(db, obj_in=JobCreate(
+        id="next", job_type="analysis", audio_file_id=db_file.id, analysis_type="general"
+    ))
+    db.close()
+
+
+def test_job_of_deleted_file_is_cancelled(session_factory, monkeypatch):
+    """Test that work stops once its job row was deleted with the audio file"""
+    monkeypatch.setattr(cancellation, "get_redis_client", lambda: None)
+    db = session_factory()
+    db_file = AudioFile(filename="a.wav", file_path="a.wav", file_size=1, user_id=1)
+    db.add(db_file)
+    db.commit()
+    job.create(db, obj_in=JobCreate(id="job-5", job_type="separation", audio_file_id=db_file.id))
+
+    assert not cancellation.is_cancelled("job-5")
+
+    audio_file.remove(db, id=db_file.id)
+
+    assert cancellation.is_cancelled("job-5"), "Work of a deleted file keeps running"
+    db.close()
+
+
+def test_batch_finishes_when_its_last_analysis_is_cancelled_or_crashes(session_factory, monkeypatch):
+    """Test that a cancelled or crashed analysis still counts towards finishing its batch"""
+    submitted = []
+    monkeypatch.setattr(scheduler, "submit_many", lambda jobs, user_id, **kwargs: submitted.append(jobs))
+    monkeypatch.setattr(celery_app.control, "revoke", lambda *args, **kwargs: None)
+    monkeypatch.setattr(audio_analysis, "_run_analysis", lambda *args: {"tempo": 120.0})
+
+    db = session_factory()
+    files = [AudioFile(filename=f"{i}.wav", file_path=f"{i}.wav", file_size=1, user_id=1) for i in range(3)]
+    db.add_all(files)
+    db.commit()
+    db_batch = batch.start_batch_analysis(db, [(f, "general") for f in files], user_id=1)
+    (first, first_id), (second, second_id), (_, last_id) = submitted[0]
+
+    run_task(first_id, **first.kwargs)
+
+    def crash(*args):
+        raise MemoryError("out of memory")
+
+    monkeypatch.setattr(audio_analysis, "_run_analysis", crash)
+    with pytest.raises(MemoryError):
+        run_task(second_id, **second.kwargs)
+    db.expire_all()
+    assert job.get(db, id=second_id).status == "failed", "A crashed analysis was left running"
+    assert job.get(db, id=db_batch.id).status == "running"
+
+    tracking.cancel_job(db, job.get(db, id=last_id))
+
+    db.expire_all()
+    db_batch = job.get(db, id=db_batch.id)
+    assert db_batch.status == "failed", "Cancelling the last analysis did not finish the batch"
+    assert db_batch.error == "1 of 3 stages failed"
+    db.close()
@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (registers every table)
+from app.crud.audio import analysis_result
+from app.db.base import Base
+from app.models.audio import AnalysisResult, AudioFile
+from app.schemas.audio import AnalysisResultCreate
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    session.add(AudioFile(id=1, filename="song.wav", file_path="uploads/song.wav", file_size=100))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _result(analysis_type: str, key: str) -> AnalysisResultCreate:
+    return AnalysisResultCreate(
+        audio_file_id=1, analysis_type=analysis_type, result={"key": key}, confidence=0.9, processing_time=1.0
+    )
+
+
+def test_upsert_replaces_result_of_same_type(db):
+    """Test that storing a result twice keeps one row with the latest result"""
+    first = analysis_result.upsert(db, obj_in=_result("general", "C Major"))
+    second = analysis_result.upsert(db, obj_in=_result("general", "A Minor"))
+    analysis_result.upsert(db, obj_in=_result("music_theory", "C Major"))
+
+    assert second.id == first.id, "Upsert inserted a second row"
+    assert db.query(AnalysisResult).count() == 2
+    stored = analysis_result.get_by_type(db, audio_file_id=1, analysis_type="general")
+    assert stored.result == {"key": "A Minor"}
+
+
+def test_upsert_async_replaces_result(tmp_path):
+    """Test that the async upsert also keeps a single row per file and type"""
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            session.add(AudioFile(id=1, filename="song.wav", file_path="uploads/song.wav", file_size=100))
+            await session.commit()
+            await analysis_result.upsert_async(session, obj_in=_result("general", "C Major"))
+            stored = await analysis_result.upsert_async(session, obj_in=_result("general", "A Minor"))
+            rows = await analysis_result.get_by_audio_file_async(session, audio_file_id=1)
+        await engine.dispose()
+        return stored, rows
+
+    stored, rows = asyncio.run(run())
+    assert stored.result == {"key": "A Minor"}
+    assert len(rows) == 1, "Async upsert inserted a second row"
+
+
+def test_failed_combined_analysis_is_not_stored(tmp_path, monkeypatch):
+    """Test that an error result fails the request and leaves the analysis to be retried"""
+    pytest.importorskip("aiosqlite")
+    from fastapi import HTTPException
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.api.endpoints import audio as audio_endpoints
+
+    outcomes = [
+        {"general": {"key": "C Major", "tempo": 120, "error": "Provider unavailable"}},
+        {"general": {"key": "A Minor", "tempo": 96}},
+    ]
+
+    async def fake_analyze(file_path, analysis_types, ai_service=None):
+        return outcomes.pop(0)
+
+    monkeypatch.setattr(audio_endpoints, "analyze_audio_multi_async", fake_analyze)
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(audio_endpoints, "get_async_session_factory", lambda: factory)
+
+        async with factory() as session:
+            db_file = AudioFile(id=1, filename="song.wav", file_path="uploads/song.wav", file_size=100)
+            session.add(db_file)
+            await session.commit()
+
+            with pytest.raises(HTTPException) as failure:
+                await audio_endpoints._get_or_run_analyses(session, db_file, ["general"], None)
+            stored_after_failure = await analysis_result.get_by_audio_file_async(session, audio_file_id=1)
+
+            results = await audio_endpoints._get_or_run_analyses(session, db_file, ["general"], None)
+        await engine.dispose()
+        return failure.value, stored_after_failure, results
+
+    failure, stored_after_failure, results = asyncio.run(run())
+    assert failure.status_code == 502
+    assert stored_after_failure == [], "The error result was stored as the analysis"
+    assert results == {"general": {"key": "A Minor", "tempo": 96}}, "The analysis was not retried"
+
+
+def test_failed_streamed_analysis_ends_with_error_and_is_not_stored(tmp_path, monkeypatch):
+    """Test that a streamed error result is sent as an error event and not stored"""
+    pytest.importorskip("aiosqlite")
+    from types import SimpleNamespace
+
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.api.endpoints import audio as audio_endpoints
+
+    async def fake_stream(file_path, analysis_type, ai_service=None):
+        yield {"event": "status", "stage": "extracting_features"}
+        yield {"event": "result", "result": {"key": "C Major", "tempo": 120, "error": "Provider unavailable"}}
+
+    monkeypatch.setattr(audio_endpoints, "stream_audio_analysis", fake_stream)
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(audio_endpoints, "get_async_session_factory", lambda: factory)
+
+        async with factory() as session:
+            session.add(AudioFile(id=1, filename="song.wav", file_path="uploads/song.wav", file_size=100, user_id=1))
+            await session.commit()
+
+            response = await audio_endpoints.stream_analysis(
+                file_id=1, analysis_type="general", ai_service=None, db=session,
+                current_user=SimpleNamespace(id=1, is_superuser=False),
+            )
+            body = "".join([chunk async for chunk in response.body_iterator])
+            stored = await analysis_result.get_by_audio_file_async(session, audio_file_id=1)
+        await engine.dispose()
+        return body, stored
+
+    body, stored = asyncio.run(run())
+    assert "event: error" in body and "Provider unavailable" in body
+    assert "event: result" not in body, "The error result was sent as the analysis"
+    assert stored == [], "The error result was stored as the analysis"
@@ -0,0 +1,128 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import base as db_base
+from app.db.base import Base
+from app.crud.upload import upload_session
+import app.models  # noqa: F401  (registers every table)
+from app.models.user import User
+from app.models.upload import UploadSession
+
+
+def test_async_database_url_uses_async_driver(monkeypatch):
+    """Test that the async engine swaps DATABASE_URL's driver for asyncpg"""
+    monkeypatch.setenv("DATABASE_URL", "postgresql+psycopg2://user:secret@db:5432/app")
+
+    url = db_base.get_async_database_url()
+
+    assert url.drivername == "postgresql+asyncpg"
+    assert (url.host, url.database, url.password) == ("db", "app", "secret")
+
+
+def test_engine_options_apply_pool_and_statement_timeout():
+    """Test that pool settings and the statement timeout reach both drivers"""
+    sync_options = db_base._engine_options(make_url("postgresql+psycopg2://u@db/app"), async_driver=False)
+    async_options = db_base._engine_options(make_url("postgresql+asyncpg://u@db/app"), async_driver=True)
+
+    for options in (sync_options, async_options):
+        assert options["pool_size"] == db_base.settings.DB_POOL_SIZE
+        assert options["pool_pre_ping"] == db_base.settings.DB_POOL_PRE_PING
+    timeout = str(db_base.settings.DB_STATEMENT_TIMEOUT_MS)
+    assert sync_options["connect_args"] == {"options": f"-c statement_timeout={timeout}"}
+    assert async_options["connect_args"] == {"server_settings": {"statement_timeout": timeout}}
+    assert db_base._engine_options(make_url("sqlite://"), async_driver=True) == {}, "sqlite has no pool to size"
+
+
+def test_async_crud_round_trip(tmp_path):
+    """Test the async CRUD helpers against a real AsyncSession"""
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        async with factory() as db:
+            user = User(email="a@example.com", username="a", hashed_password="x")
+            db.add(user)
+            await db.commit()
+
+            db.add(UploadSession(
+                id="u1", user_id=user.id, filename="song.wav", file_path="/tmp/u1.wav", total_size=100,
+                expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+            ))
+            await db.commit()
+
+            await upload_session.record_range_async(db, id="u1", start=50, end=100)
+            recorded = await upload_session.record_range_async(db, id="u1", start=0, end=50)
+            assert recorded.received == [[0, 100]]
+            assert recorded.offset == 100, "Offset did not advance once the gap was filled"
+
+            await upload_session.update_async(db=db, db_obj=recorded, obj_in={"status": "completed"})
+            assert (await upload_session.get_async(db=db, id="u1")).status == "completed"
+
+            await upload_session.remove_async(db=db, id="u1")
+            assert await upload_session.get_async(db=db, id="u1") is None
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_upload_chunk_and_completion_transactions(tmp_path, monkeypatch):
+    """Test that no transaction is held while a chunk streams and completion commits once"""
+    from starlette.requests import Request
+
+    from app.api.endpoints import uploads
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        file_path = str(tmp_path / "u1.wav")
+        with open(f"{file_path}.part", "wb") as f:
+            f.truncate(4)
+
+        async with factory() as db:
+            user = User(email="a@example.com", username="a", hashed_password="x")
+            db.add(user)
+            await db.commit()
+            db.add(UploadSession(
+                id="u1", user_id=user.id, filename="song.wav", file_path=file_path, total_size=4,
+                expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+            ))
+            await db.commit()
+
+            write_stream_at = uploads.upload_store.write_stream_at
+
+            async def checked_write(*args, **kwargs):
+                assert not db.in_transaction(), "A transaction was held open while the chunk streamed"
+                return await write_stream_at(*args, **kwargs)
+
+            monkeypatch.setattr(uploads.upload_store, "write_stream_at", checked_write)
+
+            async def receive():
+                return {"type": "http.request", "body": b"abcd", "more_body": False}
+
+            request = Request({"type": "http", "method": "PATCH", "headers": []}, receive)
+            response = await uploads.upload_chunk("u1", request, upload_offset=0, db=db, current_user=user)
+            assert response.headers["Upload-Offset"] == "4"
+
+            first = await uploads.complete_upload("u1", db=db, current_user=user)
+            again = await uploads.complete_upload("u1", db=db, current_user=user)
+            assert again.file_id == first.file_id, "Completing twice created a second audio file"
+
+        async with factory() as db:
+            completed = await upload_session.get_async(db=db, id="u1")
+            assert completed.status == "completed"
+            assert str(completed.audio_file_id) == first.file_id
+        await engine.dispose()
+
+    asyncio.run(run())
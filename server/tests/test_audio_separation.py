@@ -66,3 +66,22 @@ def test_separate_stems(sample_audio_file):
     finally:
         if output_dir.exists():
             shutil.rmtree(output_dir.parent)
+
+
+def test_separation_failure_leaves_no_stems(sample_audio_file, monkeypatch):
+    """Test that a failed separation raises instead of writing the mix as stems"""
+    from app.services import audio_separation
+
+    def fail(name):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(audio_separation, "get_model", fail)
+    output_dir = Path(tempfile.mkdtemp()) / str(uuid.uuid4())
+
+    try:
+        with pytest.raises(RuntimeError):
+            separate_stems(sample_audio_file, output_dir, dummy_stems_on_error=False)
+
+        assert list(output_dir.iterdir()) == [], "Stems were written for a failed separation"
+    finally:
+        shutil.rmtree(output_dir.parent)
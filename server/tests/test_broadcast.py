@@ -0,0 +1,64 @@
+import asyncio
+
+from app.services.broadcast import BroadcastGroup
+
+
+def test_listeners_share_one_computation_and_replay_events():
+    """Test that a late listener gets every event and the computation runs once"""
+    group = BroadcastGroup()
+    runs = 0
+
+    async def produce(broadcast):
+        nonlocal runs
+        runs += 1
+        for token in ["a", "b", "c"]:
+            await broadcast.publish({"event": "token", "text": token})
+            await asyncio.sleep(0.01)
+
+    async def collect(events):
+        return [event["text"] async for event in events]
+
+    async def run():
+        first = asyncio.ensure_future(collect(group.subscribe("1:general", produce)))
+        await asyncio.sleep(0.015)
+        second = collect(group.subscribe("1:general", produce))
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(run()) == [["a", "b", "c"], ["a", "b", "c"]]
+    assert runs == 1, "Each listener started its own computation"
+
+
+def test_computation_outlives_its_listeners():
+    """Test that the computation finishes after every listener has gone away"""
+    group = BroadcastGroup()
+
+    async def run():
+        done = asyncio.Event()
+
+        async def produce(broadcast):
+            await broadcast.publish({"event": "status"})
+            await asyncio.sleep(0.02)
+            done.set()
+
+        events = group.subscribe("1:general", produce)
+        await events.__anext__()
+        await events.aclose()
+
+        await asyncio.wait_for(done.wait(), timeout=1)
+        await asyncio.sleep(0)
+        return group._broadcasts
+
+    assert asyncio.run(run()) == {}, "A finished broadcast was kept"
+
+
+def test_errors_are_published():
+    """Test that a failed computation ends its listeners' streams with an error event"""
+    group = BroadcastGroup()
+
+    async def produce(broadcast):
+        raise RuntimeError("provider down")
+
+    async def run():
+        return [event async for event in group.subscribe("1:general", produce)]
+
+    assert asyncio.run(run()) == [{"event": "error", "detail": "provider down"}]
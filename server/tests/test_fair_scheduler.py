@@ -0,0 +1,104 @@
+import threading
+
+import fakeredis
+import pytest
+
+from app.celery_app import celery_app
+from app.core.config import settings
+from app.services import fair_scheduler
+from app.services.fair_scheduler import FairScheduler, CLASS_ANALYSIS
+
+
+class FakeCelery:
+    """Records the jobs sent to the broker instead of sending them"""
+
+    def __init__(self, client):
+        self.client = client
+        self.sent = []
+        self.max_inflight = 0
+        self._lock = threading.Lock()
+
+    def signature(self, task):
+        fake = self
+
+        class Sent:
+            def apply_async(self):
+                with fake._lock:
+                    fake.sent.append(task["options"]["task_id"])
+                    fake.max_inflight = max(fake.max_inflight, fake.client.zcard("sched:analysis:inflight"))
+
+        return Sent()
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    """Run the scheduler against an in-memory Redis with 3 analysis slots, 1 of them reserved"""
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(fair_scheduler, "get_redis_client", lambda: client)
+    monkeypatch.setattr(fair_scheduler, "is_cancelled", lambda job_id: False)
+    monkeypatch.setattr(settings, "SCHEDULER_ENABLED", True)
+    monkeypatch.setattr(settings, "SCHEDULER_CAPACITY", {"analysis": 3, "pipeline": 1})
+    monkeypatch.setattr(settings, "SCHEDULER_INTERACTIVE_RESERVE", 1)
+    return client
+
+
+@pytest.fixture
+def broker(redis_client, monkeypatch):
+    fake = FakeCelery(redis_client)
+    monkeypatch.setattr(fair_scheduler, "celery_app", fake)
+    return fake
+
+
+def jobs(prefix, count):
+    return [(celery_app.signature("noop").set(task_id=f"{prefix}-{i}"), f"{prefix}-{i}") for i in range(count)]
+
+
+def test_batch_users_share_slots_fairly(broker):
+    """Test that a user with a large batch does not starve a user who submits later"""
+    scheduler = FairScheduler()
+    scheduler.submit_many(jobs("a", 20), user_id=1, lane="batch")
+    scheduler.submit_many(jobs("b", 5), user_id=2, lane="batch")
+
+    assert broker.sent == ["a-0", "a-1"], "Batch jobs used the interactive reserve"
+
+    while len(broker.sent) < 25:
+        scheduler.release(broker.sent[len(broker.sent) - 2])
+
+    order = [job_id[0] for job_id in broker.sent]
+    assert order[2:12] == ["a", "b"] * 5, f"Flows were not interleaved: {order}"
+    assert broker.max_inflight <= 2
+
+
+def test_interactive_reserve(broker):
+    """Test that an interactive job starts while batch work fills its share of the capacity"""
+    scheduler = FairScheduler()
+    scheduler.submit_many(jobs("batch", 10), user_id=1, lane="batch")
+    scheduler.submit_many(jobs("interactive", 2), user_id=2, lane="interactive")
+
+    assert broker.sent == ["batch-0", "batch-1", "interactive-0"]
+
+    scheduler.release("batch-0")
+
+    assert broker.sent[-1] == "interactive-1", "Batch work took a slot ahead of a waiting interactive job"
+
+
+def test_concurrent_dispatch_respects_capacity(redis_client, broker):
+    """Test that dispatchers racing in several threads never exceed the capacity"""
+    scheduler = FairScheduler()
+    for user_id in range(4):
+        scheduler.submit_many(jobs(f"u{user_id}", 10), user_id=user_id, lane="interactive")
+
+    def dispatch_and_release():
+        for _ in range(20):
+            scheduler.dispatch(CLASS_ANALYSIS)
+            inflight = redis_client.zrange("sched:analysis:inflight", 0, 0)
+            if inflight:
+                scheduler.release(inflight[0])
+
+    threads = [threading.Thread(target=dispatch_and_release) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert broker.max_inflight <= 3, f"{broker.max_inflight} jobs were in flight at once"
@@ -0,0 +1,47 @@
+import pytest
+
+from app.services.file_streaming import parse_range
+
+
+def test_parse_range_forms():
+    """Test that single byte ranges are parsed into inclusive bounds"""
+    assert parse_range(None, 1000) is None
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=990-2000", 1000) == (990, 999), "The end was not clamped to the file size"
+    assert parse_range("bytes=0-1,5-9", 1000) is None, "Multiple ranges should fall back to the whole file"
+
+
+def test_parse_range_rejects_unsatisfiable_ranges():
+    """Test that ranges starting past the end of the file are rejected"""
+    with pytest.raises(ValueError):
+        parse_range("bytes=1000-", 1000)
+    with pytest.raises(ValueError):
+        parse_range("bytes=50-10", 1000)
+
+
+def test_parse_range_rejects_any_range_of_an_empty_file():
+    """Test that an empty file answers every range, including suffix ranges, with 416"""
+    assert parse_range(None, 0) is None
+    for header in ["bytes=-100", "bytes=0-", "bytes=0-10"]:
+        with pytest.raises(ValueError):
+            parse_range(header, 0)
+
+
+def test_files_revalidate_unless_marked_immutable(tmp_path):
+    """Test that only files marked immutable are cached without revalidation"""
+    from starlette.requests import Request
+
+    from app.services.file_streaming import ranged_file_response
+
+    path = tmp_path / "vocals.wav"
+    path.write_bytes(b"RIFF")
+    request = Request({"type": "http", "method": "GET", "headers": []})
+
+    artifact = ranged_file_response(request, str(path))
+    original = ranged_file_response(request, str(path), immutable=True)
+
+    assert artifact.headers["Cache-Control"] == "private, no-cache", "Rewritable files were cached as immutable"
+    assert "immutable" in original.headers["Cache-Control"]
+    assert artifact.headers["ETag"] == original.headers["ETag"]
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (registers every table)
+from app.api.pagination import decode_cursor, encode_cursor, parse_fields
+from app.crud.audio import audio_file
+from app.db.base import Base
+from app.models.audio import AudioFile
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    # Pairs of files share a creation time, so ties are broken by id
+    for i in range(10):
+        session.add(AudioFile(
+            filename=f"song{i}.wav", file_path=f"uploads/{i}.wav", file_size=i, user_id=1,
+            created_at=START + timedelta(minutes=i // 2),
+        ))
+    session.add(AudioFile(filename="other.wav", file_path="uploads/o.wav", file_size=0, user_id=2, created_at=START))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_keyset_pages_cover_every_file_once(db):
+    """Test that following cursors returns each of the user's files exactly once, newest first"""
+    seen = []
+    after = None
+    while True:
+        page = audio_file.get_page_by_user(db, user_id=1, after=after, limit=3)
+        seen.extend(f.filename for f in page)
+        if len(page) < 3:
+            break
+        after = decode_cursor(encode_cursor(page[-1].created_at, page[-1].id))
+
+    assert seen == [f"song{i}.wav" for i in reversed(range(10))]
+
+
+def test_projection_skips_unrequested_columns(db):
+    """Test that fields= columns are the only ones read, apart from the cursor keys"""
+    page = audio_file.get_page_by_user(db, user_id=1, limit=2, columns=["filename"])
+
+    unloaded = inspect(page[0]).unloaded
+    assert "file_path" in unloaded and "filename" not in unloaded
+    assert "created_at" not in unloaded, "Cursor keys must always be loaded"
+
+
+def test_invalid_fields_and_cursors_are_rejected():
+    """Test that unknown fields and malformed cursors are client errors"""
+    assert parse_fields("filename, id", ["id", "filename", "file_size"]) == ["id", "filename"]
+    assert parse_fields(None, ["id"]) is None
+
+    with pytest.raises(HTTPException) as exc:
+        parse_fields("id,password", ["id", "filename"])
+    assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not a cursor")
+    assert exc.value.status_code == 400
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+import pytest
+from passlib.context import CryptContext
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (registers every table)
+from app.core import security
+from app.crud.user import user
+from app.db.base import Base
+from app.schemas.user import UserCreate
+
+
+@pytest.fixture
+def low_cost(monkeypatch):
+    """Use the minimum bcrypt cost so the tests stay fast"""
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4)
+    monkeypatch.setattr(security, "pwd_context", context)
+    return context
+
+
+def test_hashing_runs_in_password_pool(low_cost, monkeypatch):
+    """Test that async hashing and verification run on the password pool, not the event loop"""
+    threads = []
+    hash_password = low_cost.hash
+
+    def record_thread(password):
+        threads.append(threading.current_thread().name)
+        return hash_password(password)
+
+    monkeypatch.setattr(low_cost, "hash", record_thread)
+
+    async def run():
+        hashed = await security.get_password_hash_async("secret")
+        return await security.verify_password_async("secret", hashed)
+
+    assert asyncio.run(run()) is True
+    assert threads and threads[0].startswith("password-hash"), f"Hashed on {threads}"
+
+
+def test_login_rehashes_password_with_new_cost(low_cost, monkeypatch):
+    """Test that authenticating upgrades a hash made with another cost factor"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+    user_obj = user.create(db, obj_in=UserCreate(email="a@example.com", username="a", password="secret"))
+    old_hash = user_obj.hashed_password
+    assert old_hash.startswith("$2b$04$")
+
+    monkeypatch.setattr(
+        security, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5)
+    )
+    assert user.authenticate(db, email="a@example.com", password="wrong") is None
+    assert user.get(db, id=user_obj.id).hashed_password == old_hash, "Failed login changed the hash"
+
+    authenticated = user.authenticate(db, email="a@example.com", password="secret")
+    assert authenticated is not None
+    assert authenticated.hashed_password.startswith("$2b$05$"), "Hash was not upgraded to the new cost"
+    assert user.authenticate(db, email="a@example.com", password="secret") is not None
+    db.close()
@@ -0,0 +1,119 @@
+import pytest
+
+from app.core.config import settings
+from app.services import artifact_store
+from app.tasks import audio_analysis
+from app.tasks.audio_analysis import extract_features, FEATURES_ARTIFACT, BASIC_ARTIFACT
+
+
+@pytest.fixture(autouse=True)
+def artifact_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARTIFACT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_artifact_store_round_trip():
+    """Test that JSON artifacts are written, listed and deleted per file"""
+    artifact_store.write_json(1, artifact_store.FEATURES, "basic.json", {"tempo": 120})
+
+    assert artifact_store.exists(1, artifact_store.FEATURES, "basic.json")
+    assert artifact_store.read_json(1, artifact_store.FEATURES, "basic.json") == {"tempo": 120}
+    assert list(artifact_store.list_artifacts(1, artifact_store.FEATURES, ".json")) == ["basic"]
+    assert artifact_store.list_artifacts(2, artifact_store.FEATURES) == {}, "Artifacts leaked across files"
+
+    artifact_store.delete_artifacts(1)
+
+    assert not artifact_store.exists(1, artifact_store.FEATURES, "basic.json")
+
+
+def test_extract_features_skips_existing_artifacts(monkeypatch):
+    """Test that a retried feature stage reuses its artifacts instead of recomputing"""
+    artifact_store.write_json(1, artifact_store.FEATURES, FEATURES_ARTIFACT, {"tempo": 120.0})
+    artifact_store.write_json(1, artifact_store.FEATURES, BASIC_ARTIFACT, {"key": "A Minor", "tempo": 120.0})
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Features were extracted again")
+
+    monkeypatch.setattr(audio_analysis, "_extract_features", fail)
+    monkeypatch.setattr(audio_analysis, "get_audio_file_path", fail)
+
+    refs = extract_features.run(audio_file_id=1)
+
+    assert artifact_store.read_json(1, artifact_store.FEATURES, refs["basic"]["name"]) == {
+        "key": "A Minor", "tempo": 120.0
+    }
+    assert artifact_store.resolve_ref(refs["features"]).is_file(), "Reference does not point at the artifact"
+
+
+
+def test_in_process_feature_extraction_is_bounded(monkeypatch):
+    """Test that the API process runs at most the configured number of feature extractions at once"""
+    import asyncio
+    import threading
+    import time
+
+    running, peak = 0, 0
+    lock = threading.Lock()
+
+    def slow_extract(file_path):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return {}, {}
+
+    monkeypatch.setattr(audio_analysis, "_extract_features", slow_extract)
+
+    async def run():
+        monkeypatch.setattr(audio_analysis, "_feature_slots", asyncio.Semaphore(2))
+        await asyncio.gather(*(audio_analysis._extract_features_async(f"{i}.wav") for i in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2, f"{peak} extractions ran at once"
+
+
+def test_stopped_artifact_write_leaves_nothing_behind(artifact_dir):
+    """Test that a write stopped by its cancellation check neither keeps the file nor recreates its directories"""
+    from app.services.cancellation import OperationCancelled
+
+    def cancelled():
+        raise OperationCancelled("Job was cancelled")
+
+    with pytest.raises(OperationCancelled):
+        artifact_store.write_json(7, artifact_store.REPORT, "report.json", {"key": "C Major"}, should_stop=cancelled)
+
+    assert list(artifact_dir.iterdir()) == [], "The stopped write left files or directories behind"
+    assert artifact_store.write_json(7, artifact_store.REPORT, "report.json", {}).is_file()
+
+
+def test_transcription_waits_only_for_separation(monkeypatch):
+    """Test that the stems are transcribed after separation while features run alongside"""
+    import app.models  # noqa: F401 - registers all tables
+    from types import SimpleNamespace
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.db.base import Base
+    from app.tasks import pipeline
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    submitted = []
+    monkeypatch.setattr(pipeline.scheduler, "submit", lambda graph, *args, **kwargs: submitted.append(graph))
+
+    pipeline.start_pipeline(db, SimpleNamespace(id=7), user_id=1)
+
+    # Celery joins the parallel stages and the report into a chord
+    ingest, join = submitted[0].tasks
+    features, separation_branch = join.tasks
+    report = join.body
+    separation, transcriptions = separation_branch.tasks
+    assert ingest.task == pipeline.INGEST_TASK
+    assert features.task == pipeline.FEATURES_TASK, "Features should run alongside separation"
+    assert separation.task == pipeline.SEPARATION_TASK
+    assert [t.kwargs["stem"] for t in transcriptions.tasks] == pipeline.STEM_NAMES, "Stems should follow separation"
+    assert report.task == pipeline.REPORT_TASK, "The report should join both branches"
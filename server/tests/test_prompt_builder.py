@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from app.services.prompt_builder import (
+    build_combined_prompt,
+    build_feature_payload,
+    build_prompt,
+    estimate_tokens,
+)
+
+
+@pytest.fixture
+def audio_features():
+    """Create a feature dictionary shaped like the analysis pipeline output"""
+    beats = [i * 0.5 for i in range(1200)]  # 10 minutes at 120 BPM
+    return {
+        "duration": 600.123456,
+        "tempo": 120.18518518,
+        "spectral_centroid": 2011.2342343,
+        "spectral_bandwidth": 1894.2342,
+        "spectral_rolloff": 4012.99912,
+        "chroma_features": [0.61, 0.12, 0.43, 0.11, 0.52, 0.47, 0.1, 0.58, 0.13, 0.44, 0.09, 0.38],
+        "mfccs": [-210.1234, 95.0123, 12.345, 20.11, -3.2, 8.8, 1.1, -5.5, 2.2, 0.3, -1.1, 4.4, 0.9],
+        "detected_key": "C",
+        "detected_scale": "Major",
+        "key_confidence": 0.8123,
+        "beats": beats,
+        "segments": [{"start": i * 20.0, "end": (i + 1) * 20.0, "label": f"Segment {i+1}"} for i in range(30)],
+        "file_info": {"sample_rate": 44100, "file_path": "uploads/abc.wav", "file_name": "abc.wav"},
+    }
+
+
+def test_payload_drops_file_info_and_raw_arrays(audio_features):
+    """Test that paths, raw chroma and individual beats are not sent to the model"""
+    payload = json.loads(build_feature_payload(audio_features, "general", token_budget=10_000))
+
+    assert "file_info" not in payload
+    assert "chroma_features" not in payload
+    assert "beats" not in payload
+    assert payload["key"] == "C Major"
+    assert payload["beat_stats"]["count"] == 1200
+    assert payload["beat_stats"]["mean_interval"] == 0.5
+
+
+def test_payload_respects_token_budget(audio_features):
+    """Test that the payload is reduced until it fits the budget"""
+    for analysis_type in ["general", "music_theory", "production_feedback", "arrangement_analysis"]:
+        text = build_feature_payload(audio_features, analysis_type, token_budget=60)
+        payload = json.loads(text)
+
+        assert estimate_tokens(text) <= 60 or len(payload) <= 2, \
+            f"{analysis_type} payload of {estimate_tokens(text)} tokens exceeds budget"
+
+
+def test_payload_is_smaller_than_raw_features(audio_features):
+    """Test that compaction shrinks the payload by an order of magnitude"""
+    raw = json.dumps(audio_features, indent=2)
+    compact = build_feature_payload(audio_features, "general")
+
+    assert len(compact) * 10 < len(raw), f"Compact payload {len(compact)} vs raw {len(raw)} chars"
+
+
+def test_prompt_contains_instructions(audio_features):
+    """Test that the prompt still asks for the analysis-specific JSON structure"""
+    prompt = build_prompt(audio_features, "music_theory", role="You are a producer.")
+
+    assert prompt.startswith("You are a producer.")
+    assert "chord_progression" in prompt
+    assert "Analysis type: music_theory" in prompt
+    assert "uploads/abc.wav" not in prompt
+
+
+def test_combined_prompt_lists_every_type(audio_features):
+    """Test that the combined prompt asks for one JSON key per analysis type"""
+    prompt = build_combined_prompt(audio_features, ["general", "production_feedback"])
+
+    assert '"general":' in prompt
+    assert '"production_feedback":' in prompt
+    assert "eq_recommendations" in prompt
+    assert prompt.count("Audio data:") == 1, "Features should be sent once for all types"
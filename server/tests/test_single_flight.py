@@ -0,0 +1,135 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.services import single_flight
+from app.services.single_flight import SingleFlight
+
+
+@pytest.fixture
+def flight(monkeypatch):
+    """Create a single-flight group without Redis"""
+    monkeypatch.setattr(single_flight, "get_redis_client", lambda: None)
+    return SingleFlight("test-lock", lock_ttl=5)
+
+
+def test_concurrent_calls_share_one_computation(flight):
+    """Test that identical concurrent calls run the computation once and get the same result"""
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"key": "D Minor"}
+
+    async def run():
+        return await asyncio.gather(*[flight.run("1:general", compute, lambda: None) for _ in range(5)])
+
+    results = asyncio.run(run())
+
+    assert calls == 1, f"Expected one computation, got {calls}"
+    assert all(result is results[0] for result in results)
+
+
+def test_different_keys_run_independently(flight):
+    """Test that calls with different keys are not coalesced"""
+    calls = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def run():
+        return await asyncio.gather(
+            flight.run("1:general", lambda: compute("1:general"), lambda: None),
+            flight.run("2:general", lambda: compute("2:general"), lambda: None),
+        )
+
+    assert asyncio.run(run()) == ["1:general", "2:general"]
+    assert sorted(calls) == ["1:general", "2:general"]
+
+
+def test_errors_propagate_to_all_waiters(flight):
+    """Test that a failed computation raises for every waiter and is not cached"""
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("analysis failed")
+
+    async def run():
+        return await asyncio.gather(
+            *[flight.run("1:general", compute, lambda: None) for _ in range(3)],
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not flight._inflight, "Failed computations must not stay in flight"
+
+
+def test_overlapping_key_sets_share_computations(flight):
+    """Test that a call joins the keys already in flight and computes only the rest"""
+    computed = []
+
+    async def compute(keys):
+        computed.append(sorted(keys))
+        await asyncio.sleep(0.05)
+        return {key: f"result {key}" for key in keys}
+
+    async def run():
+        first = asyncio.ensure_future(flight.run_many(["1:general"], compute, lambda key: None))
+        await asyncio.sleep(0)
+        second = flight.run_many(["1:general", "1:music_theory"], compute, lambda key: None)
+        return await asyncio.gather(first, second)
+
+    first, second = asyncio.run(run())
+
+    assert computed == [["1:general"], ["1:music_theory"]], "A key in flight was computed again"
+    assert second == {"1:general": "result 1:general", "1:music_theory": "result 1:music_theory"}
+
+
+def test_leader_cancellation_does_not_fail_followers(flight):
+    """Test that the computation survives the caller that started it going away"""
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.run("1:general", compute, lambda: None))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.run("1:general", compute, lambda: None))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower, leader.cancelled()
+
+    assert asyncio.run(run()) == ("done", True)
+
+
+def test_replicas_coalesce_per_key(monkeypatch):
+    """Test that replicas lock each key separately and poll for the keys another replica holds"""
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(single_flight, "get_redis_client", lambda: client)
+    replicas = [SingleFlight("test-lock", lock_ttl=5, poll_interval=0.01) for _ in range(2)]
+    stored = {}
+    computed = []
+
+    async def compute(keys):
+        computed.append(sorted(keys))
+        await asyncio.sleep(0.05)
+        stored.update({key: f"result {key}" for key in keys})
+        return {key: stored[key] for key in keys}
+
+    async def run():
+        first = asyncio.ensure_future(replicas[0].run_many(["1:general"], compute, stored.get))
+        await asyncio.sleep(0.01)
+        second = replicas[1].run_many(["1:general", "1:production"], compute, stored.get)
+        return await asyncio.gather(first, second)
+
+    first, second = asyncio.run(run())
+
+    assert computed == [["1:general"], ["1:production"]]
+    assert second == {"1:general": "result 1:general", "1:production": "result 1:production"}
+    assert not client.keys("test-lock:*"), "Locks were not released"
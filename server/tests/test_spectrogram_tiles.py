@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.core.config import settings
+from app.services import artifact_store, spectrogram_tiles
+from app.services.disk_cache import DiskLRUCache
+
+
+@pytest.fixture(autouse=True)
+def isolated_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(spectrogram_tiles, "tile_cache", DiskLRUCache(str(tmp_path / "cache"), 10 * 1024 * 1024))
+
+
+@pytest.fixture
+def tone_path(tmp_path):
+    sample_rate = 22050
+    t = np.arange(sample_rate * 10) / sample_rate
+    path = tmp_path / "tone.wav"
+    sf.write(str(path), 0.5 * np.sin(2 * np.pi * 1000 * t), sample_rate)
+    return path
+
+
+def test_tile_shows_tone_at_its_frequency(tone_path):
+    """Test that a sine tone lights up the row covering its frequency"""
+    image = spectrogram_tiles.render_tile(1, tone_path, zoom=0, tile=0)
+
+    assert image.shape == (spectrogram_tiles.TILE_HEIGHT, spectrogram_tiles.TILE_WIDTH)
+    edges = np.geomspace(spectrogram_tiles.MIN_FREQUENCY, 22050 / 2, spectrogram_tiles.TILE_HEIGHT + 1)
+    expected_row = spectrogram_tiles.TILE_HEIGHT - 1 - (np.searchsorted(edges, 1000) - 1)
+    brightest_row = int(np.argmax(image[:, 100]))
+    assert abs(brightest_row - expected_row) <= 2
+    assert image[brightest_row, 100] > 200, "A -6 dBFS tone should be near the top of the range"
+
+
+def test_tiles_from_pipeline_spectrogram_match_computed_tiles(tone_path, tmp_path):
+    """Test that slicing the stored base spectrogram gives the same tile as a fresh STFT"""
+    computed = spectrogram_tiles.render_tile(1, tone_path, zoom=2, tile=0)
+
+    spectrogram_tiles.tile_cache = DiskLRUCache(str(tmp_path / "other-cache"), 10 * 1024 * 1024)
+    spectrogram_tiles.ensure_spectrogram(1, tone_path)
+    assert artifact_store.exists(1, artifact_store.SPECTROGRAMS, "original.spec")
+    from_artifact = spectrogram_tiles.render_tile(1, tone_path, zoom=2, tile=0)
+
+    np.testing.assert_array_equal(from_artifact, computed)
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    """Test that the cache stays under its size by dropping the least recently read entries"""
+    cache = DiskLRUCache(str(tmp_path / "lru"), max_bytes=250)
+    cache.put("1/a", b"a" * 100)
+    cache.put("1/b", b"b" * 100)
+    assert cache.get("1/a") == b"a" * 100
+
+    cache.put("1/c", b"c" * 100)
+
+    assert cache.get("1/b") is None, "The least recently used entry was not evicted"
+    assert cache.get("1/a") is not None and cache.get("1/c") is not None
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+from fastapi import FastAPI
+
+from app.api.deps import get_current_active_user
+from app.api.endpoints import audio
+from app.core.config import settings
+from app.crud.upload import merge_range
+from app.db.base import get_async_db
+from app.services import upload_store
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def test_save_stream_hashes_and_writes_file(tmp_path):
+    """Test that a streamed upload is written whole with its size and SHA-256"""
+    data = os.urandom(10_000)
+    path = str(tmp_path / "song.wav")
+
+    size, digest = asyncio.run(upload_store.save_stream(_chunks(data, 1024), path, max_bytes=20_000))
+
+    assert size == len(data)
+    assert digest == hashlib.sha256(data).hexdigest()
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+
+def test_save_stream_writes_in_upload_chunk_size_blocks(tmp_path, monkeypatch):
+    """Test that small network chunks are buffered into UPLOAD_CHUNK_SIZE writes"""
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 4096)
+    writes = []
+    to_thread = asyncio.to_thread
+
+    async def counting_to_thread(func, *args):
+        if getattr(func, "__name__", "") == "write":
+            writes.append(len(args[0]))
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(upload_store.asyncio, "to_thread", counting_to_thread)
+    data = os.urandom(10_000)
+    path = str(tmp_path / "song.wav")
+
+    asyncio.run(upload_store.save_stream(_chunks(data, 1024), path, max_bytes=20_000))
+
+    assert writes == [4096, 4096, 1808], "Chunks should be written in UPLOAD_CHUNK_SIZE blocks"
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+
+def test_save_stream_rejects_oversized_upload(tmp_path):
+    """Test that an upload over the limit fails without leaving a file behind"""
+    path = str(tmp_path / "song.wav")
+
+    with pytest.raises(upload_store.UploadTooLarge):
+        asyncio.run(upload_store.save_stream(_chunks(b"x" * 5000, 1024), path, max_bytes=4096))
+
+    assert os.listdir(tmp_path) == [], "A partial upload was left on disk"
+
+
+def test_multipart_file_is_read_while_streaming(tmp_path):
+    """Test that the file field of a multipart body is parsed from small chunks and stored whole"""
+    data = os.urandom(5000)
+    body = (
+        b"--XyZ\r\nContent-Disposition: form-data; name=\"title\"\r\n\r\nDemo\r\n"
+        b"--XyZ\r\nContent-Disposition: form-data; name=\"file\"; filename=\"song.wav\"\r\n"
+        b"Content-Type: audio/wav\r\n\r\n" + data + b"\r\n--XyZ--\r\n"
+    )
+    headers = {"content-type": "multipart/form-data; boundary=XyZ"}
+    path = str(tmp_path / "song.wav")
+
+    async def store():
+        file = await upload_store.read_multipart_file(headers, _chunks(body, 7))
+        return file, await upload_store.save_stream(file.chunks, path)
+
+    file, (size, digest) = asyncio.run(store())
+
+    assert (file.filename, file.content_type) == ("song.wav", "audio/wav")
+    assert size == len(data) and digest == hashlib.sha256(data).hexdigest()
+
+
+def test_oversized_upload_is_refused_before_reading_the_body(monkeypatch):
+    """Test that a declared length over the limit is rejected without receiving the body"""
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 1000)
+    app = FastAPI()
+    app.include_router(audio.router, prefix="/audio")
+    app.dependency_overrides[get_current_active_user] = lambda: None
+    app.dependency_overrides[get_async_db] = lambda: None
+
+    received = []
+    sent = []
+
+    async def receive():
+        received.append(True)
+        return {"type": "http.request", "body": b"x" * 1000, "more_body": True}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/audio/upload",
+        "raw_path": b"/audio/upload",
+        "query_string": b"",
+        "headers": [
+            (b"content-type", b"multipart/form-data; boundary=XyZ"),
+            (b"content-length", str(10 ** 9).encode()),
+        ],
+    }
+    asyncio.run(app(scope, receive, send))
+
+    assert sent[0]["status"] == 413
+    assert received == [], "The body was read before the upload was refused"
+
+
+def test_merge_range_tracks_out_of_order_chunks():
+    """Test that byte ranges received in any order merge into contiguous ranges"""
+    ranges = []
+    ranges = merge_range(ranges, 60, 100)
+    ranges = merge_range(ranges, 0, 30)
+    assert ranges == [[0, 30], [60, 100]]
+
+    ranges = merge_range(ranges, 30, 60)
+    assert ranges == [[0, 100]], "Adjacent ranges were not merged"
+    assert merge_range(ranges, 10, 20) == [[0, 100]]
+
+
+def test_finalize_waits_for_chunk_writers(tmp_path, monkeypatch):
+    """Test that a file is not finalized mid-write, and that a write racing finalize never lands in the final file"""
+    part_path, final_path = str(tmp_path / "song.wav.part"), str(tmp_path / "song.wav")
+    upload_store.allocate(part_path, 8)
+
+    async def write_while_finalizing():
+        async def slow_chunks():
+            yield b"abcd"
+            with pytest.raises(upload_store.UploadInProgress):
+                upload_store.finalize(part_path, final_path)
+            yield b"efgh"
+
+        return await upload_store.write_stream_at(slow_chunks(), part_path, 0, max_bytes=8)
+
+    assert asyncio.run(write_while_finalizing()) == 8
+    assert not os.path.exists(final_path), "The file was moved while a chunk was being written"
+
+    # A writer that opened the file just before it was finalized must not write into it
+    flock = upload_store.fcntl.flock
+
+    def finalize_before_locking(fd, operation):
+        if operation == upload_store.fcntl.LOCK_SH:
+            upload_store.finalize(part_path, final_path)
+        flock(fd, operation)
+
+    monkeypatch.setattr(upload_store.fcntl, "flock", finalize_before_locking)
+    with pytest.raises(upload_store.UploadFinalized):
+        asyncio.run(upload_store.write_stream_at(_chunks(b"XXXX", 4), part_path, 0, max_bytes=8))
+
+    with open(final_path, "rb") as f:
+        assert f.read() == b"abcdefgh", "A late chunk was written into the finalized file"
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (registers every table)
+from app.core.cache import InMemoryCacheBackend
+from app.crud.user import user
+from app.db.base import Base
+from app.models.user import User
+from app.services.user_cache import UserCache
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        db.add(User(email="a@example.com", username="a", hashed_password="hash"))
+        db.commit()
+    return factory
+
+
+def _count_queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_cached_user_is_served_without_a_query(session_factory):
+    """Test that a cached user comes back attached to the session without a SELECT"""
+    cache = UserCache(InMemoryCacheBackend(), ttl=60)
+    with session_factory() as db:
+        cache.set(user.get(db, id=1))
+
+    with session_factory() as db:
+        statements = _count_queries(db.get_bind())
+        cached = cache.get(db, 1)
+
+        assert (cached.id, cached.email, cached.is_active) == (1, "a@example.com", True)
+        assert statements == [], "Cache hit queried the database"
+        assert cached.hashed_password == "hash", "Password hash was not loaded on demand"
+        assert user.get(db, id=1) is cached, "Cached user is not the session's identity"
+
+
+def test_updated_user_is_invalidated(session_factory):
+    """Test that updating a cached user persists and invalidation forces a reload"""
+    cache = UserCache(InMemoryCacheBackend(), ttl=60)
+    with session_factory() as db:
+        cache.set(user.get(db, id=1))
+
+    with session_factory() as db:
+        updated = user.update(db, db_obj=cache.get(db, 1), obj_in={"is_active": False})
+        cache.invalidate(updated.id)
+
+    with session_factory() as db:
+        assert cache.get(db, 1) is None
+        assert user.get(db, id=1).is_active is False
+
+
+def test_zero_ttl_disables_cache(session_factory):
+    """Test that USER_CACHE_TTL_SECONDS=0 turns the cache off"""
+    cache = UserCache(InMemoryCacheBackend(), ttl=0)
+    with session_factory() as db:
+        cache.set(user.get(db, id=1))
+        assert cache.get(db, 1) is None
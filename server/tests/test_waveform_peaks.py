@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.services import waveform_peaks
+
+
+@pytest.fixture
+def tone_path(tmp_path):
+    sample_rate = 8000
+    t = np.arange(sample_rate * 3) / sample_rate
+    tone = 0.5 * np.sin(2 * np.pi * 220 * t)
+    tone[sample_rate:2 * sample_rate] = 0  # Silent second
+    path = tmp_path / "tone.wav"
+    sf.write(str(path), np.stack([tone, -tone], axis=1), sample_rate, subtype="FLOAT")
+    return path
+
+
+def test_peaks_pyramid_levels(tone_path, tmp_path):
+    """Test that every level holds min/max pairs consistent with the finest level"""
+    peaks_path = waveform_peaks.compute_peaks(tone_path, tmp_path / "tone.peaks")
+
+    header = waveform_peaks.read_header(peaks_path)
+    assert sorted(header["levels"]) == waveform_peaks.LEVELS
+    assert header["frames"] == 24000
+
+    fine = waveform_peaks.read_peaks(peaks_path, 256)
+    coarse = waveform_peaks.read_peaks(peaks_path, 512)
+    assert fine["total_pixels"] == -(-24000 // 256)
+    assert coarse["total_pixels"] == -(-fine["total_pixels"] // 2)
+
+    fine_pairs = fine["data"].reshape(-1, 2)
+    assert fine_pairs[:, 0].min() == pytest.approx(-0.5 * 32767, rel=0.01)
+    assert fine_pairs[:, 1].max() == pytest.approx(0.5 * 32767, rel=0.01)
+    assert coarse["data"].reshape(-1, 2)[0, 1] == fine_pairs[:2, 1].max()
+
+
+def test_read_peaks_time_window(tone_path, tmp_path):
+    """Test that a time window only returns the pixels it covers"""
+    peaks_path = waveform_peaks.compute_peaks(tone_path, tmp_path / "tone.peaks")
+
+    window = waveform_peaks.read_peaks(peaks_path, 256, start=1.0, end=2.0)
+
+    assert window["start_pixel"] == 8000 // 256
+    assert window["length"] == -(-16000 // 256) - 8000 // 256
+    # The silent second is flat apart from the pixels bordering the tone
+    assert np.abs(window["data"][4:-4]).max() == 0
+
+
+def test_stopped_computation_leaves_no_files(tone_path, tmp_path):
+    """Test that aborting through should_stop writes neither the peaks nor a temporary file"""
+    output_dir = tmp_path / "peaks"
+    output_dir.mkdir()
+
+    def should_stop():
+        raise InterruptedError("cancelled")
+
+    with pytest.raises(InterruptedError):
+        waveform_peaks.compute_peaks(tone_path, output_dir / "tone.peaks", should_stop=should_stop)
+    assert list(output_dir.iterdir()) == [], "Aborted computation left files behind"
+
+    waveform_peaks.compute_peaks(tone_path, output_dir / "tone.peaks")
+    assert [p.name for p in output_dir.iterdir()] == ["tone.peaks"], "Temporary file was not moved into place"